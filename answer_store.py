@@ -0,0 +1,343 @@
+import logging
+import random
+from array import array
+from collections.abc import Mapping
+
+from weighted_sampler import WeightedSampler
+
+
+# 报告页码缺口/重复时最多列出的页码个数，避免超大答案库把日志刷爆
+_REPORT_PREVIEW = 10
+_PAGE_MAX = 0xFFFFFFFF  # array('I') 能保存的最大页码
+
+
+class _Missing:
+    """
+    答案项没有某个字段时列中保存的占位值；按模块全局名序列化，从答案缓存加载后仍是同一个对象。
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        return '_MISSING'
+
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
+
+
+class Answer(Mapping):
+    """
+    答案库中一条答案的只读视图。
+
+    不保存任何字段，只记录所属答案库和位置，访问字段时从答案库的列中读取。
+    用法与原来的答案字典相同：answer["EN"]、answer.get("weight", 1)、dict(answer)。
+    """
+
+    __slots__ = ('_store', '_position')
+
+    def __init__(self, store, position):
+        self._store = store
+        self._position = position
+
+    def __getitem__(self, key):
+        # 文本字段是最常见的访问，直接读列，其他字段交给答案库处理
+        column = self._store._columns.get(key)
+        if column is not None:
+            value = column[self._position]
+            if value is not _MISSING:
+                return value
+        return self._store._field(self._position, key)
+
+    def __iter__(self):
+        return (key for key in self._store._field_names() if self._store._has_field(self._position, key))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Answer({dict(self)!r})"
+
+
+class AnswerStore:
+    """
+    答案库存储对象。
+
+    在加载答案数据时一次性构建：
+    - 按列存放的答案数据：页码保存在 array('I') 中，EN/CN 等文本字段各占一列（列表），
+      相同的字符串只保留一个对象；不再为每条答案保存一个字典。访问时返回轻量的 Answer 视图；
+    - 页码连续时按下标直接定位，否则建立页码 -> 位置的字典索引，按页码查找为 O(1)；
+    - 均匀随机抽取为 O(1)，与答案库大小无关；
+    - 答案项带有 'weight' 字段（默认为 1）且权重不全相同时，构建别名表加权采样器，抽取同样为 O(1)。
+
+    页码缺口和重复页码只在构建时检查并记录一次，抽取时不再做任何校验。
+    """
+
+    def __init__(self, answers, finish=True):
+        """
+        根据答案列表构建答案库。
+
+        Args:
+            answers (iterable): 从 JSON 文件加载的答案列表，每项包含 'page_number'、'EN' 和 'CN'。
+            finish (bool, optional): 是否立即完成构建。流式加载时传入 False，之后分批调用 extend()，
+                                     全部加载后调用 finish()。
+        """
+        self._pages = array('I')  # 每条答案的页码
+        self._columns = {}  # 字段名 -> 该字段按位置排列的值（列表）
+        self._weights = None  # 每条答案的权重 (array('d'))，答案项都没有 'weight' 字段时为 None
+        self._first_page = 0  # 首个页码，页码连续时用于按下标定位
+        self._index = None  # page_number -> 位置，页码连续时为 None
+        self._count = 0  # 已发布（可被读取和抽取）的答案条数
+        self.duplicates = []  # 重复出现的页码
+        self.gaps = []  # 页码范围内缺失的页码
+        self._sampler = None  # 加权采样器，所有权重相同时为 None（均匀抽取）
+        self.loading = True  # 是否仍在加载（finish() 之前为 True）
+        # ----- 构建过程中的临时状态，finish() 后释放 -----
+        self._strings = {}  # 字符串驻留表，相同内容的字符串只保留一个对象
+        self._all_weights = array('d')  # 与 _pages 一一对应的权重
+        self._has_weight = False  # 是否有答案项带 'weight' 字段
+        self._skipped = 0  # 格式不正确而被跳过的答案项数量
+        self._invalid_weights = 0  # 权重格式不正确（按 1 处理）的答案项数量
+        self.extend(answers)
+        if finish:
+            self.finish()
+
+    def _locate_new(self, page_number, position):
+        """
+        为新答案项登记页码，页码重复时返回 False。
+
+        页码从首个页码起逐一递增时不需要字典索引；一旦不连续，就用已有的页码建立字典索引。
+        """
+        if self._index is None:
+            if not position:
+                self._first_page = page_number
+                return True
+            if page_number == self._first_page + position:
+                return True
+            if self._first_page <= page_number < self._first_page + position:
+                return False
+            self._index = {self._first_page + i: i for i in range(position)}
+        if page_number in self._index:
+            return False
+        self._index[page_number] = position
+        return True
+
+    def extend(self, answers):
+        """
+        追加一批答案项并建立索引，追加完成后这批答案才对 len()、get() 和 draw() 可见。
+
+        加载线程追加的同时其他线程可以安全地读取和抽取已发布的答案（列先写入，最后才更新答案条数）。
+
+        Args:
+            answers (iterable): 答案项。
+        """
+        strings = self._strings
+        columns = self._columns
+        pages = self._pages
+        weights = self._all_weights
+        for item in answers:
+            try:
+                page_number = int(item["page_number"])
+                item["EN"], item["CN"]  # 确认中英文字段都存在
+            except (KeyError, TypeError, ValueError):
+                self._skipped += 1
+                continue
+            if not 0 <= page_number <= _PAGE_MAX:
+                self._skipped += 1
+                continue
+            position = len(pages)
+            if not self._locate_new(page_number, position):
+                # 重复页码只保留第一次出现的答案项
+                self.duplicates.append(page_number)
+                continue
+            weight = item.get("weight", 1)
+            self._has_weight = self._has_weight or "weight" in item
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight >= 0:
+                self._invalid_weights += 1
+                weight = 1
+            for key, value in item.items():
+                if key == "page_number" or key == "weight":
+                    continue
+                column = columns.get(key)
+                if column is None:
+                    # 新出现的字段（例如新增的语言），之前的答案项都没有该字段
+                    column = columns[key] = [_MISSING] * position
+                if isinstance(value, str):
+                    value = strings.setdefault(value, value)
+                column.append(value)
+            for column in columns.values():
+                if len(column) == position:
+                    column.append(_MISSING)  # 本答案项没有该字段
+            weights.append(weight)
+            pages.append(page_number)
+        self._count = len(pages)  # 发布本批答案
+
+    def finish(self):
+        """
+        完成构建：检查页码缺口，构建加权采样器，记录页码重复和格式问题。
+        """
+        weights = self._all_weights
+        if self._has_weight:
+            self._weights = weights
+        if weights and any(weight != weights[0] for weight in weights):
+            self._sampler = WeightedSampler(weights)
+
+        if self._pages:
+            if self._index is None:
+                first_page = self._first_page
+                last_page = first_page + len(self._pages) - 1
+            else:
+                first_page = min(self._index)
+                last_page = max(self._index)
+                if last_page - first_page + 1 != len(self._index):
+                    self.gaps = [p for p in range(first_page, last_page + 1) if p not in self._index]
+
+        if self._skipped:
+            logging.warning(f"答案库中有 {self._skipped} 项格式不正确，已跳过")
+        if self.duplicates:
+            logging.warning(f"答案库中有 {len(self.duplicates)} 个重复页码（仅保留首次出现）: "
+                            f"{self.duplicates[:_REPORT_PREVIEW]}")
+        if self._invalid_weights:
+            logging.warning(f"答案库中有 {self._invalid_weights} 项权重格式不正确，已按 1 处理")
+        if self.gaps:
+            logging.warning(f"答案库页码存在 {len(self.gaps)} 处缺口: {self.gaps[:_REPORT_PREVIEW]}")
+        self._strings = None
+        self._all_weights = None
+        self.loading = False
+        logging.info(f"答案库索引构建完成，共 {len(self._pages)} 条答案")
+
+    def __getstate__(self):
+        """
+        序列化构建完成的答案库（各列、页码索引和加权采样器），答案缓存直接保存该对象，
+        加载时不再重复校验答案项和构建索引。
+
+        Raises:
+            ValueError: 答案库仍在加载（finish() 之前）。
+        """
+        if self.loading:
+            raise ValueError("答案库仍在加载，不能序列化")
+        return self.__dict__
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield Answer(self, position)
+
+    def _field_names(self):
+        """
+        所有字段名，顺序与原答案项相同。
+        """
+        yield "page_number"
+        yield from tuple(self._columns)  # 复制一份字段名，加载线程新增字段时不影响遍历
+        if self._weights is not None:
+            yield "weight"
+
+    def _has_field(self, position, key):
+        """
+        判断指定位置的答案项是否有某个字段。
+        """
+        column = self._columns.get(key)
+        if column is not None:
+            return column[position] is not _MISSING
+        return key == "page_number" or (key == "weight" and self._weights is not None)
+
+    def _field(self, position, key):
+        """
+        读取指定位置答案项的字段值。
+
+        Raises:
+            KeyError: 答案项没有该字段。
+        """
+        column = self._columns.get(key)
+        if column is not None:
+            value = column[position]
+            if value is not _MISSING:
+                return value
+        elif key == "page_number":
+            return self._pages[position]
+        elif key == "weight" and self._weights is not None:
+            weight = self._weights[position]
+            return int(weight) if weight.is_integer() else weight
+        raise KeyError(key)
+
+    def _position(self, page_number):
+        """
+        查找页码对应的位置，页码不存在时返回 None。
+        """
+        index = self._index
+        if index is not None:
+            position = index.get(page_number)
+            # 加载线程先登记页码再写入列，尚未发布的答案项视为不存在
+            return position if position is not None and position < self._count else None
+        position = page_number - self._first_page
+        return position if 0 <= position < self._count else None
+
+    def at(self, position):
+        """
+        按位置（0 ~ len-1）读取答案项。
+        """
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        return Answer(self, position)
+
+    def get(self, page_number):
+        """
+        按页码查找答案项。
+
+        Args:
+            page_number (int): 页码。
+
+        Returns:
+            Answer: 对应的答案项，如果页码不存在则返回 None。
+        """
+        position = self._position(page_number)
+        if position is None:
+            return None
+        return Answer(self, position)
+
+    def set_weights(self, changes):
+        """
+        修改答案项的抽取权重，只增量重建受影响的别名表块。
+
+        Args:
+            changes (dict): 页码 -> 新权重（非负数，0 表示不再抽到该答案）。
+
+        Raises:
+            KeyError: 页码不存在。
+            ValueError: 权重为负数。
+        """
+        positions = {}
+        for page_number, weight in changes.items():
+            position = self._position(page_number)
+            if position is None:
+                raise KeyError(page_number)
+            positions[position] = weight
+        if self._sampler is None:
+            # 此前为均匀抽取，先以全部权重为 1 构建采样器
+            self._sampler = WeightedSampler([1] * len(self._pages))
+        self._sampler.update(positions)
+        if self._weights is None:
+            self._weights = array('d', [1.0]) * len(self._pages)
+        for position, weight in positions.items():
+            self._weights[position] = weight
+
+    def draw(self, rng=random):
+        """
+        随机抽取一个答案项（有权重时按权重抽取，否则均匀抽取）。
+
+        Args:
+            rng (random.Random, optional): 随机数生成器，默认为 random 模块。
+
+        Returns:
+            Answer: 随机抽取的答案项，如果答案库为空则返回 None。
+        """
+        count = self._count
+        if not count:
+            return None
+        if self._sampler is not None:
+            position = self._sampler.sample(rng)
+            return None if position is None else Answer(self, position)
+        return Answer(self, rng.randrange(count))
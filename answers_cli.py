@@ -0,0 +1,197 @@
+"""
+答案之书命令行入口（无界面模式）。
+
+不导入 tkinter，不创建窗口，直接复用 app_core 中的答案加载和点击次数限制逻辑，
+把抽取结果以 JSON Lines 或 TSV 格式连续输出到标准输出，适合脚本、定时任务和大规模模拟。
+
+用法示例:
+    python answers_cli.py --draw 1000000 --format tsv > draws.tsv
+    python answers_cli.py --draw 1 --format json --enforce-limit
+    python answers_cli.py --self-check 2000000
+    python answers_cli.py --draw 3 --seeded --user alice --date 2026-01-01   # 复现某用户某天的前 3 个答案
+    python answers_cli.py --search 旅行 --limit 20 --format tsv
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import random
+import sys
+import time
+
+import app_core
+from seeded_draw import seeded_draw
+from weighted_sampler import WeightedSampler, self_check
+
+
+_WRITE_BATCH = 4096  # 每批写入标准输出的行数
+
+
+def format_json(item):
+    """
+    将答案项格式化为一行 JSON。
+    """
+    return json.dumps(dict(item), ensure_ascii=False)
+
+
+def format_tsv(item):
+    """
+    将答案项格式化为一行 TSV（页码、英文、中文）。
+    """
+    return f'{item["page_number"]}\t{item["EN"]}\t{item["CN"]}'
+
+
+FORMATTERS = {
+    'json': format_json,
+    'tsv': format_tsv,
+}
+
+
+def parse_args(argv=None):
+    """
+    解析命令行参数。
+    """
+    parser = argparse.ArgumentParser(description="答案之书命令行抽取（无界面）")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--draw', type=int, metavar='N', help="抽取答案的次数")
+    mode.add_argument('--self-check', type=int, metavar='N',
+                      help="加权抽取统计自检：抽样 N 次，检验经验分布是否符合权重")
+    mode.add_argument('--search', metavar='QUERY', help="按关键词检索答案（英文按单词，中文按字），按相关度输出")
+    parser.add_argument('--format', choices=sorted(FORMATTERS), default='json', help="输出格式，默认 json (JSON Lines)")
+    parser.add_argument('--limit', type=int, default=10, help="检索时最多输出的结果数，默认 10")
+    parser.add_argument('--seed', type=int, default=None, help="随机数种子，用于复现抽取结果")
+    parser.add_argument('--seeded', action='store_true', default=app_core.SEEDED_DRAW,
+                        help="确定性抽取：第 i 个结果即该用户当天第 i 次点击的答案，可用于预先生成和复现")
+    parser.add_argument('--user', default=app_core.LOCAL_USER_ID, help="确定性抽取使用的用户 ID，默认为本机用户")
+    parser.add_argument('--date', default=None, help="确定性抽取使用的日期 (YYYY-MM-DD)，默认为今天")
+    parser.add_argument('--enforce-limit', action='store_true',
+                        help=f"按每日点击次数限制 ({app_core.DAILY_CLICK_LIMIT}次) 计数，达到限制后停止")
+    return parser.parse_args(argv)
+
+
+def draw_answers(answer_store, count, rng, enforce_limit=False, seeded=False, user_id=app_core.LOCAL_USER_ID,
+                 current_date=None):
+    """
+    连续抽取答案项。
+
+    Args:
+        answer_store: 答案库对象（AnswerStore 或 BinaryCorpus）。
+        count (int): 抽取次数。
+        rng (random.Random): 随机数生成器。
+        enforce_limit (bool): 是否执行每日点击次数限制。
+        seeded (bool): 是否确定性抽取，第 i 次抽取使用点击序号 i（执行限制时使用实际的点击序号）。
+        user_id (str): 确定性抽取使用的用户 ID。
+        current_date (str, optional): 日期字符串 (YYYY-MM-DD 格式)，默认为今天。
+
+    Yields:
+        dict: 抽取到的答案项。
+    """
+    if current_date is None:
+        current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    if app_core.NO_REPEAT:
+        def draw(rng, click_index):
+            return app_core.draw_answer(answer_store, user_id, current_date=current_date)
+    elif seeded:
+        def draw(rng, click_index):
+            return seeded_draw(answer_store, user_id, current_date, click_index, app_core.DRAW_SEED_SALT)
+    else:
+        def draw(rng, click_index):
+            return answer_store.draw(rng)
+    for click_index in range(count):
+        if enforce_limit:
+            allowed, click_count = app_core.consume_click(current_date)
+            if not allowed:
+                logging.warning("已达到每日点击次数限制。")
+                print(f"今日获取答案次数已达上限 ({app_core.DAILY_CLICK_LIMIT}次)，请明日再来。", file=sys.stderr)
+                return
+            click_index = click_count - 1
+        yield draw(rng, click_index)
+
+
+def run_self_check(answer_store, samples, rng):
+    """
+    加权抽取统计自检。
+
+    依次检验: 答案库当前权重；随机权重；随机修改 10% 权重后（增量重建）的分布。
+
+    Returns:
+        bool: 是否全部通过。
+    """
+    weights = [item.get("weight", 1) for item in answer_store]
+    sampler = WeightedSampler(weights)
+    checks = {"corpus_weights": self_check(sampler, samples, rng)}
+
+    random_weights = [rng.uniform(0.1, 10.0) for _ in weights]
+    sampler = WeightedSampler(random_weights)
+    checks["random_weights"] = self_check(sampler, samples, rng)
+
+    positions = rng.sample(range(len(weights)), max(1, len(weights) // 10))
+    sampler.update({position: rng.choice([0.0, rng.uniform(0.1, 50.0)]) for position in positions})
+    checks["incremental_update"] = self_check(sampler, samples, rng)
+
+    print(json.dumps(checks, ensure_ascii=False, indent=2))
+    return all(result["passed"] for result in checks.values())
+
+
+def run_search(answer_store, query, limit, formatter):
+    """
+    检索答案并输出，每行一条，按相关度从高到低排列。
+
+    Returns:
+        int: 进程退出码，没有匹配时为 1。
+    """
+    index = app_core.load_search_index(answer_store)
+    start = time.perf_counter()
+    results = index.search(query, limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for page_number, _ in results:
+        print(formatter(answer_store.get(page_number)))
+    print(f"共 {len(results)} 条结果，检索耗时 {elapsed_ms:.3f} ms", file=sys.stderr)
+    return 0 if results else 1
+
+
+def main(argv=None):
+    """
+    命令行入口。
+
+    Returns:
+        int: 进程退出码。
+    """
+    args = parse_args(argv)
+    # 日志只输出警告及以上级别到标准错误，保证标准输出只包含抽取结果
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    with contextlib.redirect_stdout(sys.stderr):
+        app_core.check_data_directory()
+
+    answer_store, load_error = app_core.load_answer_store()
+    if load_error:
+        print(load_error, file=sys.stderr)
+        return 1
+    if not len(answer_store):
+        print("答案库为空。", file=sys.stderr)
+        return 1
+
+    if args.search is not None:
+        return run_search(answer_store, args.search, args.limit, FORMATTERS[args.format])
+
+    rng = random.Random(args.seed)
+    if args.self_check:
+        return 0 if run_self_check(answer_store, args.self_check, rng) else 1
+
+    formatter = FORMATTERS[args.format]
+    out = sys.stdout
+    batch = []
+    for item in draw_answers(answer_store, args.draw, rng, args.enforce_limit, args.seeded, args.user, args.date):
+        batch.append(formatter(item))
+        if len(batch) >= _WRITE_BATCH:
+            out.write('\n'.join(batch) + '\n')
+            batch.clear()
+    if batch:
+        out.write('\n'.join(batch) + '\n')
+    out.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,554 @@
+import atexit
+import csv
+import json
+import datetime
+import logging
+import os
+import random
+import sys
+
+import metrics
+from answer_store import AnswerStore
+from logging_setup import click_logger
+from no_repeat import NoRepeatTracker
+from seeded_draw import seeded_draw
+from quota_store import WriteBehindQuota
+from tracing import tracer
+
+
+# ----- 文件路径定义 -----
+# 定义 JSON 答案文件、想法文件、图标文件和点击次数限制数据文件的相对路径
+json_file = "./src/answers.json"  # JSON 答案文件路径
+jsonl_file = "./src/answers.jsonl"  # JSON Lines 答案文件路径 (可选，answers.json 不存在时使用，适合由数据管道生成)
+binary_corpus_file = "./src/answers.bin"  # 编译后的二进制答案库路径 (可选，存在时优先使用)
+thoughts_file = "./src/thoughts.txt"  # 想法文件路径
+ico_logo_file = "./src/logo.ico"  # 图标文件路径
+log_file_path = './data/log.log'  # 定义日志文件路径
+click_limit_file = "./data/click_limit.csv"  # 点击次数限制数据文件路径 (CSV 文件)
+answers_cache_file = "./data/answers_cache.pickle"  # 答案解析缓存文件路径
+click_quota_db_file = "./data/click_quota.sqlite3"  # 按用户点击次数数据库路径 (SQLite 后端)
+no_repeat_file = "./data/no_repeat.bin"  # 当天不重复抽取状态文件路径
+draw_history_file = "./data/draw_history.bin"  # 抽取历史文件路径 (只追加的二进制记录)
+search_index_file = "./data/answers.idx"  # 全文检索索引路径 (与答案解析缓存放在一起，打包后 src 目录只读)
+metrics_file = "./data/metrics.json"  # 运行指标快照路径 (桌面应用退出时写入)
+
+# 点击次数限制
+DAILY_CLICK_LIMIT = 3  # 每天允许点击的最大次数
+LOCAL_USER_ID = "local"  # 桌面应用和命令行使用的本机用户 ID
+# 点击次数存储后端: csv（单用户 CSV 文件）或 sqlite（按用户计数，多个实例可同时使用）
+QUOTA_BACKEND = os.environ.get("BOOK_QUOTA_BACKEND", "csv")
+# 不重复抽取模式: 同一用户同一天不会抽到重复的答案
+NO_REPEAT = os.environ.get("BOOK_NO_REPEAT", "0") == "1"
+# 确定性抽取模式: 答案只由 (用户, 日期, 点击序号) 决定，可预先生成和复现
+SEEDED_DRAW = os.environ.get("BOOK_SEEDED_DRAW", "0") == "1"
+DRAW_SEED_SALT = os.environ.get("BOOK_DRAW_SALT", "")  # 确定性抽取的盐，部署时配置
+# 答案库热加载: 答案文件变化后在后台重新加载并替换答案库，无需重启
+HOT_RELOAD = os.environ.get("BOOK_HOT_RELOAD", "0") == "1"
+# 抽取历史: 每次点击追加一条二进制记录，并维护按天、按页码的计数（默认启用）
+DRAW_HISTORY = os.environ.get("BOOK_DRAW_HISTORY", "1") == "1"
+# 答案文件超过该大小（字节）时，桌面应用在后台流式加载，窗口先出现并从已加载的部分抽取答案
+STREAM_LOAD_MIN_BYTES = int(os.environ.get("BOOK_STREAM_LOAD_MIN_BYTES", 8 * 1024 * 1024))
+
+# 获取应用的基础路径 
+def get_base_path():
+    """
+    获取应用的基础路径。
+
+    根据程序是否被打包为可执行文件（exe）来决定基础路径。
+    如果是打包后的 exe，则基础路径为 exe 所在的目录；
+    否则，为当前脚本运行的目录。
+
+    Returns:
+        str: 应用的基础路径。
+    """
+    if getattr(sys, 'frozen', False):
+        # 如果 sys.frozen 为 True，说明程序是被打包为 exe 运行的
+        base_path = os.path.dirname(sys.executable)  # 获取 exe 文件所在的目录
+    else:
+        base_path = os.path.abspath(".")  # 否则，返回当前工作目录的绝对路径
+    return base_path
+
+
+base_path = get_base_path()
+
+
+def check_data_directory():
+    """
+    检查数据目录是否存在，如果不存在则创建。
+
+    在日志配置之前调用（日志文件就在数据目录中），使用模块记录器而不是 logging.debug()，
+    避免根记录器此时被自动配置为输出到标准错误。
+    """
+    data_path = os.path.join(base_path, 'data')
+    logger = logging.getLogger(__name__)
+    if not os.path.exists(data_path):
+        os.makedirs(data_path)
+        logger.debug(f"已创建数据目录: {data_path}")
+    else:
+        logger.debug(f"数据目录已存在: {data_path}")
+
+
+def file_path_processor(file_path):
+    """
+    处理文件路径，适配打包后的应用。
+
+    当程序打包为 exe 后，文件路径可能需要从打包路径中获取。
+    此函数检查程序是否在打包环境下运行，并据此调整文件路径。
+
+    Args:
+        file_path (str): 原始文件路径。
+
+    Returns:
+        str: 处理后的文件路径。
+    """
+    # 检查是否存在 _MEIPASS 属性，该属性在使用 PyInstaller 打包时会被设置
+    if hasattr(sys, '_MEIPASS'):
+        # 如果存在 _MEIPASS 属性，说明程序是被打包运行的
+        file_path = os.path.join(sys._MEIPASS, file_path)  # 将文件路径拼接为打包环境下的路径
+    else:
+        file_path = file_path  # 否则，保持原始路径不变
+    return file_path
+
+
+# 使用 file_path_processor 函数处理各个文件路径，以适配打包环境
+json_file = file_path_processor(json_file)
+jsonl_file = file_path_processor(jsonl_file)
+binary_corpus_file = file_path_processor(binary_corpus_file)
+thoughts_file = file_path_processor(thoughts_file)
+ico_logo_file = file_path_processor(ico_logo_file)
+
+
+# ----- 加载答案数据 -----
+@metrics.CORPUS_LOAD_SECONDS.time()
+@tracer.traced()
+def load_answer_store():
+    """
+    加载答案库。
+
+    优先使用编译后的二进制答案库（通过 mmap 只解码抽中的答案），
+    否则从缓存或 JSON 答案文件加载并构建 AnswerStore；answers.json 不存在时流式读取 answers.jsonl。
+    出错时只记录日志并返回错误提示，由调用方决定如何展示（消息框或标准错误输出）。
+
+    Returns:
+        tuple: 答案库对象和错误提示 (str)，加载成功时错误提示为 None。
+               加载失败时返回空的 AnswerStore，避免后续调用出错。
+    """
+    # 按需导入，桌面应用在首帧显示之后才加载答案库，这些模块不计入启动耗时
+    from binary_corpus import BinaryCorpus
+    from corpus_cache import load_store_cached
+
+    if os.path.exists(binary_corpus_file):
+        try:
+            answer_store = BinaryCorpus.open(binary_corpus_file)
+            logging.info(f"二进制答案库加载完成，共 {len(answer_store)} 条答案")
+            return answer_store, None
+        except (OSError, ValueError) as e:
+            logging.error(f"加载二进制答案库时发生错误: {e}，改用 JSON 答案文件")
+
+    if not os.path.exists(json_file) and os.path.exists(jsonl_file):
+        from streaming_loader import load_streaming  # 按需导入
+        try:
+            return load_streaming(jsonl_file), None
+        except (OSError, ValueError) as e:
+            logging.error(f"加载 JSON Lines 答案文件时发生错误: {e}")
+            return AnswerStore([]), f"加载答案文件时发生错误: {jsonl_file}\n错误信息: {e}"
+
+    # 检查 JSON 答案文件是否存在
+    if not os.path.exists(json_file):
+        logging.error(f"{json_file}文件未找到")
+        return AnswerStore([]), f"答案文件未找到: {json_file}\n请确保 '{json_file}' 文件与程序在同一目录下"
+    try:
+        answer_store = load_store_cached(json_file, answers_cache_file)  # 从缓存或 JSON 文件中加载答案库
+        logging.info("答案文件加载完成")  # 记录答案文件加载成功事件
+    except json.JSONDecodeError as e:
+        # JSON 文件格式错误处理
+        logging.error(f"JSON 文件格式错误: {e}")
+        return AnswerStore([]), f"答案文件 JSON 格式错误: {json_file}\n请检查文件内容是否为有效的 JSON 格式。"
+    except Exception as e:
+        # 其他文件读取错误处理
+        logging.error(f"加载答案文件时发生错误: {e}")
+        return AnswerStore([]), f"加载答案文件时发生未知错误: {json_file}\n错误信息: {e}"
+    return answer_store, None
+
+
+def start_answer_store_load():
+    """
+    开始加载答案库（桌面应用使用）。
+
+    没有二进制答案库、且答案文件为 JSON Lines 或大于 STREAM_LOAD_MIN_BYTES 时，在后台线程中流式加载，
+    立即返回正在填充的答案库，调用方可以从已加载的部分抽取答案；否则与 load_answer_store 相同，同步加载。
+
+    Returns:
+        tuple: 答案库对象、流式加载对象（StreamingLoad，同步加载时为 None）和错误提示 (str)。
+    """
+    stream_path = None
+    if not os.path.exists(binary_corpus_file):
+        if os.path.exists(json_file):
+            if os.path.getsize(json_file) >= STREAM_LOAD_MIN_BYTES:
+                stream_path = json_file
+        elif os.path.exists(jsonl_file):
+            stream_path = jsonl_file
+    if stream_path is None:
+        answer_store, load_error = load_answer_store()
+        return answer_store, None, load_error
+
+    from streaming_loader import StreamingLoad  # 按需导入
+    logging.info(f"开始流式加载答案文件: {stream_path}")
+    loader = StreamingLoad(stream_path).start()
+    return loader.store, loader, None
+
+
+def load_search_index(answer_store):
+    """
+    加载答案库的全文检索索引，索引不存在或答案文件已变化时重新构建并保存到 search_index_file。
+
+    Args:
+        answer_store: 已加载的答案库对象。
+
+    Returns:
+        SearchIndex: 检索索引。
+    """
+    from search_index import load_or_build_index  # 按需导入，只有检索时才需要
+    # 与 load_answer_store 的优先顺序相同，找到答案库对应的源文件
+    source_path = next((path for path in (binary_corpus_file, json_file, jsonl_file) if os.path.exists(path)), None)
+    return load_or_build_index(answer_store, source_path, search_index_file)
+
+
+def watch_answer_store(on_reload):
+    """
+    启动答案库热加载：JSON/JSON Lines 答案文件或二进制答案库变化后在后台线程重新加载。
+
+    Args:
+        on_reload (callable): 以新答案库对象为参数调用，在后台线程中执行，只应做引用替换。
+
+    Returns:
+        CorpusWatcher: 已启动的监视对象。
+    """
+    from corpus_watcher import CorpusWatcher  # 按需导入，未启用热加载时不需要
+    return CorpusWatcher([json_file, jsonl_file, binary_corpus_file], load_answer_store, on_reload).start()
+
+
+@metrics.QUOTA_SAVE_SECONDS.time()
+@tracer.traced()
+def save_click_count_data(count, date_str):
+    """
+    保存点击次数和日期到 CSV 文件中。
+    CSV 文件包含列头 'Count' 和 'Date'，并写入一行数据。
+    先写入临时文件并 fsync，再原子重命名覆盖原文件，写到一半时崩溃也不会留下损坏的文件。
+
+    Args:
+        count (int): 当前的点击次数。
+        date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+    """
+    try:
+        temp_file = f"{click_limit_file}.tmp"
+        with open(temp_file, 'w', newline='', encoding='utf-8') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(['Count', 'Date'])  # 写入 CSV 文件头
+            csv_writer.writerow([count, date_str])  # 写入点击次数和日期数据
+            csvfile.flush()
+            os.fsync(csvfile.fileno())  # 确保数据落盘后再替换原文件
+        os.replace(temp_file, click_limit_file)  # 原子替换
+        click_logger.info(f"Successfully saved click count data to CSV file, Count: {count}, 日期: {date_str}")
+    except Exception as e:
+        logging.error(f"Error saving click count data to CSV file: {e}")
+
+
+@metrics.QUOTA_LOAD_SECONDS.time()
+@tracer.traced()
+def load_click_count_data():
+    """
+    从 CSV 文件中加载点击次数限制数据 (点击次数和最后点击日期)。
+    CSV 文件应包含列头 'Count' 和 'Date'，并期望只有一行数据。
+    如果文件不存在或内容不符合预期，则返回默认值：count=0, last_date=None。
+
+    Returns:
+        tuple: 包含点击次数 (int) 和最后点击日期 (str, YYYY-MM-DD 格式) 的元组。
+               如果文件不存在或读取失败，则返回 (0, None)。
+    """
+    try:
+        if os.path.exists(click_limit_file):
+            with open(click_limit_file, 'r', newline='', encoding='utf-8') as csvfile:
+                csv_reader = csv.reader(csvfile)
+                header = next(csv_reader, None)  # 读取并忽略 CSV 文件头
+                if header is None:  # 文件为空
+                    logging.warning("点击次数 CSV 文件为空，使用默认值。")
+                    return 0, None
+                row = next(csv_reader, None)  # 尝试读取数据行
+                if row:
+                    try:
+                        count = int(row[0]) if row[0] else 0  # 读取并转换点击次数
+                        last_date = row[1] if len(row) > 1 else None  # 读取日期
+                        logging.info(f"成功从 CSV 文件加载点击次数数据，次数: {count}, 日期: {last_date}")
+                        return count, last_date
+                    except ValueError:
+                        logging.error("CSV 文件中点击次数数据格式错误，使用默认值。")
+                        return 0, None  # 数据格式错误，返回默认值
+                else:
+                    logging.warning("点击次数 CSV 文件数据行缺失，使用默认值。")
+                    return 0, None  # 没有数据行, 返回默认值
+        else:
+            logging.info("点击次数 CSV 数据文件不存在，使用默认值。")
+            return 0, None  # 文件不存在，返回默认值
+    except FileNotFoundError:
+        logging.info("点击次数 CSV 数据文件未找到，使用默认值。")  # 更加明确的日志
+        return 0, None  # 文件未找到，返回默认值
+    except Exception as e:
+        logging.error(f"加载点击次数 CSV 数据失败: {e}")
+        return 0, None  # 加载 CSV 数据失败，返回默认值
+
+
+_sqlite_quota_store = None  # SQLite 点击次数存储，首次使用时创建
+_click_counter = None  # 内存点击次数（后台延迟写入 CSV），首次使用时创建
+
+
+def get_sqlite_quota_store():
+    """
+    获取共享的 SQLite 点击次数存储对象，首次调用时创建。
+
+    Returns:
+        SqliteQuotaStore: 点击次数存储对象。
+    """
+    global _sqlite_quota_store
+    if _sqlite_quota_store is None:
+        from quota_store import SqliteQuotaStore  # 按需导入，默认的 CSV 后端不需要 SQLite
+        _sqlite_quota_store = SqliteQuotaStore(click_quota_db_file, DAILY_CLICK_LIMIT)
+    return _sqlite_quota_store
+
+
+def get_click_counter():
+    """
+    获取内存中的单用户点击次数对象，首次调用时从 CSV 文件加载一次。
+
+    之后的点击只修改内存状态，由后台线程合并写入 CSV 文件；进程退出时自动写入最新状态。
+
+    Returns:
+        WriteBehindQuota: 点击次数对象。
+    """
+    global _click_counter
+    if _click_counter is None:
+        _click_counter = WriteBehindQuota(load_click_count_data, save_click_count_data, DAILY_CLICK_LIMIT)
+        atexit.register(_click_counter.close)
+    return _click_counter
+
+
+def close_click_counter():
+    """
+    停止后台写线程并把最新的点击次数写入 CSV 文件（例如在窗口关闭时调用）。
+    """
+    if _click_counter is not None:
+        _click_counter.close()
+
+
+@tracer.traced()
+def consume_click(current_date, user_id=LOCAL_USER_ID):
+    """
+    检查每日点击次数限制，未达到限制时记录一次点击。
+
+    如果上次点击日期不是今天，说明是新的一天，点击次数从 0 重新计算。
+    QUOTA_BACKEND 为 sqlite 时按用户计数并在一个事务中完成检查和计数，
+    否则使用内存中的单用户点击次数，由后台线程写入 CSV 文件，点击不会等待磁盘读写。
+
+    Args:
+        current_date (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+        user_id (str, optional): 用户 ID，仅 SQLite 后端使用，默认为本机用户。
+
+    Returns:
+        tuple: 是否允许本次点击 (bool) 和本次点击后的点击次数 (int)。
+    """
+    with metrics.QUOTA_CHECK_SECONDS.time():
+        if QUOTA_BACKEND == "sqlite":
+            allowed, click_count = get_sqlite_quota_store().check_and_increment(user_id, current_date)
+        else:
+            allowed, click_count = get_click_counter().check_and_increment(user_id, current_date)
+    (metrics.CLICKS if allowed else metrics.LIMIT_HITS).inc()
+    return allowed, click_count
+
+
+def peek_click_count(current_date, user_id=LOCAL_USER_ID):
+    """
+    读取用户今天已经使用的点击次数，不记录点击（用于提前检查是否还能获取答案）。
+
+    Args:
+        current_date (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+        user_id (str, optional): 用户 ID，仅 SQLite 后端使用，默认为本机用户。
+
+    Returns:
+        int: 今天已经使用的点击次数。
+    """
+    if QUOTA_BACKEND == "sqlite":
+        count, last_date = get_sqlite_quota_store().get(user_id)
+    else:
+        count, last_date = get_click_counter().get(user_id)
+    return count if last_date == current_date else 0
+
+
+_no_repeat_tracker = None  # 不重复抽取状态，首次使用时从文件加载
+
+
+def get_no_repeat_tracker(size):
+    """
+    获取不重复抽取状态对象，首次调用（或答案库大小变化）时从文件加载。
+
+    Args:
+        size (int): 答案库中的答案条数。
+
+    Returns:
+        NoRepeatTracker: 不重复抽取状态对象。
+    """
+    global _no_repeat_tracker
+    if _no_repeat_tracker is None or _no_repeat_tracker.size != size:
+        if _no_repeat_tracker is None:
+            atexit.register(save_no_repeat_state)
+        _no_repeat_tracker = NoRepeatTracker(size)
+        _no_repeat_tracker.load(no_repeat_file)
+    return _no_repeat_tracker
+
+
+def save_no_repeat_state():
+    """
+    把不重复抽取状态写入文件（例如在窗口关闭时调用）。
+    """
+    if _no_repeat_tracker is not None:
+        _no_repeat_tracker.save(no_repeat_file)
+
+
+_draw_history = None  # 抽取历史，首次使用时打开
+_draw_history_writer = None  # 抽取历史的后台写线程，首次使用时启动
+
+
+def get_draw_history():
+    """
+    获取抽取历史对象，首次调用时打开历史文件并恢复计数；未启用或打开失败时返回 None。
+
+    Returns:
+        DrawHistory: 抽取历史对象。
+    """
+    global _draw_history
+    if _draw_history is None and DRAW_HISTORY:
+        from draw_history import DrawHistory  # 按需导入，不计入启动耗时
+        try:
+            _draw_history = DrawHistory(draw_history_file)
+        except (OSError, ValueError) as e:
+            logging.error(f"打开抽取历史文件失败，本次运行不记录抽取历史: {e}")
+            return None
+        atexit.register(close_draw_history)
+    return _draw_history
+
+
+@tracer.traced()
+def get_draw_history_writer():
+    """
+    获取抽取历史的后台写线程，首次调用时启动；由后台线程打开历史文件并恢复计数。未启用时返回 None。
+
+    Returns:
+        DrawHistoryWriter: 后台写线程对象。
+    """
+    global _draw_history_writer
+    if _draw_history_writer is None and DRAW_HISTORY:
+        from draw_history import DrawHistoryWriter  # 按需导入，不计入启动耗时
+        _draw_history_writer = DrawHistoryWriter(get_draw_history)
+        atexit.register(close_draw_history)
+    return _draw_history_writer
+
+
+def record_draw(current_date, page_number, limited=False, user_id=LOCAL_USER_ID):
+    """
+    记录一次点击的结果到抽取历史。
+
+    只把记录交给后台写线程，点击不会等待磁盘读写；写入失败只记录日志，不影响点击。
+
+    Args:
+        current_date (str): 点击日期 (YYYY-MM-DD 格式)。
+        page_number (int): 抽到的页码，没有抽到答案时为 None。
+        limited (bool, optional): 是否因达到每日点击次数限制而没有抽取。
+        user_id (str, optional): 用户 ID，默认为本机用户。
+    """
+    writer = get_draw_history_writer()
+    if writer is None:
+        return
+    from draw_history import OUTCOME_DRAWN, OUTCOME_FAILED, OUTCOME_LIMITED
+    if limited:
+        outcome = OUTCOME_LIMITED
+    else:
+        outcome = OUTCOME_DRAWN if page_number is not None else OUTCOME_FAILED
+    writer.record(user_id, current_date, page_number, outcome)
+
+
+def close_draw_history():
+    """
+    写完排队的记录，再写入抽取历史的计数快照并关闭历史文件（例如在窗口关闭时调用）。
+    """
+    if _draw_history_writer is not None:
+        _draw_history_writer.close()
+    if _draw_history is not None:
+        _draw_history.close()
+
+
+def dump_metrics():
+    """
+    把运行指标的 JSON 快照写入 metrics_file（例如在窗口关闭时调用），写入失败只记录日志。
+    """
+    try:
+        metrics.registry.dump(metrics_file)
+    except OSError as e:
+        logging.error(f"写入运行指标快照失败: {e}")
+
+
+@metrics.DRAW_SECONDS.time()
+@tracer.traced()
+def draw_answer(answer_store, user_id=LOCAL_USER_ID, rng=random, click_index=None, current_date=None, peek=False):
+    """
+    从答案库中抽取一个答案项。
+
+    NO_REPEAT 为真时按用户做当天不重复抽取（均匀分布，忽略权重，本身也只由用户、日期和抽取次数决定），
+    流式加载的答案库在加载完成之前答案条数还在增长，先按普通方式抽取，加载完成后才启用不重复抽取；
+    SEEDED_DRAW 为真且提供了点击序号时做确定性抽取；否则按答案库的抽取方式随机抽取。
+
+    Args:
+        answer_store: 答案库对象（AnswerStore 或 BinaryCorpus）。
+        user_id (str, optional): 用户 ID，默认为本机用户。
+        rng (random.Random, optional): 随机数生成器，仅普通抽取使用。
+        click_index (int, optional): 当天的点击序号（从 0 开始），确定性抽取使用。
+        current_date (str, optional): 当前日期字符串 (YYYY-MM-DD 格式)，默认为今天。
+        peek (bool, optional): 只用于预取：不重复抽取模式下返回下一次将抽到的答案，但不记为已抽取，
+                               预取的答案被采用时再调用 commit_prefetched_draw。
+
+    Returns:
+        dict: 抽取到的答案项，答案库为空时返回 None。
+    """
+    if not NO_REPEAT and not (SEEDED_DRAW and click_index is not None):
+        return answer_store.draw(rng)
+    if NO_REPEAT and getattr(answer_store, 'loading', False):
+        return answer_store.draw(rng)  # 每批答案都会改变答案条数，不为此重建不重复抽取状态
+    if current_date is None:
+        current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    if not NO_REPEAT:
+        return seeded_draw(answer_store, user_id, current_date, click_index, DRAW_SEED_SALT)
+    tracker = get_no_repeat_tracker(len(answer_store))
+    if peek:
+        position = tracker.peek_position(user_id, current_date)
+    else:
+        position = tracker.next_position(user_id, current_date)
+    return None if position is None else answer_store.at(position)
+
+
+def commit_prefetched_draw(answer_store, current_date, page_number, user_id=LOCAL_USER_ID):
+    """
+    预取的答案被采用时调用：不重复抽取模式下把预取时查看的位置记为已抽取，其他模式下不需要做什么。
+
+    预取发生在答案库加载完成之前（按普通方式抽取）或答案库之后被替换时，预取的答案不是不重复抽取的下一个答案，
+    不记为已抽取。
+
+    Args:
+        answer_store: 当前的答案库对象。
+        current_date (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+        page_number (int): 预取答案的页码。
+        user_id (str, optional): 用户 ID，默认为本机用户。
+    """
+    if not NO_REPEAT or getattr(answer_store, 'loading', False):
+        return
+    tracker = get_no_repeat_tracker(len(answer_store))
+    position = tracker.peek_position(user_id, current_date)
+    if position is not None and int(answer_store.at(position)["page_number"]) == page_number:
+        tracker.next_position(user_id, current_date)
@@ -0,0 +1,312 @@
+"""
+答案之书热路径基准测试。
+
+覆盖:
+    - 不同答案库大小下的答案抽取延迟（app_core.draw_answer 抽取并格式化文本，不含界面和点击日志）
+    - 点击次数 CSV 的保存/加载往返，以及内存计数和 SQLite 计数
+    - answers.json 的 JSON 解析耗时和答案缓存命中（直接得到构建完成的答案库）耗时
+    - 每条答案的内存占用：每条答案一个字典、AnswerStore 列式存储、二进制答案库
+    - main_mac.py/main_win.py 从启动到首帧显示的冷启动耗时（需要显示器或 xvfb-run）
+
+结果以 JSON 格式输出，可以与上一次的结果对比，发现性能回退。
+
+用法示例:
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --output bench_new.json --fail-on-regression
+    python benchmark.py --sizes 350,10000000 --only draw
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import gc
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import app_core
+from answer_store import AnswerStore
+from binary_corpus import BinaryCorpus, build_corpus_bytes
+from corpus_cache import load_store_cached
+from quota_store import SqliteQuotaStore, WriteBehindQuota
+
+
+DEFAULT_SIZES = [350, 10_000, 100_000, 1_000_000]  # 默认测试的答案库大小，可用 --sizes 指定到 10M
+SUITES = ['draw', 'quota', 'json', 'memory', 'startup']  # 全部测试组
+
+
+def summarize(samples, per_op=1):
+    """
+    汇总一组耗时样本。
+
+    Args:
+        samples (list): 每轮耗时（秒）。
+        per_op (int): 每轮包含的操作次数，用于换算单次操作耗时。
+
+    Returns:
+        dict: 单次操作耗时的统计值（微秒）。
+    """
+    per_op_us = sorted(sample / per_op * 1e6 for sample in samples)
+    return {
+        "unit": "us",
+        "mean": round(statistics.fmean(per_op_us), 4),
+        "p50": round(per_op_us[len(per_op_us) // 2], 4),
+        "p99": round(per_op_us[min(len(per_op_us) - 1, int(len(per_op_us) * 0.99))], 4),
+        "rounds": len(per_op_us),
+    }
+
+
+def time_rounds(func, rounds, per_op=1):
+    """
+    重复执行 func 并统计耗时。
+
+    Args:
+        func (callable): 每轮执行的无参函数。
+        rounds (int): 轮数。
+        per_op (int): 每轮包含的操作次数。
+
+    Returns:
+        dict: 统计结果。
+    """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, per_op)
+
+
+def synthetic_answers(size):
+    """
+    生成指定大小的合成答案列表（复用少量字符串，控制内存占用）。
+    """
+    en_texts = ["YOU WILL NOT BE DISAPPOINTED", "SHOW YOUR APPRECIATION", "DON’T BET ON IT"]
+    cn_texts = ["您不会失望的", "表达您的感激之情", "不要押注"]
+    return [{"page_number": i + 1, "EN": en_texts[i % 3], "CN": cn_texts[i % 3]} for i in range(size)]
+
+
+def bench_draw(sizes):
+    """
+    答案抽取延迟：通过 show_answer 调用的 app_core.draw_answer 抽取一条答案（包括耗时指标），
+    再按 show_answer 的方式格式化文本；不包括 show_answer 的点击日志和界面更新。
+    """
+    results = {}
+    batch = 1000
+    rng = random.Random(0)
+    for size in sizes:
+        answers = synthetic_answers(size)
+        stores = {"store": AnswerStore(answers)}
+        stores["binary"] = BinaryCorpus(build_corpus_bytes(answers))
+        del answers
+        for kind, store in stores.items():
+            def run():
+                for _ in range(batch):
+                    item = app_core.draw_answer(store, rng=rng)
+                    f'{item["EN"]}\n{item["CN"]}'
+
+            results[f"draw.{kind}.{size}"] = time_rounds(run, 50, per_op=batch)
+        del stores
+    return results
+
+
+def bench_quota(work_dir):
+    """
+    点击次数读写：CSV 保存/加载往返、内存计数（后台写盘）和 SQLite 计数。
+    """
+    results = {}
+    original_click_limit_file = app_core.click_limit_file
+    app_core.click_limit_file = os.path.join(work_dir, "click_limit.csv")
+    try:
+        today = datetime.date.today().isoformat()
+
+        def csv_round_trip():
+            app_core.save_click_count_data(1, today)
+            app_core.load_click_count_data()
+
+        results["quota.csv_round_trip"] = time_rounds(csv_round_trip, 200)
+
+        counter = WriteBehindQuota(app_core.load_click_count_data, app_core.save_click_count_data, 10 ** 9)
+        results["quota.write_behind_check"] = time_rounds(
+            lambda: counter.check_and_increment(app_core.LOCAL_USER_ID, today), 2000)
+        counter.close()
+
+        store = SqliteQuotaStore(os.path.join(work_dir, "quota.sqlite3"), 10 ** 9)
+        results["quota.sqlite_check"] = time_rounds(lambda: store.check_and_increment("bench", today), 2000)
+        store.close()
+    finally:
+        app_core.click_limit_file = original_click_limit_file  # 恢复真实的点击记录路径
+    return results
+
+
+def bench_json(work_dir):
+    """
+    answers.json 的解析耗时，以及答案缓存命中时得到构建完成的答案库的耗时。
+    """
+    results = {}
+    json_path = app_core.json_file
+
+    def parse():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            json.load(f)
+
+    results["json.parse"] = time_rounds(parse, 50)
+    cache_path = os.path.join(work_dir, "answers_cache.pickle")
+    load_store_cached(json_path, cache_path)  # 预热，生成缓存
+    results["json.cache_warm"] = time_rounds(lambda: load_store_cached(json_path, cache_path), 50)
+    return results
+
+
+def bench_memory(sizes):
+    """
+    每条答案的内存占用（字节）。
+
+    dict_per_entry 为 json 解析得到的字典列表；mean 为由同一份数据构建的 AnswerStore（丢弃字典之后）；
+    binary 为二进制答案库的大小。每条答案的文本各不相同，避免字符串共享让结果偏小。
+    """
+    results = {}
+    for size in sizes:
+        text = json.dumps([
+            {"page_number": i + 1, "EN": f"ANSWER NUMBER {i} MAY SURPRISE YOU", "CN": f"第 {i} 个答案可能会让你惊讶"}
+            for i in range(size)
+        ], ensure_ascii=False)
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        answers = json.loads(text)
+        dict_bytes = tracemalloc.get_traced_memory()[0] - base
+        store = AnswerStore(answers)
+        binary_bytes = len(build_corpus_bytes(answers))
+        del answers
+        gc.collect()
+        store_bytes = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        del store
+        results[f"memory.{size}"] = {
+            "unit": "bytes/answer",
+            "mean": round(store_bytes / size, 1),
+            "dict_per_entry": round(dict_bytes / size, 1),
+            "binary": round(binary_bytes / size, 1),
+        }
+    return results
+
+
+def bench_startup(rounds=3):
+    """
+    冷启动耗时：启动 main 脚本，首帧显示后立即退出（BOOK_EXIT_AFTER_FIRST_FRAME=1）。
+
+    没有显示器时尝试使用 xvfb-run 提供虚拟显示，两者都不可用时跳过。
+    """
+    results = {}
+    command_prefix = []
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        xvfb_run = shutil.which('xvfb-run')
+        if not xvfb_run:
+            return {"startup": {"skipped": "没有显示器，也没有 xvfb-run"}}
+        command_prefix = [xvfb_run, '-a']
+    script = 'main_mac.py' if sys.platform == 'darwin' else 'main_win.py'
+    env = dict(os.environ, BOOK_EXIT_AFTER_FIRST_FRAME='1')
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        completed = subprocess.run(command_prefix + [sys.executable, script], env=env, cwd=app_dir,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120)
+        if completed.returncode != 0:
+            return {"startup": {"skipped": f"{script} 退出码 {completed.returncode}"}}
+        samples.append(time.perf_counter() - start)
+    results[f"startup.{script}"] = summarize(samples)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线结果对比。
+
+    Args:
+        results (dict): 本次结果。
+        baseline (dict): 基线结果。
+        threshold (float): 判定为回退的相对变化阈值，例如 0.1 表示慢 10%。
+
+    Returns:
+        list: 对比行 (名称, 单位, 基线均值, 本次均值, 相对变化, 是否回退)。
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or "mean" not in previous or "mean" not in current:
+            continue
+        change = (current["mean"] - previous["mean"]) / previous["mean"] if previous["mean"] else 0.0
+        rows.append((name, current.get("unit", ""), previous["mean"], current["mean"], change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    """
+    命令行入口。
+
+    Returns:
+        int: 进程退出码，启用 --fail-on-regression 且发现回退时为 1。
+    """
+    parser = argparse.ArgumentParser(description="答案之书热路径基准测试")
+    parser.add_argument('--only', choices=SUITES, action='append', help="只运行指定的测试组，可重复指定")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="抽取和内存测试的答案库大小，逗号分隔")
+    parser.add_argument('--output', default=None, help="结果 JSON 文件路径，默认输出到标准输出")
+    parser.add_argument('--baseline', default=None, help="用于对比的上一次结果 JSON 文件")
+    parser.add_argument('--threshold', type=float, default=0.10, help="判定为回退的相对变化阈值，默认 0.10")
+    parser.add_argument('--fail-on-regression', action='store_true', help="发现回退时以退出码 1 结束")
+    args = parser.parse_args(argv)
+
+    suites = args.only or SUITES
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        if 'draw' in suites:
+            results.update(bench_draw([int(size) for size in args.sizes.split(',') if size]))
+        if 'quota' in suites:
+            results.update(bench_quota(work_dir))
+        if 'json' in suites:
+            results.update(bench_json(work_dir))
+        if 'memory' in suites:
+            results.update(bench_memory([int(size) for size in args.sizes.split(',') if size]))
+        if 'startup' in suites:
+            results.update(bench_startup())
+
+    report = {
+        "meta": {
+            "time": datetime.datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        header = None
+        for name, unit, previous, current, change, is_regression in compare(results, baseline, args.threshold):
+            if (name.split('.')[0], unit) != header:
+                # 各测试组的单位不同（耗时为微秒，内存为每条答案的字节数），每组单独输出表头
+                header = (name.split('.')[0], unit)
+                print(f"{'名称':<36}{f'基线({unit})':>20}{f'本次({unit})':>20}{'变化':>10}", file=sys.stderr)
+            marker = '  <-- 回退' if is_regression else ''
+            print(f"{name:<36}{previous:>20.3f}{current:>20.3f}{change:>+10.1%}{marker}", file=sys.stderr)
+            regressed = regressed or is_regression
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+
+from answer_store import AnswerStore
+
+
+# ----- 二进制答案库格式 -----
+# 文件头: 魔数、版本号、标志位、答案条数、首个页码
+# 偏移表: 每条答案一条定长记录 (页码, EN 偏移, EN 长度, CN 偏移, CN 长度)，按页码升序排列
+# 字符串区: 所有 EN/CN 文本的 UTF-8 编码依次拼接，偏移相对于字符串区起点
+MAGIC = b"BOA1"  # 文件魔数
+VERSION = 1  # 格式版本号
+FLAG_DENSE = 0x1  # 页码连续（首页码起逐一递增），可按下标直接定位
+HEADER = struct.Struct("<4sHHII")  # 文件头结构
+RECORD = struct.Struct("<IIIII")  # 偏移表记录结构
+
+
+def build_corpus_bytes(answers):
+    """
+    将答案列表编码为二进制答案库的字节内容。
+
+    答案项先经过 AnswerStore 校验，重复页码和格式不正确的答案项不会写入。
+
+    Args:
+        answers (list): 答案列表，每项包含 'page_number'、'EN' 和 'CN'。
+
+    Returns:
+        bytes: 二进制答案库内容。
+    """
+    entries = sorted(AnswerStore(answers), key=lambda item: int(item["page_number"]))
+    if any(item.get("weight", 1) != 1 for item in entries):
+        logging.warning("二进制答案库不保存抽取权重，加载后将按均匀分布抽取")
+    records = []  # 偏移表记录
+    blob = bytearray()  # 字符串区
+    for item in entries:
+        en_bytes = str(item["EN"]).encode("utf-8")
+        cn_bytes = str(item["CN"]).encode("utf-8")
+        en_offset = len(blob)
+        blob += en_bytes
+        cn_offset = len(blob)
+        blob += cn_bytes
+        records.append(RECORD.pack(int(item["page_number"]), en_offset, len(en_bytes), cn_offset, len(cn_bytes)))
+
+    first_page = int(entries[0]["page_number"]) if entries else 0
+    flags = 0
+    if entries and int(entries[-1]["page_number"]) - first_page + 1 == len(entries):
+        flags |= FLAG_DENSE
+    header = HEADER.pack(MAGIC, VERSION, flags, len(entries), first_page)
+    return header + b"".join(records) + bytes(blob)
+
+
+def compile_binary_corpus(answers, output_path):
+    """
+    将答案列表编译为二进制答案库文件。
+
+    先写入临时文件再原子重命名：正在通过 mmap 读取旧文件的进程继续读取旧内容，不会读到被截断的文件。
+
+    Args:
+        answers (list): 答案列表。
+        output_path (str): 输出文件路径。
+    """
+    data = build_corpus_bytes(answers)
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, output_path)
+    logging.info(f"二进制答案库已写入: {output_path}, 大小: {len(data)} 字节")
+
+
+class _PageColumn:
+    """
+    偏移表中页码列的只读序列视图，供 bisect 二分查找使用，不会解码整张偏移表。
+    """
+
+    def __init__(self, corpus):
+        self._corpus = corpus
+
+    def __len__(self):
+        return len(self._corpus)
+
+    def __getitem__(self, position):
+        return self._corpus._record(position)[0]
+
+
+class BinaryCorpus:
+    """
+    二进制答案库读取器。
+
+    通过 mmap（或任意支持缓冲区协议的对象）访问答案库，只在抽中某条答案时才解码它的文本，
+    启动耗时和常驻内存不随答案库大小增长。接口与 AnswerStore 一致（len、get、draw）。
+    """
+
+    def __init__(self, buffer):
+        """
+        基于缓冲区构建读取器。
+
+        Args:
+            buffer: 二进制答案库内容，可以是 mmap、bytes 或 memoryview。
+
+        Raises:
+            ValueError: 缓冲区内容不是有效的二进制答案库。
+        """
+        self._buffer = buffer
+        self._mmap = None  # 由 open() 打开时持有的 mmap 对象
+        if len(buffer) < HEADER.size:
+            raise ValueError("二进制答案库文件过短")
+        magic, version, flags, count, first_page = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不支持的二进制答案库格式: magic={magic!r}, version={version}")
+        self._count = count
+        self._first_page = first_page
+        self._dense = bool(flags & FLAG_DENSE)
+        self._blob_offset = HEADER.size + RECORD.size * count  # 字符串区起点
+        if len(buffer) < self._blob_offset:
+            raise ValueError("二进制答案库偏移表不完整")
+        self._pages = _PageColumn(self)
+
+    @classmethod
+    def open(cls, path):
+        """
+        以只读 mmap 方式打开二进制答案库文件。
+
+        Args:
+            path (str): 二进制答案库文件路径。
+
+        Returns:
+            BinaryCorpus: 答案库读取器。
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            corpus = cls(mapped)
+        except ValueError:
+            mapped.close()
+            raise
+        corpus._mmap = mapped
+        return corpus
+
+    def close(self):
+        """
+        关闭底层 mmap（如果有）。
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._entry(position)
+
+    def _record(self, position):
+        """
+        读取偏移表中的一条记录。
+        """
+        return RECORD.unpack_from(self._buffer, HEADER.size + RECORD.size * position)
+
+    def _text(self, offset, length):
+        """
+        从字符串区解码一段 UTF-8 文本。
+        """
+        start = self._blob_offset + offset
+        return bytes(self._buffer[start:start + length]).decode("utf-8")
+
+    def _entry(self, position):
+        """
+        解码指定位置的答案项。
+        """
+        page_number, en_offset, en_length, cn_offset, cn_length = self._record(position)
+        return {
+            "page_number": page_number,
+            "EN": self._text(en_offset, en_length),
+            "CN": self._text(cn_offset, cn_length),
+        }
+
+    def at(self, position):
+        """
+        按位置（0 ~ len-1）读取并解码答案项。
+        """
+        return self._entry(position)
+
+    def _position(self, page_number):
+        """
+        查找页码在偏移表中的位置，页码连续时直接按下标定位，否则二分查找。
+
+        Returns:
+            int: 位置，如果页码不存在则返回 None。
+        """
+        if self._dense:
+            position = page_number - self._first_page
+            return position if 0 <= position < self._count else None
+        position = bisect.bisect_left(self._pages, page_number)
+        if position < self._count and self._pages[position] == page_number:
+            return position
+        return None
+
+    def get(self, page_number):
+        """
+        按页码查找答案项。
+
+        Args:
+            page_number (int): 页码。
+
+        Returns:
+            dict: 对应的答案项，如果页码不存在则返回 None。
+        """
+        position = self._position(page_number)
+        if position is None:
+            return None
+        return self._entry(position)
+
+    def draw(self, rng=random):
+        """
+        均匀随机抽取一个答案项，只解码被抽中的那一条。
+
+        Args:
+            rng (random.Random, optional): 随机数生成器，默认为 random 模块。
+
+        Returns:
+            dict: 随机抽取的答案项，如果答案库为空则返回 None。
+        """
+        if not self._count:
+            return None
+        return self._entry(rng.randrange(self._count))
+
+
+if __name__ == "__main__":
+    # 用法: python binary_corpus.py src/answers.json src/answers.bin
+    if len(sys.argv) != 3:
+        print("用法: python binary_corpus.py <answers.json> <answers.bin>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        compile_binary_corpus(json.load(f), sys.argv[2])
@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import pickle
+import time
+
+from answer_store import AnswerStore
+from corpus_utils import file_digest
+
+
+CACHE_VERSION = 2  # 缓存格式版本，格式变化时递增使旧缓存失效
+
+
+def _read_cache(cache_path):
+    """
+    读取缓存文件，读取失败或版本不符时返回 None。
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"答案缓存读取失败，将重新解析: {e}")
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != CACHE_VERSION:
+        return None
+    return payload
+
+
+def _write_cache(cache_path, payload):
+    """
+    原子写入缓存文件（先写临时文件再重命名），写入失败只记录日志。
+    """
+    temp_path = f"{cache_path}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"答案缓存写入失败: {e}")
+
+
+def load_store_cached(json_path, cache_path):
+    """
+    加载答案库，优先使用 ./data 下的缓存。
+
+    缓存中保存的是校验并构建完成的 AnswerStore（按列存放的答案、页码索引和加权采样器），
+    命中时直接反序列化，不再重复 JSON 解析、答案项校验、重复页码和缺口检查及列构建。
+
+    缓存以源文件的大小、修改时间和内容摘要为键：
+    - 大小和修改时间都一致时直接使用缓存（热启动，不读取源文件）；
+    - 大小一致但修改时间变化时（例如打包程序重新解压），比对内容摘要，一致则继续使用缓存；
+    - 其他情况重新解析 JSON、校验并重建缓存（冷启动）。
+
+    Args:
+        json_path (str): JSON 答案文件路径。
+        cache_path (str): 缓存文件路径。
+
+    Returns:
+        AnswerStore: 构建完成的答案库。
+
+    Raises:
+        json.JSONDecodeError: JSON 文件格式错误。
+        OSError: 源文件读取失败。
+    """
+    start = time.perf_counter()
+    stat = os.stat(json_path)
+    cached = _read_cache(cache_path)
+
+    if cached is not None and cached['size'] == stat.st_size:
+        if cached['mtime_ns'] == stat.st_mtime_ns:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logging.info(f"答案缓存命中（热启动），耗时 {elapsed_ms:.1f} ms")
+            return cached['store']
+        digest = file_digest(json_path)
+        if cached['sha256'] == digest:
+            # 内容未变，只更新修改时间，下次启动可以跳过摘要计算
+            cached['mtime_ns'] = stat.st_mtime_ns
+            _write_cache(cache_path, cached)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logging.info(f"答案缓存命中（内容摘要一致），耗时 {elapsed_ms:.1f} ms")
+            return cached['store']
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        # 解析、校验并构建答案库，页码缺口和重复在此时记录
+        store = AnswerStore(json.load(f))
+    _write_cache(cache_path, {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_digest(json_path),
+        'store': store,
+    })
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logging.info(f"答案缓存未命中（冷启动），已解析 JSON 并重建缓存，耗时 {elapsed_ms:.1f} ms")
+    return store
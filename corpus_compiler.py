@@ -0,0 +1,291 @@
+"""
+答案库编译工具。
+
+从一个或多个 CSV/TSV/JSON Lines/JSON 源文件读取答案（例如电子表格和翻译平台的导出文件），
+在进程池中并行解析和规范化各个源文件，再合并、去重、重新编号，写出程序可以直接加载的答案库。
+默认输出二进制答案库 src/answers.bin：程序启动时直接 mmap 打开，不再做任何解析和校验。
+
+源文件格式:
+    - .csv / .tsv: 第一行为表头，需要 EN 和 CN 列，可选 page_number 和 weight 列（列名不区分大小写）
+    - .jsonl: 每行一个答案项
+    - .json: 与 src/answers.json 相同的答案数组
+
+规范化:
+    - 所有文本做 Unicode NFC 规范化，去掉首尾空白，连续空白合并为一个空格
+    - EN 文本额外做兼容规范化 (NFKC)，全角字母和标点转为半角，弯引号转为直引号（DON’T -> DON'T）
+    - CN 文本保留全角标点
+
+用法示例:
+    python corpus_compiler.py answers.csv translations.tsv extra.jsonl -o src/answers.bin
+    python corpus_compiler.py src/answers.json --format json -o answers_clean.json
+    python corpus_compiler.py a.csv b.csv --keep-pages --jobs 4
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from binary_corpus import compile_binary_corpus
+from corpus_utils import normalize_cn, normalize_en
+
+
+DEFAULT_OUTPUT = "./src/answers.bin"  # 默认输出路径，程序启动时优先加载
+SOURCE_FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.jsonl': 'jsonl', '.json': 'json'}  # 扩展名 -> 源文件格式
+_FIELD_ALIASES = {'page_number': 'page_number', 'page': 'page_number', 'en': 'EN', 'cn': 'CN', 'weight': 'weight'}
+
+
+def _iter_source_rows(path, source_format):
+    """
+    逐行读取源文件。
+
+    Yields:
+        tuple: (行号或序号, 原始答案项字典)。
+    """
+    # utf-8-sig 会去掉电子表格导出文件开头的 BOM
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if source_format in ('csv', 'tsv'):
+            reader = csv.DictReader(f, delimiter='\t' if source_format == 'tsv' else ',')
+            for row in reader:
+                yield reader.line_num, row
+        elif source_format == 'jsonl':
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            answers = json.load(f)
+            if not isinstance(answers, list):
+                raise ValueError("JSON 源文件顶层不是数组")
+            for index, item in enumerate(answers, 1):
+                yield index, item
+
+
+def _normalize_row(row):
+    """
+    规范化并校验一条原始答案项。
+
+    Returns:
+        tuple: (page_number 或 None, EN, CN, weight 或 None)。
+
+    Raises:
+        ValueError: 答案项格式不正确。
+    """
+    if not isinstance(row, dict):
+        raise ValueError("答案项不是对象")
+    fields = {}
+    for key, value in row.items():
+        name = _FIELD_ALIASES.get(str(key).strip().lower()) if key is not None else None
+        if name is not None:
+            fields[name] = value.strip() if isinstance(value, str) else value
+
+    en = normalize_en(str(fields.get('EN') or ''))
+    cn = normalize_cn(str(fields.get('CN') or ''))
+    if not en or not cn:
+        raise ValueError("缺少 EN 或 CN 文本")
+
+    page_number = fields.get('page_number')
+    if page_number in (None, ''):
+        page_number = None
+    else:
+        try:
+            page_number = int(page_number)
+        except (TypeError, ValueError):
+            raise ValueError(f"页码不是整数: {page_number!r}") from None
+        if page_number < 1:
+            raise ValueError(f"页码必须为正整数: {page_number}")
+
+    weight = fields.get('weight')
+    if weight in (None, ''):
+        weight = None
+    else:
+        try:
+            weight = float(weight)
+        except (TypeError, ValueError):
+            raise ValueError(f"权重不是数字: {weight!r}") from None
+        if not weight > 0:
+            raise ValueError(f"权重必须为正数: {weight}")
+    return page_number, en, cn, weight
+
+
+def process_source(path):
+    """
+    解析并规范化一个源文件（在工作进程中执行）。
+
+    Args:
+        path (str): 源文件路径。
+
+    Returns:
+        tuple: (规范化后的答案行列表, 问题列表)。答案行为 (page_number, EN, CN, weight)，
+               问题为 "文件:行号: 原因" 形式的字符串。
+
+    Raises:
+        OSError: 源文件无法读取。
+        ValueError: 源文件格式不受支持或内容无法解析。
+    """
+    source_format = SOURCE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if source_format is None:
+        raise ValueError(f"不支持的源文件格式: {path}（支持 {', '.join(sorted(SOURCE_FORMATS))}）")
+    rows = []
+    problems = []
+    for line_number, row in _iter_source_rows(path, source_format):
+        try:
+            rows.append(_normalize_row(row))
+        except ValueError as e:
+            problems.append(f"{path}:{line_number}: {e}")
+    return rows, problems
+
+
+def merge_rows(sources_rows, keep_pages=False):
+    """
+    合并各源文件的答案行：按 EN（不区分大小写）和 CN 去重，保留先出现的一条，然后分配页码。
+
+    Args:
+        sources_rows (list): 按源文件顺序排列的答案行列表。
+        keep_pages (bool): 是否保留源文件中的页码；否则按合并后的顺序从 1 开始重新编号。
+
+    Returns:
+        tuple: (答案列表, 统计信息 dict)。
+
+    Raises:
+        ValueError: keep_pages 为 True 时，有答案项缺少页码或页码冲突。
+    """
+    seen = set()
+    merged = []
+    duplicates = 0
+    for rows in sources_rows:
+        for row in rows:
+            key = (row[1].casefold(), row[2])
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            merged.append(row)
+
+    if keep_pages:
+        missing = sum(1 for row in merged if row[0] is None)
+        if missing:
+            raise ValueError(f"有 {missing} 条答案缺少页码，无法保留原页码（去掉 --keep-pages 即可重新编号）")
+        used = {}
+        for row in merged:
+            if row[0] in used:
+                raise ValueError(f"页码 {row[0]} 冲突: {used[row[0]]!r} 与 {row[1]!r}")
+            used[row[0]] = row[1]
+        merged.sort(key=lambda row: row[0])
+        pages = [row[0] for row in merged]
+    else:
+        pages = range(1, len(merged) + 1)
+
+    answers = []
+    for page_number, (_, en, cn, weight) in zip(pages, merged):
+        item = {"page_number": page_number, "EN": en, "CN": cn}
+        if weight is not None and weight != 1:
+            item["weight"] = weight
+        answers.append(item)
+    return answers, {"answers": len(answers), "duplicates": duplicates}
+
+
+def compile_sources(paths, jobs=None, keep_pages=False):
+    """
+    并行读取并规范化所有源文件，合并为答案列表。
+
+    Args:
+        paths (list): 源文件路径列表，合并和去重按此顺序进行。
+        jobs (int, optional): 工作进程数，默认为 CPU 核数（不超过源文件个数）。
+        keep_pages (bool): 是否保留源文件中的页码。
+
+    Returns:
+        tuple: (答案列表, 统计信息 dict, 问题列表)。
+    """
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(process_source, paths))
+    else:
+        # 只有一个源文件或单进程时不启动进程池
+        results = [process_source(path) for path in paths]
+
+    problems = [problem for _, source_problems in results for problem in source_problems]
+    answers, stats = merge_rows([rows for rows, _ in results], keep_pages)
+    stats["rows"] = sum(len(rows) for rows, _ in results)
+    stats["invalid"] = len(problems)
+    return answers, stats, problems
+
+
+def write_output(answers, output_path, output_format):
+    """
+    写出编译结果：二进制答案库，或与 answers.json 相同格式的 JSON 文件（先写临时文件再原子替换）。
+
+    Raises:
+        ValueError: 输出二进制答案库但有答案的权重不为 1（二进制格式不保存权重）。
+    """
+    if output_format == 'bin':
+        weighted = sum(1 for item in answers if item.get("weight", 1) != 1)
+        if weighted:
+            raise ValueError(f"有 {weighted} 条答案的抽取权重不为 1，二进制答案库不保存权重，"
+                             f"请改用 --format json 输出")
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if output_format == 'bin':
+        compile_binary_corpus(answers, output_path)
+        return
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(answers, f, ensure_ascii=False, indent=4)
+    os.replace(temp_path, output_path)
+    logging.info(f"答案文件已写入: {output_path}")
+
+
+def main(argv=None):
+    """
+    命令行入口。
+
+    Returns:
+        int: 进程退出码。
+    """
+    parser = argparse.ArgumentParser(description="把 CSV/TSV/JSON Lines/JSON 答案源文件编译为答案库")
+    parser.add_argument('sources', nargs='+', help="源文件路径，按顺序合并，重复的答案保留先出现的一条")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help=f"输出路径，默认 {DEFAULT_OUTPUT}")
+    parser.add_argument('--format', choices=['bin', 'json'], default='bin',
+                        help="输出格式: bin（二进制答案库，默认）或 json（answers.json 格式，保留权重）")
+    parser.add_argument('--keep-pages', action='store_true', help="保留源文件中的页码，不重新编号")
+    parser.add_argument('--jobs', type=int, default=None, help="并行解析的进程数，默认为 CPU 核数")
+    parser.add_argument('--strict', action='store_true', help="有格式不正确的答案行时不写出结果")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    start = time.perf_counter()
+    try:
+        answers, stats, problems = compile_sources(args.sources, args.jobs, args.keep_pages)
+    except (OSError, ValueError, csv.Error) as e:
+        # json.JSONDecodeError 和 UnicodeDecodeError 都是 ValueError 的子类
+        logging.error(f"编译答案库失败: {e}")
+        return 1
+
+    for problem in problems[:20]:
+        logging.warning(f"已跳过格式不正确的答案行 {problem}")
+    if len(problems) > 20:
+        logging.warning(f"另有 {len(problems) - 20} 行格式不正确，已跳过")
+    logging.info(f"共读取 {stats['rows']} 条，跳过 {stats['invalid']} 条格式不正确的行，"
+                 f"去掉 {stats['duplicates']} 条重复答案，输出 {stats['answers']} 条")
+    if args.strict and problems:
+        logging.error("存在格式不正确的答案行 (--strict)，未写出结果")
+        return 1
+    if not answers:
+        logging.error("没有可用的答案，未写出结果")
+        return 1
+
+    try:
+        write_output(answers, args.output, args.format)
+    except (OSError, ValueError) as e:
+        logging.error(f"编译答案库失败: {e}")
+        return 1
+    logging.info(f"编译完成，耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+答案库相关模块共用的小工具：源文件内容摘要和答案文本规范化。
+
+只依赖标准库，答案缓存、检索索引和编译工具都从这里导入，运行时的加载和检索路径不需要导入编译工具。
+"""
+import hashlib
+import re
+import unicodedata
+
+
+_WHITESPACE_RUN = re.compile(r'\s+')
+# EN 文本中的弯引号和常见排版标点，NFKC 不会转换它们
+_EN_PUNCTUATION = str.maketrans({
+    '‘': "'", '’': "'", '‚': "'", '′': "'",
+    '“': '"', '”': '"', '„': '"', '″': '"',
+    '–': '-', '—': '-', '…': '...',
+})
+
+
+def file_digest(path):
+    """
+    计算文件内容的 SHA-256 摘要。
+
+    Args:
+        path (str): 文件路径。
+
+    Returns:
+        str: 十六进制摘要字符串。
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_en(text):
+    """
+    规范化英文答案文本：NFKC、弯引号转直引号、合并空白。
+    """
+    text = unicodedata.normalize('NFKC', text).translate(_EN_PUNCTUATION)
+    return _WHITESPACE_RUN.sub(' ', text).strip()
+
+
+def normalize_cn(text):
+    """
+    规范化中文答案文本：NFC、合并空白，全角标点保持不变。
+    """
+    text = unicodedata.normalize('NFC', text)
+    return _WHITESPACE_RUN.sub(' ', text).strip()
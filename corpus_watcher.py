@@ -0,0 +1,197 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+
+# ----- inotify 常量（见 <sys/inotify.h>） -----
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_IN_NONBLOCK = os.O_NONBLOCK
+_EVENT_HEAD = struct.Struct("iIII")  # inotify_event: wd, mask, cookie, len
+
+POLL_INTERVAL = 1.0  # 轮询方式下检查文件修改时间的间隔（秒）
+SETTLE_TIME = 0.2  # 文件停止变化多久后才重新加载（秒），避免读到写了一半的文件
+
+
+class _Inotify:
+    """
+    通过 ctypes 调用 Linux inotify，监视若干目录中指定文件名的变化。
+    """
+
+    def __init__(self, paths):
+        """
+        Raises:
+            OSError: 当前系统不支持 inotify。
+        """
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError("找不到 C 运行库")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("当前系统不支持 inotify")
+        self.fd = libc.inotify_init1(_IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._names = {}  # 监视描述符 -> 该目录下需要关注的文件名集合
+        # 监视文件所在的目录而不是文件本身，这样先写临时文件再重命名替换时也能收到事件
+        for directory in {os.path.dirname(os.path.abspath(path)) for path in paths}:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"无法监视目录: {directory}")
+            self._names[wd] = {
+                os.fsencode(os.path.basename(path)) for path in paths
+                if os.path.dirname(os.path.abspath(path)) == directory
+            }
+
+    def wait(self, timeout):
+        """
+        等待被监视的文件发生变化。
+
+        Returns:
+            bool: 超时前是否有被监视的文件发生变化。
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        changed = False
+        offset = 0
+        while offset + _EVENT_HEAD.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT_HEAD.unpack_from(data, offset)
+            offset += _EVENT_HEAD.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name in self._names.get(wd, ()):
+                changed = True
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CorpusWatcher:
+    """
+    答案库热加载。
+
+    后台线程监视答案文件（Linux 上使用 inotify，其他系统按修改时间轮询），文件变化并稳定后
+    在后台线程中重新加载答案库并构建索引，再通过回调把新的答案库对象整体替换进来。
+    替换只是一次引用赋值：正在进行的抽取继续使用它已取到的旧对象，不会读到一半新一半旧的数据，
+    加载大答案库期间抽取也不会暂停。新文件加载失败时保留旧答案库。
+    """
+
+    def __init__(self, paths, load, on_reload, poll_interval=POLL_INTERVAL):
+        """
+        Args:
+            paths (list): 需要监视的文件路径（文件可以暂时不存在）。
+            load (callable): 加载答案库的无参函数，返回 (答案库对象, 错误提示)，与 app_core.load_answer_store 相同。
+            on_reload (callable): 加载成功后以新答案库对象为参数调用，在后台线程中执行。
+            poll_interval (float, optional): 轮询间隔（秒），仅在不支持 inotify 时使用。
+        """
+        self.paths = list(paths)
+        self._load = load
+        self._on_reload = on_reload
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload_count = 0  # 成功重新加载的次数
+
+    def _signature(self):
+        """
+        所有被监视文件的 (修改时间, 大小)，文件不存在时为 None。
+        """
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def start(self):
+        """
+        启动后台监视线程。
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="corpus-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止后台监视线程。
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        """
+        后台线程主循环：等待文件变化，稳定后重新加载。
+        """
+        try:
+            notifier = _Inotify(self.paths)
+            logging.info("答案库热加载已启用 (inotify)")
+        except (OSError, AttributeError) as e:
+            notifier = None
+            logging.info(f"答案库热加载已启用 (每 {self.poll_interval} 秒检查修改时间): {e}")
+
+        loaded = self._signature()  # 当前答案库对应的文件签名
+        try:
+            while not self._stop.is_set():
+                if notifier is not None:
+                    if not notifier.wait(self.poll_interval):
+                        continue
+                elif self._stop.wait(self.poll_interval) or self._signature() == loaded:
+                    continue
+                signature = self._wait_settled()
+                # 等待稳定期间积压的事件可能对应已经加载过的内容，签名未变时不重复加载
+                if signature is not None and signature != loaded:
+                    loaded = signature
+                    self.reload()
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def _wait_settled(self):
+        """
+        等待文件在 SETTLE_TIME 内不再变化，返回稳定后的文件签名；监视被停止时返回 None。
+        """
+        signature = self._signature()
+        while not self._stop.wait(SETTLE_TIME):
+            current = self._signature()
+            if current == signature:
+                return signature
+            signature = current
+        return None
+
+    def reload(self):
+        """
+        立即重新加载答案库，成功时调用 on_reload。
+
+        Returns:
+            bool: 是否加载成功。
+        """
+        start = time.perf_counter()
+        answer_store, load_error = self._load()
+        if load_error:
+            logging.error(f"答案库重新加载失败，继续使用旧答案库: {load_error}")
+            return False
+        self._on_reload(answer_store)
+        self.reload_count += 1
+        logging.info(f"答案库已重新加载，共 {len(answer_store)} 条答案，耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
@@ -0,0 +1,428 @@
+"""
+抽取历史记录。
+
+每次点击追加一条定长二进制记录（时间戳、日期、用户、页码、点击结果）到只追加的历史文件，
+并在内存中维护按天和按页码的计数：本进程追加的记录在追加时直接计入，查询只读取计数，不需要扫描整个历史。
+计数快照在关闭时写入旁路文件，下次打开时只重放快照之后追加的记录。
+
+多个进程（例如同时运行的两个桌面程序或服务的工作进程）可以写同一个历史文件：
+追加记录、分配用户序号和写计数快照都在文件锁内进行。追加前先计入其他进程追加的记录，
+查询时只有文件长度超过已计入的长度（其他进程有新记录）才取文件锁重放，因此每个进程看到的都是所有进程的记录。
+
+用法示例:
+    python draw_history.py --day 2026-01-01
+    python draw_history.py --page 42
+    python draw_history.py --top 10
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import mmap
+import os
+import pickle
+import queue
+import struct
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ----- 历史文件格式 -----
+# 文件头: 魔数、版本号
+# 记录: 时间戳（毫秒）、日期序数 (date.toordinal)、用户序号、页码（没有抽到答案时为 0）、点击结果
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<qIIIB")
+MAGIC = b"BDH1"
+VERSION = 1
+STATS_VERSION = 1  # 计数快照格式版本
+
+# 点击结果
+OUTCOME_DRAWN = 0  # 抽到并显示了答案
+OUTCOME_LIMITED = 1  # 已达到每日点击次数限制
+OUTCOME_FAILED = 2  # 允许点击但未能获取答案
+OUTCOME_NAMES = ("drawn", "limited", "failed")
+
+
+@contextlib.contextmanager
+def _locked(lock_file):
+    """
+    持有锁文件的排他锁（跨进程），退出时释放。
+    """
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)  # 锁不到时每秒重试，最多 10 次
+        try:
+            yield
+        finally:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DrawHistory:
+    """
+    只追加的抽取历史及其按天、按页码的计数。
+
+    历史文件旁边有三个附属文件：<历史文件>.users（用户 ID，每行一个，行号即用户序号）、
+    <历史文件>.stats（计数快照及其对应的历史文件长度）和 <历史文件>.lock（跨进程文件锁）。
+    可以在多个线程和多个进程中调用 record()。
+    """
+
+    def __init__(self, path):
+        """
+        打开（或创建）历史文件并恢复计数。
+
+        Args:
+            path (str): 历史文件路径。
+        """
+        self.path = path
+        self._users_path = f"{path}.users"
+        self._stats_path = f"{path}.stats"
+        self._lock = threading.Lock()  # 串行化本进程内的文件读写
+        self._counts_lock = threading.Lock()  # 保护计数，只在更新和读取计数时短暂持有，不会等待文件锁
+        self._days = {}  # 日期序数 -> [各点击结果的次数]
+        self._pages = {}  # 页码 -> 抽到的次数
+        self._records = 0  # 已计入计数的记录数
+        self._offset = HEADER.size  # 已计入计数的历史文件长度
+        self._users = []  # 用户序号 -> 用户 ID
+        self._user_numbers = {}  # 用户 ID -> 用户序号
+
+        self._lock_file = open(f"{path}.lock", 'a+b')
+        self._file = open(path, 'a+b')
+        try:
+            with _locked(self._lock_file):
+                self._reload_users()
+                size = self._file.seek(0, os.SEEK_END)
+                if size == 0:
+                    self._file.write(HEADER.pack(MAGIC, VERSION))
+                    self._file.flush()
+                    size = HEADER.size
+                else:
+                    self._file.seek(0)
+                    magic, version = HEADER.unpack(self._file.read(HEADER.size))
+                    if magic != MAGIC or version != VERSION:
+                        raise ValueError(f"不支持的抽取历史文件格式: magic={magic!r}, version={version}")
+                    tail = (size - HEADER.size) % RECORD.size
+                    if tail:
+                        # 写到一半时崩溃留下的不完整记录（记录都在文件锁内写入，不会是其他进程正在写的）
+                        logging.warning(f"抽取历史文件末尾有 {tail} 字节不完整的记录，已截断")
+                        size -= tail
+                        self._file.truncate(size)
+                self._restore(size)
+        except BaseException:
+            self._file.close()
+            self._lock_file.close()
+            raise
+
+    def _reload_users(self):
+        """
+        读取用户文件中其他进程新添加的用户（需持有文件锁）。
+        """
+        try:
+            with open(self._users_path, 'r', encoding='utf-8', newline='') as f:
+                lines = f.read().split('\n')[:-1]
+        except FileNotFoundError:
+            return
+        for user_id in lines[len(self._users):]:
+            self._user_numbers.setdefault(user_id, len(self._users))
+            self._users.append(user_id)
+
+    def _restore(self, size):
+        """
+        加载计数快照，再重放快照之后追加的记录；快照不可用时重放整个历史文件（需持有文件锁）。
+
+        快照中的计数恰好对应历史文件的前 offset 字节，offset 超出文件长度或不在记录边界上时
+        说明历史文件已被替换，快照作废。
+        """
+        try:
+            with open(self._stats_path, 'rb') as f:
+                stats = pickle.load(f)
+            offset = stats['offset']
+            if (stats.get('version') == STATS_VERSION and HEADER.size <= offset <= size
+                    and (offset - HEADER.size) % RECORD.size == 0):
+                self._days, self._pages, self._records, self._offset = (
+                    stats['days'], stats['pages'], stats['records'], offset)
+            else:
+                logging.warning("抽取历史计数快照与历史文件不一致，将重新统计")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"抽取历史计数快照读取失败，将重新统计: {e}")
+        if self._offset < size:
+            start = time.perf_counter()
+            records = (size - self._offset) // RECORD.size
+            self._replay(size)
+            logging.info(f"已重放 {records} 条抽取历史记录，耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _replay(self, size):
+        """
+        通过 mmap 顺序读取 [已计入的长度, size) 范围的记录并累加计数。
+        """
+        offset = self._offset
+        with mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view, self._counts_lock:
+                for _, day, _, page_number, outcome in RECORD.iter_unpack(view[offset:size]):
+                    self._count(day, page_number, outcome)
+                self._records += (size - offset) // RECORD.size
+                self._offset = size
+
+    def _count(self, day, page_number, outcome):
+        """
+        把一条记录计入计数（需持有计数锁）。
+        """
+        counts = self._days.get(day)
+        if counts is None:
+            counts = self._days[day] = [0] * len(OUTCOME_NAMES)
+        counts[outcome] += 1
+        if outcome == OUTCOME_DRAWN:
+            self._pages[page_number] = self._pages.get(page_number, 0) + 1
+
+    def _sync(self):
+        """
+        把其他进程追加、尚未计入的记录计入计数（需持有文件锁）。
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        if size > self._offset:
+            self._replay(size)
+
+    def _refresh(self):
+        """
+        查询前计入其他进程新追加的记录；没有其他进程的新记录时（通常情况）只做一次 fstat，不取文件锁。
+        """
+        if os.fstat(self._file.fileno()).st_size > self._offset:
+            with self._lock, _locked(self._lock_file):
+                self._sync()
+
+    def _user_number(self, user_id):
+        """
+        返回用户序号，新用户追加到用户文件（需持有文件锁，序号由文件中的行号决定，各进程一致）。
+        """
+        number = self._user_numbers.get(user_id)
+        if number is None:
+            self._reload_users()  # 其他进程可能已经添加了该用户
+            number = self._user_numbers.get(user_id)
+        if number is None:
+            number = len(self._users)
+            with open(self._users_path, 'a', encoding='utf-8', newline='') as f:
+                f.write(user_id + '\n')
+            self._users.append(user_id)
+            self._user_numbers[user_id] = number
+        return number
+
+    def record(self, user_id, date_str, page_number, outcome, timestamp_ms=None):
+        """
+        追加一条抽取记录并计入计数。
+
+        Args:
+            user_id (str): 用户 ID。
+            date_str (str): 点击日期 (YYYY-MM-DD 格式)，与点击次数限制使用的日期相同。
+            page_number (int): 抽到的页码，没有抽到答案时为 None。
+            outcome (int): 点击结果（OUTCOME_* 常量）。
+            timestamp_ms (int, optional): 点击时刻（毫秒时间戳），默认为当前时间。
+        """
+        day = datetime.date.fromisoformat(date_str).toordinal()
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        user_id = user_id.replace('\n', ' ')  # 用户 ID 不能包含换行，否则会破坏用户文件的行号
+        page_number = page_number or 0
+        with self._lock, _locked(self._lock_file):
+            self._sync()  # 先计入其他进程追加的记录，本条记录紧接在已计入的长度之后
+            self._file.write(RECORD.pack(timestamp_ms, day, self._user_number(user_id), page_number, outcome))
+            self._file.flush()  # 只交给操作系统，不等待落盘
+            with self._counts_lock:
+                self._count(day, page_number, outcome)
+                self._records += 1
+                self._offset += RECORD.size
+
+    def __len__(self):
+        self._refresh()
+        return self._records
+
+    def day_stats(self, date_str):
+        """
+        某一天各点击结果的次数。
+
+        Returns:
+            dict: 点击结果名称 -> 次数。
+        """
+        self._refresh()
+        day = datetime.date.fromisoformat(date_str).toordinal()
+        with self._counts_lock:
+            counts = list(self._days.get(day) or [0] * len(OUTCOME_NAMES))
+        return dict(zip(OUTCOME_NAMES, counts))
+
+    def page_count(self, page_number):
+        """
+        某一页被抽到的总次数。
+        """
+        self._refresh()
+        return self._pages.get(page_number, 0)
+
+    def days(self):
+        """
+        有记录的日期 (YYYY-MM-DD 格式)，按时间顺序排列。
+        """
+        self._refresh()
+        with self._counts_lock:
+            days = sorted(self._days)
+        return [datetime.date.fromordinal(day).isoformat() for day in days]
+
+    def top_pages(self, count=10):
+        """
+        被抽到次数最多的页码。
+
+        Returns:
+            list: [(页码, 次数), ...]，按次数从高到低排列。
+        """
+        self._refresh()
+        with self._counts_lock:
+            items = list(self._pages.items())
+        return sorted(items, key=lambda item: (-item[1], item[0]))[:count]
+
+    def iter_records(self):
+        """
+        从头顺序读取所有记录（分块读取，不会一次读入内存）。
+
+        Yields:
+            tuple: (时间戳毫秒, 日期字符串, 用户 ID, 页码, 点击结果)。
+        """
+        with self._lock, _locked(self._lock_file):
+            self._reload_users()  # 其他进程写入的记录可能引用新用户
+            remaining = os.fstat(self._file.fileno()).st_size - HEADER.size
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER.size)
+            while remaining > 0:
+                chunk = f.read(min(remaining, RECORD.size * 4096))
+                remaining -= len(chunk)
+                for timestamp, day, user, page_number, outcome in RECORD.iter_unpack(chunk):
+                    yield (timestamp, datetime.date.fromordinal(day).isoformat(), self._users[user],
+                           page_number, outcome)
+
+    def save_stats(self):
+        """
+        把计数快照原子写入旁路文件，下次打开时只需重放之后追加的记录。
+
+        先在文件锁内计入所有进程追加的记录，快照中的计数与 offset 一致；
+        多个进程先后写快照时，后写的快照覆盖先写的，但每个快照本身都是完整的。
+        """
+        with self._lock, _locked(self._lock_file):
+            self._sync()
+            with self._counts_lock:
+                payload = pickle.dumps({
+                    'version': STATS_VERSION,
+                    'offset': self._offset,
+                    'records': self._records,
+                    'days': self._days,
+                    'pages': self._pages,
+                }, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path = f"{self._stats_path}.tmp"
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(temp_path, self._stats_path)
+            except Exception as e:
+                logging.warning(f"抽取历史计数快照写入失败: {e}")
+
+    def close(self):
+        """
+        写入计数快照并关闭历史文件。
+        """
+        if self._file.closed:
+            return
+        self.save_stats()
+        with self._lock:
+            self._file.close()
+            self._lock_file.close()
+
+
+class DrawHistoryWriter:
+    """
+    在后台线程中打开抽取历史并写入记录。
+
+    record() 只把记录放入队列，点击不会等待打开历史文件、重放或写盘。
+    """
+
+    def __init__(self, open_history):
+        """
+        Args:
+            open_history (callable): 无参函数，在后台线程中调用，返回 DrawHistory（打开失败时返回 None）。
+        """
+        self._open_history = open_history
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="draw-history-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, user_id, date_str, page_number, outcome):
+        """
+        记录一次点击的结果（参数同 DrawHistory.record），时间戳取调用时刻。
+        """
+        self._queue.put((user_id, date_str, page_number, outcome, int(time.time() * 1000)))
+
+    def _run(self):
+        history = self._open_history()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if history is None:
+                continue  # 历史文件打开失败，丢弃记录
+            try:
+                history.record(*item)
+            except (OSError, ValueError) as e:
+                logging.error(f"写入抽取历史失败: {e}")
+
+    def close(self, timeout=5):
+        """
+        写完队列中的记录后停止后台线程（不关闭历史文件）。
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+def main(argv=None):
+    """
+    命令行入口：查询抽取历史统计，结果以 JSON 格式输出。
+    """
+    import app_core  # 按需导入，只在命令行查询时需要默认路径
+    parser = argparse.ArgumentParser(description="查询答案之书的抽取历史统计")
+    parser.add_argument('--file', default=app_core.draw_history_file, help="抽取历史文件路径")
+    parser.add_argument('--day', action='append', default=[], help="查询某一天各点击结果的次数 (YYYY-MM-DD)，可重复")
+    parser.add_argument('--page', type=int, action='append', default=[], help="查询某一页被抽到的次数，可重复")
+    parser.add_argument('--top', type=int, default=0, help="列出被抽到次数最多的 N 个页码")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not os.path.exists(args.file):
+        print(f"抽取历史文件不存在: {args.file}", file=sys.stderr)
+        return 1
+    history = DrawHistory(args.file)
+    try:
+        result = {"records": len(history)}
+        days = args.day or history.days()
+        result["days"] = {day: history.day_stats(day) for day in days}
+        if args.page:
+            result["pages"] = {page: history.page_count(page) for page in args.page}
+        if args.top:
+            result["top_pages"] = history.top_pages(args.top)
+    finally:
+        history.close()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
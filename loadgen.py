@@ -0,0 +1,144 @@
+"""
+答案服务的本地压测工具。
+
+通过若干条 keep-alive 连接向答案服务并发发送 /draw 请求，统计每秒请求数和 p50/p99 延迟。
+使用 --self-host 时在同一进程内以随机端口启动答案服务，不依赖任何外部服务。
+
+用法示例:
+    python loadgen.py --self-host --connections 32 --requests 20000
+    python loadgen.py --host 127.0.0.1 --port 8080 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import server
+
+
+def percentile(sorted_values, fraction):
+    """
+    计算已排序序列的分位数（最近秩法）。
+
+    Args:
+        sorted_values (list): 升序排列的数值。
+        fraction (float): 分位点，例如 0.99。
+
+    Returns:
+        float: 分位数，序列为空时返回 0。
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+async def _worker(host, port, worker_id, users, deadline, remaining, latencies, statuses):
+    """
+    单条连接上的压测循环：发送请求、读取完整响应、记录延迟，直到达到请求总数或截止时间。
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    sequence = 0
+    try:
+        while remaining[0] > 0 and time.perf_counter() < deadline:
+            remaining[0] -= 1
+            user_id = f"user-{(worker_id * 7919 + sequence) % users}"
+            sequence += 1
+            request = (f"GET /draw?user={user_id} HTTP/1.1\r\n"
+                       f"Host: {host}\r\nConnection: keep-alive\r\n\r\n")
+            start = time.perf_counter()
+            writer.write(request.encode('latin-1'))
+            head = await reader.readuntil(b'\r\n\r\n')
+            status_line, _, header_block = head.decode('latin-1').partition('\r\n')
+            content_length = 0
+            for line in header_block.split('\r\n'):
+                name, _, value = line.partition(':')
+                if name.strip().lower() == 'content-length':
+                    content_length = int(value.strip())
+            await reader.readexactly(content_length)
+            latencies.append(time.perf_counter() - start)
+            status = int(status_line.split(' ', 2)[1])
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, connections, requests, duration, users):
+    """
+    执行一次压测。
+
+    Args:
+        host (str): 答案服务地址。
+        port (int): 答案服务端口。
+        connections (int): 并发连接数。
+        requests (int): 请求总数。
+        duration (float): 最长压测时间（秒）。
+        users (int): 模拟的用户数量，请求在这些用户之间轮换。
+
+    Returns:
+        dict: 压测结果（请求数、每秒请求数、p50/p99 延迟毫秒数、状态码分布）。
+    """
+    latencies = []
+    statuses = {}
+    remaining = [requests]  # 所有连接共享的剩余请求数（只在事件循环线程中修改）
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _worker(host, port, worker_id, users, deadline, remaining, latencies, statuses)
+        for worker_id in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def _main_async(args):
+    """
+    根据参数决定是否在进程内启动答案服务，然后执行压测。
+    """
+    host, port = args.host, args.port
+    listener = None
+    if args.self_host:
+        listener, _ = await server.create_server('127.0.0.1', 0, limit=args.limit, quota_backend=args.quota)
+        host, port = listener.sockets[0].getsockname()[:2]
+    try:
+        return await run_load(host, port, args.connections, args.requests, args.duration, args.users)
+    finally:
+        if listener is not None:
+            listener.close()
+            await listener.wait_closed()
+
+
+def main(argv=None):
+    """
+    命令行入口，以 JSON 格式输出压测结果。
+    """
+    parser = argparse.ArgumentParser(description="答案服务本地压测工具")
+    parser.add_argument('--host', default='127.0.0.1', help="答案服务地址")
+    parser.add_argument('--port', type=int, default=8080, help="答案服务端口")
+    parser.add_argument('--self-host', action='store_true', help="在本进程内以随机端口启动答案服务")
+    parser.add_argument('--limit', type=int, default=1_000_000_000,
+                        help="--self-host 时每个用户每天允许点击的最大次数，默认几乎不限制")
+    parser.add_argument('--quota', choices=['sqlite', 'memory'], default='memory',
+                        help="--self-host 时的点击次数存储后端，默认 memory")
+    parser.add_argument('--connections', type=int, default=16, help="并发连接数，默认 16")
+    parser.add_argument('--requests', type=int, default=10000, help="请求总数，默认 10000")
+    parser.add_argument('--duration', type=float, default=60.0, help="最长压测时间（秒），默认 60")
+    parser.add_argument('--users', type=int, default=1000, help="模拟的用户数量，默认 1000")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(_main_async(args))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
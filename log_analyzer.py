@@ -0,0 +1,322 @@
+"""
+日志分析工具。
+
+扫描 log.log（以及轮转出的 log.log.1 等），统计每天的应用启动次数、点击次数、达到每日限制的次数、
+抽中的页码 (r_num) 和错误，输出汇总表。日志格式见 logging_setup.LOG_FORMAT。
+
+点击日志采样（BOOK_LOG_SAMPLE_RATE 小于 1）时，程序启动时记录的采样率按天汇总并在结果中标注；
+统计依据的点击和 r_num 行不参与采样，次数不需要换算，被采样的只有其他点击明细日志。
+
+文件通过 mmap 映射，按字节范围（对齐到行首）切分，在进程池中并行扫描后合并结果。
+每个范围内按日期二分切分为按天连续的片段，用 bytes.count 和以字面量开头的正则在 C 层直接统计，
+不逐行进入 Python；日志顺序错乱（例如多个实例同时写入跨过午夜）的片段自动改为逐行扫描。
+
+用法示例:
+    python log_analyzer.py data/log.log data/log.log.1
+    python log_analyzer.py --jobs 8 --top 20 big.log
+    python log_analyzer.py --json data/log.log > summary.json
+"""
+import argparse
+import concurrent.futures
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from logging_setup import SAMPLE_RATE_MESSAGE
+
+
+CHUNK_BYTES = 64 * 1024 * 1024  # 每个并行任务扫描的字节数
+ERROR_MESSAGE_CHARS = 120  # 错误消息汇总时保留的最大字符数
+EVENTS = ("launches", "clicks", "limit_hits", "draws", "errors")  # 按天统计的事件
+# 日志行: "2026-01-01 12:00:00,123 - INFO - 消息"，只匹配关心的几类行（逐行扫描，用于日期不连续的片段）
+_LINE = re.compile((
+    r'^(\d{4}-\d\d-\d\d) [\d:,]+ - (?:'
+    rf'INFO - (?:(应用启动)\r?$|(用户点击了)|本轮 r_num: (\d+)|{SAMPLE_RATE_MESSAGE}([^\r\n]+))'
+    r'|WARNING - (已达到每日点击次数限制)'
+    r'|(?:ERROR|CRITICAL) - ([^\r\n]*))').encode('utf-8'),
+    re.MULTILINE)
+_DATED_LINE = re.compile(rb'\n\d{4}-\d\d-\d\d ')  # 以日期开头的行（前面的换行符用于定位行首）
+# 按天连续的片段中直接统计的消息标记（bytes.count 和以字面量开头的正则在 C 层快速查找）
+_LAUNCH_MARKERS = tuple(f' - INFO - 应用启动{end}'.encode('utf-8') for end in ('\n', '\r\n'))
+_CLICK_MARKER = ' - INFO - 用户点击了'.encode('utf-8')
+_LIMIT_MARKER = ' - WARNING - 已达到每日点击次数限制'.encode('utf-8')
+_DRAW_PATTERN = re.compile(' - INFO - 本轮 r_num: (\\d+)'.encode('utf-8'))
+_SAMPLE_RATE_PATTERN = re.compile(rf' - INFO - {SAMPLE_RATE_MESSAGE}([^\r\n]+)'.encode('utf-8'))
+_ERROR_PATTERNS = (re.compile(rb' - ERROR - ([^\r\n]*)'), re.compile(rb' - CRITICAL - ([^\r\n]*)'))
+
+
+def split_ranges(path, chunk_bytes=CHUNK_BYTES):
+    """
+    把文件切分为若干字节范围，每个范围的起点和终点都在行首。
+
+    Returns:
+        list: [(path, start, end), ...]，空文件返回空列表。
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                newline = mapped.find(b'\n', end)
+                end = size if newline < 0 else newline + 1
+            ranges.append((path, start, end))
+            start = end
+    return ranges
+
+
+def _day_segments(data):
+    """
+    假设日志按时间顺序写入，二分查找每天的第一行，把数据切分为按天连续的片段。
+
+    Args:
+        data (bytes): 以换行符开头、以换行符结尾的日志内容。
+
+    Returns:
+        list: [(日期, 起点, 终点), ...]，起点和终点都是行首；第一个带日期的行之前的内容不属于任何片段。
+    """
+    segments = []
+    end = len(data)
+    match = _DATED_LINE.search(data)
+    start = end if match is None else match.start() + 1
+    while start < end:
+        day = data[start:start + 10]
+        lo, hi = start, end  # lo 处的行日期不晚于 day，hi 为日期晚于 day 的行的行首或 end
+        while True:
+            mid = (lo + hi) // 2
+            line = data.rfind(b'\n', lo, mid) + 1  # (lo, mid] 中的行首
+            if line == 0:
+                line = data.find(b'\n', mid, hi - 1) + 1  # (mid, hi) 中的行首
+                if line == 0:
+                    break  # lo 和 hi 之间没有其他行首
+            match = _DATED_LINE.search(data, line - 1, hi)
+            dated = hi if match is None else match.start() + 1
+            if dated == hi or data[dated:dated + 10] <= day:
+                lo = line if dated == hi else dated
+            else:
+                hi = dated
+        segments.append((day, start, hi))
+        start = hi
+    return segments
+
+
+def _note_sample_rate(rates, day, value):
+    """
+    记录某天出现的点击日志采样率，同一天有多个值（多次启动）时保留最小值。
+    """
+    try:
+        rate = float(value)
+    except ValueError:
+        return
+    if rate < rates.get(day, 1.0):
+        rates[day] = rate
+
+
+def _scan_lines(data, start, end, days, pages, errors, rates):
+    """
+    逐行扫描 [start, end) 范围，按每一行自己的日期计数（日期不连续时使用）。
+    """
+    for match in _LINE.finditer(data, start, end):
+        day, launch, click, r_num, sample_rate, limit_hit, error = match.groups()
+        counts = days.get(day)
+        if counts is None:
+            counts = days[day] = Counter()
+        if sample_rate is not None:
+            _note_sample_rate(rates, day, sample_rate)
+        elif r_num is not None:
+            counts["draws"] += 1
+            pages[r_num] += 1
+        elif click is not None:
+            counts["clicks"] += 1
+        elif limit_hit is not None:
+            counts["limit_hits"] += 1
+        elif launch is not None:
+            counts["launches"] += 1
+        else:
+            counts["errors"] += 1
+            errors[error] += 1
+
+
+def _count_segment(data, day, start, end, counts, pages, errors, rates):
+    """
+    统计同一天的连续片段 [start, end)：直接在整段字节中查找各类消息标记，不逐行处理。
+    """
+    for value in _SAMPLE_RATE_PATTERN.findall(data, start, end):
+        _note_sample_rate(rates, day, value)
+    counts["launches"] += sum(data.count(marker, start, end) for marker in _LAUNCH_MARKERS)
+    counts["clicks"] += data.count(_CLICK_MARKER, start, end)
+    counts["limit_hits"] += data.count(_LIMIT_MARKER, start, end)
+    drawn = Counter(_DRAW_PATTERN.findall(data, start, end))
+    counts["draws"] += sum(drawn.values())
+    pages.update(drawn)
+    for pattern in _ERROR_PATTERNS:
+        messages = pattern.findall(data, start, end)
+        counts["errors"] += len(messages)
+        errors.update(messages)
+
+
+def scan_range(path, start, end):
+    """
+    扫描文件的一个字节范围（在工作进程中执行）。
+
+    按天切分后，日期连续的片段（片段中每个以日期开头的行都是同一天）直接统计消息标记；
+    日志顺序错乱的片段改为逐行扫描，结果相同。
+
+    Returns:
+        dict: 'days'（日期 -> 各事件次数的 Counter）、'pages'（页码 Counter）、'errors'（错误消息 Counter）、
+              'sample_rates'（日期 -> 当天最小的点击日志采样率，只包含采样率小于 1 的日期）、'bytes'。
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        data = b'\n' + mapped[start:end]  # 一次只复制一个范围，开头补换行符使每一行都以换行符为前缀
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    days = {}
+    pages = Counter()  # r_num 字节串 -> 次数
+    errors = Counter()  # 错误消息字节串 -> 次数
+    rates = {}  # 日期字节串 -> 点击日志采样率
+    for day, segment_start, segment_end in _day_segments(data):
+        # 片段中以日期开头的行都属于 day 时才能按标记直接统计（日期都以 2 开头）
+        if (data.count(b'\n' + day, segment_start - 1, segment_end - 1)
+                == data.count(b'\n2', segment_start - 1, segment_end - 1)):
+            counts = days.get(day)
+            if counts is None:
+                counts = days[day] = Counter()
+            _count_segment(data, day, segment_start, segment_end, counts, pages, errors, rates)
+        else:
+            _scan_lines(data, segment_start, segment_end, days, pages, errors, rates)
+
+    error_messages = Counter()
+    for message, count in errors.items():
+        error_messages[message[:ERROR_MESSAGE_CHARS * 4].decode('utf-8', 'replace')[:ERROR_MESSAGE_CHARS]] += count
+    return {
+        "days": {day.decode('ascii'): counts for day, counts in days.items()},
+        "pages": Counter({int(r_num): count for r_num, count in pages.items()}),
+        "errors": error_messages,
+        "sample_rates": {day.decode('ascii'): rate for day, rate in rates.items()},
+        "bytes": end - start,
+    }
+
+
+def analyze(paths, jobs=None, chunk_bytes=CHUNK_BYTES):
+    """
+    并行扫描日志文件并合并统计结果。
+
+    Args:
+        paths (list): 日志文件路径。
+        jobs (int, optional): 工作进程数，默认为 CPU 核数；为 1 或只有一个范围时在当前进程中扫描。
+        chunk_bytes (int, optional): 每个任务扫描的字节数。
+
+    Returns:
+        dict: 合并后的统计结果，结构与 scan_range 的返回值相同。
+    """
+    ranges = [item for path in paths for item in split_ranges(path, chunk_bytes)]
+    jobs = min(jobs or os.cpu_count() or 1, len(ranges))
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(scan_range, *zip(*ranges)))
+    else:
+        results = [scan_range(*item) for item in ranges]
+
+    days = {}
+    pages = Counter()
+    errors = Counter()
+    sample_rates = {}
+    for result in results:
+        for day, counts in result["days"].items():
+            days.setdefault(day, Counter()).update(counts)
+        pages.update(result["pages"])
+        errors.update(result["errors"])
+        for day, rate in result["sample_rates"].items():
+            sample_rates[day] = min(rate, sample_rates.get(day, 1.0))
+    return {"days": days, "pages": pages, "errors": errors, "sample_rates": sample_rates,
+            "bytes": sum(result["bytes"] for result in results)}
+
+
+def format_table(headers, rows):
+    """
+    把表格格式化为按列对齐的文本（按显示宽度对齐，中文字符按两列计算）。
+    """
+    def width(text):
+        return sum(2 if ord(char) > 0x2E7F else 1 for char in text)
+
+    cells = [[str(cell) for cell in row] for row in [headers, *rows]]
+    widths = [max(width(row[column]) for row in cells) for column in range(len(headers))]
+    lines = []
+    for index, row in enumerate(cells):
+        lines.append("  ".join(cell + " " * (widths[column] - width(cell)) for column, cell in enumerate(row)).rstrip())
+        if index == 0:
+            lines.append("  ".join("-" * value for value in widths))
+    return "\n".join(lines)
+
+
+def format_report(summary, top=10):
+    """
+    生成文本汇总报告：每日统计、抽中次数最多的页码、出现次数最多的错误。
+    """
+    rates = summary["sample_rates"]
+    day_rows = [[day, *(summary["days"][day][event] for event in EVENTS), f"{rates[day]:g}" if day in rates else ""]
+                for day in sorted(summary["days"])]
+    totals = Counter()
+    for counts in summary["days"].values():
+        totals.update(counts)
+    day_rows.append(["合计", *(totals[event] for event in EVENTS), ""])
+    daily = "每日统计\n" + format_table(["日期", "启动", "点击", "达到限制", "抽取", "错误", "日志采样率"], day_rows)
+    if rates:
+        daily += "\n注: 有采样率的日期只有点击明细日志被采样，点击和抽取次数不受影响"
+    sections = [
+        daily,
+        "抽中次数最多的页码\n" + format_table(["r_num", "次数"], summary["pages"].most_common(top)),
+    ]
+    if summary["errors"]:
+        sections.append("出现次数最多的错误\n" + format_table(["次数", "错误消息"], [
+            [count, message] for message, count in summary["errors"].most_common(top)]))
+    return "\n\n".join(sections)
+
+
+def main(argv=None):
+    """
+    命令行入口。
+
+    Returns:
+        int: 进程退出码。
+    """
+    parser = argparse.ArgumentParser(description="统计答案之书日志中的启动、点击、限制、抽取和错误")
+    parser.add_argument('paths', nargs='*', help="日志文件路径，默认为 data/log.log")
+    parser.add_argument('--jobs', type=int, default=None, help="并行扫描的进程数，默认为 CPU 核数")
+    parser.add_argument('--top', type=int, default=10, help="页码和错误列表显示的条数，默认 10")
+    parser.add_argument('--json', action='store_true', help="以 JSON 格式输出统计结果")
+    args = parser.parse_args(argv)
+    paths = args.paths
+    if not paths:
+        import app_core  # 按需导入，只在使用默认日志路径时需要
+        paths = [app_core.log_file_path]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        print(f"日志文件不存在: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    summary = analyze(paths, args.jobs)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps({
+            "days": {day: {event: summary["days"][day][event] for event in EVENTS} for day in sorted(summary["days"])},
+            "sample_rates": dict(sorted(summary["sample_rates"].items())),
+            "top_pages": summary["pages"].most_common(args.top),
+            "top_errors": summary["errors"].most_common(args.top),
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(summary, args.top))
+    print(f"已扫描 {summary['bytes'] / 1e6:.1f} MB，耗时 {elapsed:.2f} 秒", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+
+# ----- 日志配置参数 -----
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'  # 日志格式（日志分析工具依赖此格式）
+CLICK_LOGGER_NAME = "book.click"  # 每次点击热路径上的日志使用的记录器名称
+LOG_MAX_BYTES = 5 * 1024 * 1024  # 单个日志文件的最大字节数，超过后轮转
+LOG_BACKUP_COUNT = 3  # 保留的历史日志文件个数
+# 点击日志采样率 (0~1)，1 表示记录每一次点击，可通过环境变量调整
+LOG_SAMPLE_RATE = float(os.environ.get("BOOK_LOG_SAMPLE_RATE", "1.0"))
+
+SAMPLE_RATE_MESSAGE = "点击日志采样率: "  # 启动时记录当前采样率的日志消息前缀（日志分析工具依赖此格式）
+# 点击记录器上始终记录、不参与采样的日志（作为 extra 传入），用于日志分析统计的点击和抽取行
+ALWAYS_LOG = {"always_log": True}
+
+click_logger = logging.getLogger(CLICK_LOGGER_NAME)  # 点击热路径日志记录器
+
+
+class ClickSamplingFilter(logging.Filter):
+    """
+    按点击采样的日志过滤器。
+
+    每次点击开始时调用 new_click() 决定本次点击的日志是否记录，同一次点击的日志要么全部保留，要么全部丢弃。
+    只对点击记录器的 INFO 及以下级别生效，启动事件、警告和错误始终记录；
+    带 extra=ALWAYS_LOG 的日志（每次点击和抽中的页码，日志分析按它们计数）也始终记录。
+    """
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._keep = True  # 当前点击的日志是否保留
+
+    def new_click(self):
+        """
+        开始新的一次点击，按采样率决定本次点击的日志是否记录。
+        """
+        self._keep = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def filter(self, record):
+        if (record.levelno > logging.INFO or not record.name.startswith(CLICK_LOGGER_NAME)
+                or getattr(record, "always_log", False)):
+            return True
+        return self._keep
+
+
+_sampling_filter = ClickSamplingFilter(LOG_SAMPLE_RATE)
+_listener = None  # 后台写日志的 QueueListener
+
+
+def setup_logging(log_file, level=logging.INFO, sample_rate=None,
+                  max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """
+    配置非阻塞的文件日志。
+
+    调用线程只把日志记录放入队列，由 QueueListener 后台线程写入按大小轮转的日志文件，
+    磁盘延迟不会影响界面线程。进程退出时自动停止后台线程并写完剩余日志。
+
+    Args:
+        log_file (str): 日志文件路径。
+        level (int, optional): 日志级别，默认 INFO。
+        sample_rate (float, optional): 点击日志采样率，默认使用 LOG_SAMPLE_RATE。
+        max_bytes (int, optional): 单个日志文件的最大字节数。
+        backup_count (int, optional): 保留的历史日志文件个数。
+    """
+    global _listener
+    if _listener is not None:
+        return
+    if sample_rate is not None:
+        _sampling_filter.sample_rate = sample_rate
+
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_sampling_filter)  # 在入队前过滤，被采样丢弃的日志不占用队列
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    # 记录采样率，日志分析工具据此标注点击明细日志被采样的日期
+    logging.info(f"{SAMPLE_RATE_MESSAGE}{_sampling_filter.sample_rate:g}")
+
+
+def new_click():
+    """
+    标记新的一次点击开始，按采样率决定本次点击的日志是否记录。
+    """
+    _sampling_filter.new_click()
+
+
+def shutdown_logging():
+    """
+    停止后台日志线程，写完队列中剩余的日志。
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,290 +1,242 @@
-import tkinter as tk
-from tkinter import ttk
-from tkinter import messagebox  # 导入 messagebox 模块，用于显示消息框
-import random
-import json
-import logging
-import os
-import subprocess
 import sys
-import datetime
-import csv
-import time
-
 
-# ----- 文件路径定义 -----
-# 定义 JSON 答案文件、想法文件、图标文件和点击次数限制数据文件的相对路径
-json_file = "./src/answers.json"  # JSON 答案文件路径
-thoughts_file = "./src/thoughts.txt"  # 想法文件路径
-ico_logo_file = "./src/logo.ico"  # 图标文件路径
-log_file_path = './data/log.log'  # 定义日志文件路径
-click_limit_file = "./data/click_limit.csv"  # 点击次数限制数据文件路径 (CSV 文件)
+from tracing import tracer
 
-# 点击次数限制
-DAILY_CLICK_LIMIT = 3  # 每天允许点击的最大次数
-
-# 获取应用的基础路径 
-def get_base_path():
-    """
-    获取应用的基础路径。
-
-    根据程序是否被打包为可执行文件（exe）来决定基础路径。
-    如果是打包后的 exe，则基础路径为 exe 所在的目录；
-    否则，为当前脚本运行的目录。
-
-    Returns:
-        str: 应用的基础路径。
-    """
-    if getattr(sys, 'frozen', False):
-        # 如果 sys.frozen 为 True，说明程序是被打包为 exe 运行的
-        base_path = os.path.dirname(sys.executable)  # 获取 exe 文件所在的目录
-    else:
-        base_path = os.path.abspath(".")  # 否则，返回当前工作目录的绝对路径
-    return base_path
+tracer.enable_if_requested(sys.argv)  # 追踪需要在导入使用 traced() 装饰的模块之前启用
 
+from startup_profile import startup_profiler
 
-base_path = get_base_path()
-print(base_path)
+# 启动耗时分析需要在其他模块导入之前启用，才能记录每个模块的导入耗时
+startup_profiler.enable_if_requested(sys.argv)
 
+import tkinter as tk
+from tkinter import ttk
+import logging
+import os
+import datetime
+import time
 
-def check_data_directory():
-    """
-    检查数据目录是否存在，如果不存在则创建。
-    """
-    data_path = os.path.join(base_path, 'data')
-    print(data_path)
-    if not os.path.exists(data_path):
-        os.makedirs(data_path)
-        print(f"Creating data directory: {data_path}")
-    else:
-        print(f"Data directory already exists: {data_path}")
+import metrics
+from logging_setup import ALWAYS_LOG, click_logger, new_click, setup_logging
+from typewriter import TypewriterAnimator
+from app_core import (DAILY_CLICK_LIMIT, HOT_RELOAD, QUOTA_BACKEND, base_path, check_data_directory, close_click_counter,
+                      close_draw_history, commit_prefetched_draw, consume_click, draw_answer, dump_metrics,
+                      get_click_counter, get_draw_history_writer, ico_logo_file, log_file_path, peek_click_count,
+                      record_draw, save_no_repeat_state, start_answer_store_load, thoughts_file, watch_answer_store)
 
+startup_profiler.mark("import")
 
-check_data_directory()
 
+THOUGHTS_CHAR_MS = 5  # 想法文本每个字符的显示间隔（毫秒）
+STREAM_POLL_MS = 50  # 流式加载答案库期间检查加载进度的间隔（毫秒）
 
-def file_path_processor(file_path):
-    """
-    处理文件路径，适配打包后的应用。
 
-    当程序打包为 exe 后，文件路径可能需要从打包路径中获取。
-    此函数检查程序是否在打包环境下运行，并据此调整文件路径。
+check_data_directory()  # 基础路径在日志配置完成后记录
+startup_profiler.mark("data dir")
 
-    Args:
-        file_path (str): 原始文件路径。
-
-    Returns:
-        str: 处理后的文件路径。
-    """
-    # 检查是否存在 _MEIPASS 属性，该属性在使用 PyInstaller 打包时会被设置
-    if hasattr(sys, '_MEIPASS'):
-        # 如果存在 _MEIPASS 属性，说明程序是被打包运行的
-        file_path = os.path.join(sys._MEIPASS, file_path)  # 将文件路径拼接为打包环境下的路径
-    else:
-        file_path = file_path  # 否则，保持原始路径不变
-    return file_path
-
-
-# 使用 file_path_processor 函数处理各个文件路径，以适配打包环境
-json_file = file_path_processor(json_file)
-thoughts_file = file_path_processor(thoughts_file)
-ico_logo_file = file_path_processor(ico_logo_file)
 
 # ----- 日志配置 -----
-# 配置日志记录，将日志信息写入 'log.log' 文件
-logging.basicConfig(filename=log_file_path, level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    encoding='utf-8')
+# 配置日志记录，由后台线程将日志信息写入 'log.log' 文件（按大小轮转）
+setup_logging(log_file_path)
 
 logging.info("应用启动")  # 记录应用启动事件
 logging.info(f"当前执行文件所在目录: {base_path}")  # 记录基础路径信息
+startup_profiler.mark("logging")
 
-# ----- 加载答案数据 -----
-# 检查 JSON 答案文件是否存在
-if os.path.exists(json_file):
-    # 如果 JSON 文件存在，则尝试加载答案数据
-    try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            answers = json.load(f)  # 从 JSON 文件中加载答案数据
-        logging.info("答案文件加载完成")  # 记录答案文件加载成功事件
-    except json.JSONDecodeError as e:
-        # JSON 文件格式错误处理
-        logging.error(f"JSON 文件格式错误: {e}")
-        messagebox.showerror("错误", f"答案文件 JSON 格式错误: {json_file}\n请检查文件内容是否为有效的 JSON 格式。")
-        answers = []  # 初始化答案列表以避免后续错误
-    except Exception as e:
-        # 其他文件读取错误处理
-        logging.error(f"加载答案文件时发生错误: {e}")
-        messagebox.showerror("错误", f"加载答案文件时发生未知错误: {json_file}\n错误信息: {e}")
-        answers = []  # 初始化答案列表以避免后续错误
-else:
-    # 如果 JSON 文件不存在，则记录错误并显示错误消息框
-    logging.error(f"{json_file}文件未找到")
-    messagebox.showerror("错误", f"答案文件未找到: {json_file}\n请确保 '{json_file}' 文件与程序在同一目录下")
-    answers = []  # 初始化答案列表以避免后续错误，但应用可能无法正常功能
-
-
-def save_click_count_data(count, date_str):
-    """
-    保存点击次数和日期到 CSV 文件中。
-    CSV 文件包含列头 'Count' 和 'Date'，并写入一行数据。
-
-    Args:
-        count (int): 当前的点击次数。
-        date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
-    """
-    logging.info(f"Attempting to save click count data to: {click_limit_file}, Count: {count}, Date: {date_str}")  # <-- ADDED LOGGING
-    try:
-        with open(click_limit_file, 'w', newline='', encoding='utf-8') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(['Count', 'Date'])  # 写入 CSV 文件头
-            csv_writer.writerow([count, date_str])  # 写入点击次数和日期数据
-        logging.info(f"Successfully saved click count data to CSV file, Count: {count}, 日期: {date_str}")
-    except Exception as e:
-        print(f"Error saving click count data: {e}")  # <--- ADDED PRINT STATEMENT for immediate console output
-        logging.error(f"Error saving click count data to CSV file: {e}")
-
-
-def load_click_count_data():
-    """
-    从 CSV 文件中加载点击次数限制数据 (点击次数和最后点击日期)。
-    CSV 文件应包含列头 'Count' 和 'Date'，并期望只有一行数据。
-    如果文件不存在或内容不符合预期，则返回默认值：count=0, last_date=None。
-
-    Returns:
-        tuple: 包含点击次数 (int) 和最后点击日期 (str, YYYY-MM-DD 格式) 的元组。
-               如果文件不存在或读取失败，则返回 (0, None)。
-    """
-    try:
-        if os.path.exists(click_limit_file):
-            with open(click_limit_file, 'r', newline='', encoding='utf-8') as csvfile:
-                csv_reader = csv.reader(csvfile)
-                header = next(csv_reader, None)  # 读取并忽略 CSV 文件头
-                if header is None:  # 文件为空
-                    logging.warning("点击次数 CSV 文件为空，使用默认值。")
-                    return 0, None
-                row = next(csv_reader, None)  # 尝试读取数据行
-                if row:
-                    try:
-                        count = int(row[0]) if row[0] else 0  # 读取并转换点击次数
-                        last_date = row[1] if len(row) > 1 else None  # 读取日期
-                        logging.info(f"成功从 CSV 文件加载点击次数数据，次数: {count}, 日期: {last_date}")
-                        return count, last_date
-                    except ValueError:
-                        logging.error("CSV 文件中点击次数数据格式错误，使用默认值。")
-                        return 0, None  # 数据格式错误，返回默认值
-                else:
-                    logging.warning("点击次数 CSV 文件数据行缺失，使用默认值。")
-                    return 0, None  # 没有数据行, 返回默认值
-        else:
-            logging.info("点击次数 CSV 数据文件不存在，使用默认值。")
-            return 0, None  # 文件不存在，返回默认值
-    except FileNotFoundError:
-        logging.info("点击次数 CSV 数据文件未找到，使用默认值。")  # 更加明确的日志
-        return 0, None  # 文件未找到，返回默认值
-    except Exception as e:
-        logging.error(f"加载点击次数 CSV 数据失败: {e}")
-        return 0, None  # 加载 CSV 数据失败，返回默认值
-
+# ----- 答案数据 -----
+# 答案库在窗口首帧显示之后再加载（见 finish_startup），加载完成前“获取答案”按钮不可用
+# 启用热加载时由后台线程整体替换为新的答案库对象，抽取时每次只读取一次该引用
+answer_store = None
+# 空闲时预取的下一个答案: (日期, 点击序号, 答案文本, 页码)，答案文本为 None 表示今天的次数已用完（见 prefetch_next_answer）
+prefetched_answer = None
 
 
 # 开始显示答案的函数 (限制点击次数)
+@tracer.traced("click")
 def start_show_answer():
     """
     响应“获取答案”按钮点击事件，开始获取并逐渐显示答案，并实现每日点击次数限制。
     """
-    logging.info("用户点击了 '获取答案' 按钮 - 尝试获取答案 (带点击次数限制)")  # 记录用户点击行为
+    click_time = time.perf_counter()  # 点击时刻，用于统计点击到首字显示的延迟
+    new_click()  # 按采样率决定本次点击的日志是否记录
+    click_logger.info("用户点击了 '获取答案' 按钮 - 尝试获取答案 (带点击次数限制)", extra=ALWAYS_LOG)  # 记录用户点击行为（不采样）
 
     current_date = datetime.datetime.now().strftime('%Y-%m-%d')  # 获取当前日期
-    click_count, last_click_date = load_click_count_data()  # 加载点击次数数据
-
-    if last_click_date != current_date:  # 如果上次点击日期不是今天，说明是新的一天，重置点击次数
-        click_count = 0  # 重置点击次数为 0
-        logging.info("新的一天，重置点击次数为 0。")  # 记录重置事件
+    allowed, click_count = consume_click(current_date)  # 检查点击次数限制并记录本次点击
 
-    if click_count < DAILY_CLICK_LIMIT:  # 检查点击次数是否小于限制
-        logging.info("start_show_answer function CALLED") # <--- ADDED LOGGING
-        logging.info(f"Current click count before increment: {click_count}") # <--- ADDED LOGGING
-        click_count += 1  # 点击次数加 1
-        save_click_count_data(click_count, current_date)  # 保存更新后的点击次数和日期
-        logging.info(f"本轮点击次数: {click_count}/{DAILY_CLICK_LIMIT}")  # 记录本轮点击次数
+    if allowed:  # 未达到每日点击次数限制
+        click_logger.info(f"本轮点击次数: {click_count}/{DAILY_CLICK_LIMIT}")  # 记录本轮点击次数
 
+        text_animator.skip(instructions_label)  # 用户提示仍在显示时直接显示完整提示
+        text_animator.cancel(answer_label)  # 取消上一个答案尚未完成的显示
         answer_label.config(text="")  # 清空答案 Label 的文本
         start_button.config(state=tk.DISABLED)  # 禁用开始按钮
-        full_answer_text = show_answer()  # 获取答案文本
+        full_answer_text, page_number, was_prefetched = take_prefetched_answer(current_date, click_count - 1)  # 获取答案文本
+        record_draw(current_date, page_number)  # 记录到抽取历史
         if full_answer_text:
-            gradually_show_answer(full_answer_text)  # 逐渐显示答案
+            handler_ms = (time.perf_counter() - click_time) * 1000  # 点击处理本身的耗时
+            gradually_show_answer(full_answer_text,
+                                  on_first=lambda: log_click_latency(click_time, handler_ms, was_prefetched))  # 逐渐显示答案
         else:
             start_button.config(state=tk.NORMAL)  # 重新启用开始按钮
             answer_label.config(text="未能获取答案，请重试。")
             logging.error("未能从答案列表中获取有效答案。")
     else:
         logging.warning("已达到每日点击次数限制。")  # 记录达到限制警告
+        record_draw(current_date, None, limited=True)
+        from tkinter import messagebox  # 按需导入 messagebox 模块，减少启动时的导入耗时
         messagebox.showinfo("提示", f"今日获取答案次数已达上限 ({DAILY_CLICK_LIMIT}次)，请明日再来。")  # 弹出提示消息框
 
 
+# 在空闲时预取下一个答案的函数
+@tracer.traced()
+def prefetch_next_answer():
+    """
+    在 Tk 空闲时预先检查点击次数、抽取下一个答案并格式化文本。
+
+    点击时只需记录点击并开始动画。预取结果带有日期和点击序号，
+    与点击时不一致（例如跨天，或其他实例使用了点击次数）时丢弃并当场抽取。
+    不重复抽取模式下预取只查看下一个位置，不记为已抽取，预取的答案被采用时才记录。
+    """
+    global prefetched_answer
+    if answer_store is None:
+        return
+    current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    click_index = peek_click_count(current_date)  # 今天已用的点击次数，即下一次点击的序号
+    if click_index >= DAILY_CLICK_LIMIT:
+        prefetched_answer = (current_date, click_index, None, None)  # 今天的次数已用完，不必抽取
+        return
+    prefetched_answer = (current_date, click_index, *show_answer(click_index, peek=True))
+    logging.debug(f"已预取第 {click_index + 1} 次点击的答案")
+
+
+# 取出预取答案的函数
+@tracer.traced()
+def take_prefetched_answer(current_date, click_index):
+    """
+    取出与本次点击匹配的预取答案，没有匹配的预取结果时当场抽取。
+
+    Args:
+        current_date (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+        click_index (int): 本次点击的序号，从 0 开始。
+
+    Returns:
+        tuple: 答案文本 (str，获取失败时为 None)、页码 (int，获取失败时为 None) 和是否命中预取 (bool)。
+    """
+    global prefetched_answer
+    prefetched, prefetched_answer = prefetched_answer, None
+    if prefetched is not None and prefetched[:2] == (current_date, click_index) and prefetched[2]:
+        commit_prefetched_draw(answer_store, current_date, prefetched[3])  # 不重复抽取模式下此时才记为已抽取
+        return prefetched[2], prefetched[3], True
+    return (*show_answer(click_index), False)
+
+
+# 记录点击延迟的函数
+def log_click_latency(click_time, handler_ms, was_prefetched):
+    """
+    答案的第一个字符显示后，记录从点击到首字显示的延迟。
+
+    Args:
+        click_time (float): 点击时刻 (time.perf_counter)。
+        handler_ms (float): 点击处理本身的耗时（毫秒）。
+        was_prefetched (bool): 是否命中预取答案。
+    """
+    latency_ms = (time.perf_counter() - click_time) * 1000
+    metrics.CLICK_FIRST_CHAR_SECONDS.observe(latency_ms / 1000)
+    metrics.CLICK_HANDLER_SECONDS.observe(handler_ms / 1000)
+    tracer.instant("first char", was_prefetched=was_prefetched)
+    click_logger.info(f"点击到首字显示耗时: {latency_ms:.1f} ms, 点击处理耗时: {handler_ms:.3f} ms, "
+                      f"预取: {'命中' if was_prefetched else '未命中'}")
+
+
 # 显示随机答案的函数
-def show_answer():
+@tracer.traced()
+def show_answer(click_index=None, peek=False):
     """
     从答案列表中随机选择一个答案并格式化文本。
 
+    启用确定性抽取 (BOOK_SEEDED_DRAW=1) 时，答案由日期和当天的点击序号决定，可以复现。
+
+    Args:
+        click_index (int, optional): 当天的点击序号，从 0 开始。
+        peek (bool, optional): 是否为预取（不重复抽取模式下不把答案记为已抽取，见 take_prefetched_answer）。
+
     Returns:
-        str: 格式化后的答案文本，包含英文和中文，如果获取失败则返回 None。
+        tuple: 格式化后的答案文本 (str，包含英文和中文) 和页码 (int)，如果获取失败则返回 (None, None)。
     """
-    logging.info("显示答案 - 准备答案文本")  # 记录准备答案文本事件
-    r_num = random.randint(1, len(answers))  # 生成一个 1 到答案列表长度之间的随机数，作为页码
-    answer_text = next((item for item in answers if item["page_number"] == r_num), None)  # 从答案列表中查找页码与随机数匹配的答案项
+    click_logger.info("显示答案 - 准备答案文本")  # 记录准备答案文本事件
+    answer_text = draw_answer(answer_store, click_index=click_index, peek=peek)  # 从答案库中抽取一个答案项
     if answer_text:
-        # 如果找到了对应的答案项
+        # 如果抽取到了答案项
+        r_num = answer_text["page_number"]  # 本轮抽中的页码
         cn_text = answer_text["CN"]  # 获取中文答案
         en_text = answer_text["EN"]  # 获取英文答案
         full_answer_text = f'{en_text}\n{cn_text}'  # 将英文和中文答案合并，用换行符分隔
-        logging.info(f"本轮 r_num: {r_num}, 准备显示的答案: EN='{en_text}', CN='{cn_text}'")  # 记录本轮随机数和准备显示的答案
-        return full_answer_text  # 返回完整的答案文本
-    return None  # 如果未找到答案，则返回 None
+        click_logger.info(f"本轮 r_num: {r_num}, 准备显示的答案: EN='{en_text}', CN='{cn_text}'",
+                          extra=ALWAYS_LOG)  # 记录本轮随机数和准备显示的答案（不采样，日志分析按此统计抽取次数）
+        return full_answer_text, r_num  # 返回完整的答案文本和页码
+    return None, None  # 如果未找到答案，则返回 (None, None)
 
 
 # 逐渐显示文本的通用函数
-def gradually_show_text(label, full_text, index=0, duration_ms=100):
+def gradually_show_text(label, full_text, index=0, duration_ms=100, on_first=None):
     """
     逐渐在指定的 Label 组件上显示文本，实现文字逐字出现的效果。
 
+    由动画调度器 text_animator 统一按固定帧率推进，不再为每个字符单独安排 after() 回调。
+
     Args:
         label (tk.Label 或 ttk.Label): 要显示文本的 Label 组件。
         full_text (str): 要完整显示的文本内容。
-        index (int): 当前已显示的文本索引，默认为 0。
-        duration_ms (int): 每次更新文本显示的时间间隔（毫秒），默认为 100 毫秒。
+        index (int): 从第几个字符开始显示，默认为 0。
+        duration_ms (int): 每个字符的显示间隔（毫秒），默认为 100 毫秒。
+        on_first (callable, optional): 第一个字符显示后调用的无参函数。
     """
     if not full_text:
         logging.warning("没有文本可以显示。")  # 记录警告：没有文本可以显示
         return
 
-    if index <= len(full_text):
-        # 如果当前索引小于等于文本长度，继续更新 Label 文本
-        current_text = full_text[:index]  # 截取从开始到当前索引的文本
-        label.config(text=current_text)  # 更新 Label 组件的文本
-        label.after(duration_ms, gradually_show_text, label, full_text, index + 1, duration_ms)  # duration_ms 毫秒后，递归调用自身，索引加 1
-    else:
-        # 文本显示完成后执行的操作
-        if label == answer_label:
-            # 如果是答案 Label 显示完成，则启用开始按钮
-            start_button.config(state=tk.NORMAL)  # 启用开始按钮
-            logging.info("答案显示完成")  # 记录答案显示完成事件
-        elif label == instructions_label:
-            # 如果是用户提示 Label 显示完成
-            logging.info("用户提示显示完成")  # 记录用户提示显示完成事件
+    started = time.perf_counter()  # 动画开始时刻，用于统计动画耗时
+    text_animator.cancel(label)  # 先结束同一组件上未完成动画的追踪区间，再开始新的区间
+    tracer.async_begin("text animation", id(label), chars=len(full_text))
+    text_animator.start(label, full_text, duration_ms, on_done=lambda: on_text_shown(label, started),
+                        start_index=index, on_first=on_first,
+                        on_cancel=lambda: tracer.async_end("text animation", id(label)))
+
+
+# 文本显示完成后的回调函数
+def on_text_shown(label, started=None):
+    """
+    逐字显示完成后执行的操作。
+
+    Args:
+        label (tk.Label 或 ttk.Label): 完成显示的 Label 组件。
+        started (float, optional): 动画开始时刻 (time.perf_counter)。
+    """
+    tracer.async_end("text animation", id(label))
+    if label == answer_label:
+        if started is not None:
+            metrics.ANIMATION_SECONDS.observe(time.perf_counter() - started)
+        # 如果是答案 Label 显示完成，则启用开始按钮
+        start_button.config(state=tk.NORMAL)  # 启用开始按钮
+        click_logger.info("答案显示完成")  # 记录答案显示完成事件
+        root.after_idle(prefetch_next_answer)  # 空闲时预取下一个答案
+    elif label == instructions_label:
+        # 如果是用户提示 Label 显示完成
+        logging.info("用户提示显示完成")  # 记录用户提示显示完成事件
 
 
 # 逐渐显示答案的函数 (使用通用函数 gradually_show_text)
-def gradually_show_answer(full_answer_text, index=0):
+def gradually_show_answer(full_answer_text, index=0, on_first=None):
     """
     调用通用函数 gradually_show_text 逐渐显示答案文本。
 
     Args:
         full_answer_text (str): 要完整显示的答案文本。
         index (int): 当前已显示的文本索引，默认为 0。
+        on_first (callable, optional): 第一个字符显示后调用的无参函数。
     """
-    gradually_show_text(answer_label, full_answer_text, index)  # 调用通用函数，目标 Label 为答案 Label，使用默认 duration_ms
+    gradually_show_text(answer_label, full_answer_text, index, on_first=on_first)  # 调用通用函数，目标 Label 为答案 Label，使用默认 duration_ms
 
 
 # 逐渐显示用户提示的函数
@@ -323,6 +275,7 @@ def read_thoughts_file(path=None):
         thoughts_file_path = thoughts_file
         logging.info(f"Running as script, using relative path for thoughts file path: {thoughts_file_path}")  # 记录使用相对路径
 
+    from tkinter import messagebox  # 按需导入 messagebox 模块，减少启动时的导入耗时
     try:
         with open(thoughts_file_path, 'r', encoding='utf-8') as file:
             thoughts_content = file.read()  # 读取想法文件内容
@@ -355,8 +308,7 @@ def show_thoughts():
         thoughts_window.title("Thoughts")  # 设置新窗口标题为 "Thoughts"
 
         thoughts_text = tk.Text(thoughts_window, wrap=tk.WORD)  # 创建文本框组件，设置背景色和前景色
-        thoughts_text.insert(tk.END, thoughts_content)  # 将想法内容插入到文本框中
-        thoughts_text.config(state=tk.DISABLED)  # 设置文本框为只读状态
+        thoughts_text.config(state=tk.DISABLED)  # 设置文本框为只读状态，内容由动画调度器逐步追加
         thoughts_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)  # 文本框填充窗口，并设置内外边距
 
         # ----- 窗口居中显示代码 -----
@@ -369,12 +321,117 @@ def show_thoughts():
         y_coordinate = int((screen_height - window_height) / 2)  # 计算窗口居中显示的 y 坐标
         thoughts_window.geometry(f"+{x_coordinate}+{y_coordinate}")  # 设置窗口位置，使其居中显示
 
+        text_animator.start(thoughts_text, thoughts_content, THOUGHTS_CHAR_MS)  # 逐字显示想法内容
+
+
+# 首帧显示后的函数
+def on_first_frame():
+    """
+    窗口首帧显示后调用，再安排加载答案库等非必需的启动工作。
+    """
+    startup_profiler.mark("first frame")
+    if os.environ.get("BOOK_EXIT_AFTER_FIRST_FRAME"):
+        # 基准测试: 首帧显示后立即退出
+        on_close()
+        return
+    root.after(1, finish_startup)  # 让出一次事件循环，保证首帧先完成绘制
+
+
+# 完成启动的函数
+def finish_startup():
+    """
+    加载答案库和点击次数数据，完成后启用“获取答案”按钮，并写出启动耗时报告（如果启用）。
+
+    大答案文件在后台流式加载，已加载到答案时即启用按钮（见 poll_answer_loader）。
+    """
+    global answer_store
+    answer_store, answer_loader, answer_load_error = start_answer_store_load()
+    metrics.CORPUS_ANSWERS.set_function(lambda: len(answer_store))  # 热加载或流式加载时随之变化
+    startup_profiler.mark("corpus load")
+    if answer_load_error:
+        from tkinter import messagebox  # 按需导入 messagebox 模块，减少启动时的导入耗时
+        messagebox.showerror("错误", answer_load_error)
+
+    # 提前把点击次数加载到内存，之后点击不再读写 CSV 文件（由后台线程写盘）
+    if QUOTA_BACKEND == "csv":
+        get_click_counter()
+    startup_profiler.mark("click state")
+    root.after_idle(get_draw_history_writer)  # 空闲时启动抽取历史的后台写线程，由它打开历史文件并恢复计数
+
+    if HOT_RELOAD:
+        watch_answer_store(replace_answer_store)  # 答案文件变化后在后台重新加载
+    if answer_loader is not None:
+        poll_answer_loader(answer_loader)
+    else:
+        start_button.config(state=tk.NORMAL)  # 答案库加载完成，启用开始按钮
+        root.after_idle(prefetch_next_answer)  # 空闲时预取第一个答案
+    for phase, elapsed, at in startup_profiler.phases:
+        metrics.STARTUP_PHASE_SECONDS.labels(phase).set(elapsed)
+        tracer.complete(phase, startup_profiler.origin + at - elapsed, elapsed, cat="startup")
+    report_path = startup_profiler.report()
+    if report_path:
+        logging.info(f"启动耗时报告已写入: {report_path}")
+
+
+# 检查流式加载进度的函数
+def poll_answer_loader(loader, button_enabled=False):
+    """
+    流式加载答案库期间定时检查进度：已加载到答案时启用“获取答案”按钮，加载结束时提示错误（如果有）。
+
+    Args:
+        loader (StreamingLoad): 流式加载对象。
+        button_enabled (bool): 是否已经因加载到答案而启用过按钮。
+    """
+    if not button_enabled and (len(loader.store) or loader.done.is_set()):
+        start_button.config(state=tk.NORMAL)  # 已加载的部分即可抽取答案
+        root.after_idle(prefetch_next_answer)
+        button_enabled = True
+    if loader.done.is_set():
+        if loader.error:
+            from tkinter import messagebox  # 按需导入 messagebox 模块，减少启动时的导入耗时
+            messagebox.showerror("错误", loader.error)
+        return
+    root.after(STREAM_POLL_MS, poll_answer_loader, loader, button_enabled)
+
+
+# 替换答案库的函数 (热加载回调)
+def replace_answer_store(new_answer_store):
+    """
+    用重新加载的答案库替换当前答案库，在热加载后台线程中调用。
+
+    只做一次引用赋值，不访问任何 Tk 组件；已经预取的答案来自旧答案库，仍然完整有效。
+
+    Args:
+        new_answer_store: 新的答案库对象。
+    """
+    global answer_store
+    answer_store = new_answer_store
+
+
+# 关闭窗口的函数
+def on_close():
+    """
+    响应窗口关闭事件，先把最新的点击次数写盘，再销毁主窗口。
+    """
+    close_click_counter()  # 停止后台写线程并写入最新点击次数
+    save_no_repeat_state()  # 写入当天不重复抽取状态
+    close_draw_history()  # 写入抽取历史的计数快照
+    dump_metrics()  # 写入运行指标快照
+    trace_path = tracer.save()  # 写入追踪文件（如果启用）
+    if trace_path:
+        logging.info(f"追踪文件已写入: {trace_path}")
+    root.destroy()
+
 
 # ----- 创建主窗口 -----
 root = tk.Tk()
 root.title("The Book of Answers")  # 设置窗口标题
+startup_profiler.mark("Tk init")
 root.iconbitmap(ico_logo_file)  # 设置窗口图标
+startup_profiler.mark("iconbitmap")
 root.resizable(False, False)  # 禁止窗口大小调整
+root.protocol("WM_DELETE_WINDOW", on_close)  # 关闭窗口时写入点击次数
+text_animator = TypewriterAnimator(root)  # 所有逐字显示动画共用的调度器
 
 # ----- 菜单栏 -----
 menubar = tk.Menu(root)  # 创建菜单栏，设置背景色和前景色
@@ -391,6 +448,7 @@ style.configure("TLabel", font=('Microsoft YaHei UI', 10))  # 配置 Label 样
 style.configure("TButton", font=('Microsoft YaHei UI', 10, 'bold'), padding=8, relief="raised",
                 borderwidth=2,  # 设置边框宽度
                 )
+startup_profiler.mark("style")
 
 # ----- 标题标签 -----
 title_label = ttk.Label(root, text="答案之书", font=('Microsoft YaHei UI', 18, 'bold'))  # 创建标题 Label，设置文本、字体和前景色
@@ -407,7 +465,8 @@ instructions_label = ttk.Label(
 instructions_label.pack(pady=(0, 10), padx=20)  # 设置垂直和水平方向的外边距
 
 # ----- "获取答案" 按钮 -----
-start_button = ttk.Button(root, text="获取答案", command=start_show_answer, style="TButton")  # 创建按钮，设置文本、点击命令和样式
+start_button = ttk.Button(root, text="获取答案", command=start_show_answer, style="TButton",
+                          state=tk.DISABLED)  # 创建按钮，设置文本、点击命令和样式，答案库加载完成前不可用
 start_button.pack(pady=(10, 15), padx=20)  # 设置垂直和水平方向的外边距
 
 # ----- 答案显示标签 -----
@@ -435,6 +494,10 @@ window_height = root.winfo_reqheight()  # 获取窗口请求高度
 x_coordinate = int((screen_width - window_width) / 2)  # 计算窗口居中 x 坐标
 y_coordinate = int((screen_height - window_height) / 2)  # 计算窗口居中 y 坐标
 root.geometry(f"+{x_coordinate}+{y_coordinate}")  # 设置窗口位置，使其居中显示
+startup_profiler.mark("widgets")
+
+# ----- 首帧显示后继续启动 -----
+root.after(0, root.after_idle, on_first_frame)  # 进入主循环并完成首次绘制后再加载答案库
 
 # ----- 运行应用主循环 -----
 root.mainloop()  # 启动 tkinter 应用的主循环，监听事件
@@ -0,0 +1,294 @@
+"""
+进程内运行指标：计数器、仪表盘和固定分桶直方图。
+
+指标在导入本模块时注册到全局 registry。更新只做几次整数/浮点运算（直方图再加一次 bisect），不加锁，
+点击路径上始终开启：多个线程同时更新同一个指标时偶尔可能少计一次，对监控用途可以接受。服务模式通过 GET /metrics 以 Prometheus 文本格式导出，
+桌面应用退出时把 JSON 快照写入 data/metrics.json。
+
+用法示例:
+    with metrics.DRAW_SECONDS.time():
+        ...
+
+    @metrics.QUOTA_SAVE_SECONDS.time()
+    def save(...):
+        ...
+"""
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+
+# 默认的耗时分桶上限（秒），覆盖从 0.1 毫秒的内存操作到秒级的文件读写
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+ANIMATION_BUCKETS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0)  # 逐字显示动画耗时分桶（秒）
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"  # Prometheus 文本格式的 Content-Type
+
+
+class Counter:
+    """
+    只增不减的计数器。
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge:
+    """
+    可以任意设置的当前值；设置了取值函数时在导出时调用该函数。
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._function = None
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """
+        导出时调用无参函数 function 取值（例如答案条数），不需要在每次变化时更新。
+        """
+        self._function = function
+
+    @property
+    def value(self):
+        return self._function() if self._function is not None else self._value
+
+
+class Histogram:
+    """
+    固定分桶直方图：每个分桶的观测次数、观测值之和与观测次数。
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))  # 分桶上限，最后隐含 +Inf
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value):
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1  # 第一个不小于 value 的上限所在的分桶
+        self._sum += value
+        self._count += 1
+
+    def time(self):
+        """
+        计时器，可以用作 with 语句或函数装饰器，把耗时（秒）记录到本直方图。
+        """
+        return _Timer(self)
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: 各分桶的累计次数（最后一项对应 +Inf）、观测值之和、观测次数。
+        """
+        counts, total, count = list(self._counts), self._sum, self._count
+        cumulative = []
+        running = 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+    def __call__(self, func):
+        histogram = self._histogram
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+
+class _Family:
+    """
+    带标签的指标：每组标签值对应一个子指标，首次使用时创建。
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._children = {}  # 标签值元组 -> 子指标
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+
+class MetricsRegistry:
+    """
+    指标注册表，负责导出 Prometheus 文本格式和 JSON 快照。
+    """
+
+    def __init__(self):
+        self._metrics = {}  # 名称 -> (类型, 说明, 标签名元组, 指标或 _Family)
+        self._lock = threading.Lock()
+
+    def _register(self, name, help_text, labelnames, kind, factory):
+        metric = _Family(factory) if labelnames else factory()
+        with self._lock:
+            if name in self._metrics:
+                raise ValueError(f"指标已注册: {name}")
+            self._metrics[name] = (kind, help_text, tuple(labelnames), metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(name, help_text, labelnames, "counter", Counter)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(name, help_text, labelnames, "gauge", Gauge)
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, labelnames=()):
+        return self._register(name, help_text, labelnames, "histogram", lambda: Histogram(buckets))
+
+    def _collect(self):
+        """
+        Yields:
+            tuple: (名称, 类型, 说明, [(标签 dict, 指标), ...])。
+        """
+        with self._lock:
+            items = list(self._metrics.items())
+        for name, (kind, help_text, labelnames, metric) in items:
+            if labelnames:
+                children = [(dict(zip(labelnames, values)), child) for values, child in metric.children()]
+            else:
+                children = [({}, metric)]
+            yield name, kind, help_text, children
+
+    def render_prometheus(self):
+        """
+        导出为 Prometheus 文本格式 (version 0.0.4)。
+
+        Returns:
+            str: 指标文本。
+        """
+        lines = []
+        for name, kind, help_text, children in self._collect():
+            lines.append(f"# HELP {name} {_escape(help_text)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in children:
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+                    continue
+                cumulative, total, count = metric.snapshot()
+                for bound, value in zip((*metric.buckets, math.inf), cumulative):
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {value}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """
+        导出为可以 JSON 序列化的 dict，直方图的分桶为累计次数。
+        """
+        result = {}
+        for name, kind, help_text, children in self._collect():
+            samples = []
+            for labels, metric in children:
+                if kind == "histogram":
+                    cumulative, total, count = metric.snapshot()
+                    bounds = [_format_value(bound) for bound in (*metric.buckets, math.inf)]
+                    samples.append({"labels": labels, "buckets": dict(zip(bounds, cumulative)),
+                                    "sum": total, "count": count})
+                else:
+                    samples.append({"labels": labels, "value": metric.value})
+            result[name] = {"type": kind, "help": help_text, "samples": samples}
+        return result
+
+    def dump(self, path):
+        """
+        把 JSON 快照原子写入文件。
+
+        Args:
+            path (str): 快照文件路径。
+        """
+        payload = {"time": time.time(), "metrics": self.snapshot()}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value, quote=True)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(text, quote=False):
+    """
+    转义说明文本（反斜杠和换行）或标签值（另外转义双引号）。
+    """
+    text = str(text).replace('\\', '\\\\').replace('\n', '\\n')
+    return text.replace('"', '\\"') if quote else text
+
+
+registry = MetricsRegistry()  # 全局指标注册表
+
+# ----- 应用指标 -----
+CLICKS = registry.counter("book_clicks_total", "允许的点击次数")
+LIMIT_HITS = registry.counter("book_click_limit_hits_total", "因达到每日点击次数限制而拒绝的点击次数")
+QUOTA_CHECK_SECONDS = registry.histogram("book_quota_check_seconds", "检查每日点击次数限制并记录一次点击的耗时（秒）")
+QUOTA_LOAD_SECONDS = registry.histogram("book_quota_load_seconds", "从 CSV 文件加载点击次数的耗时（秒）")
+QUOTA_SAVE_SECONDS = registry.histogram("book_quota_save_seconds", "把点击次数写入 CSV 文件的耗时（秒）")
+DRAW_SECONDS = registry.histogram("book_draw_seconds", "抽取一个答案的耗时（秒）")
+CLICK_HANDLER_SECONDS = registry.histogram("book_click_handler_seconds", "桌面应用点击处理本身的耗时（秒）")
+CLICK_FIRST_CHAR_SECONDS = registry.histogram("book_click_first_char_seconds", "从点击到答案第一个字显示的耗时（秒）")
+ANIMATION_SECONDS = registry.histogram("book_answer_animation_seconds", "答案逐字显示动画的耗时（秒）",
+                                       buckets=ANIMATION_BUCKETS)
+CORPUS_LOAD_SECONDS = registry.histogram("book_corpus_load_seconds", "加载答案库的耗时（秒）")
+CORPUS_ANSWERS = registry.gauge("book_corpus_answers", "当前答案库中的答案条数")
+STARTUP_PHASE_SECONDS = registry.gauge("book_startup_phase_seconds", "桌面应用各启动阶段的耗时（秒）",
+                                       labelnames=("phase",))
+HTTP_REQUESTS = registry.counter("book_http_requests_total", "服务模式处理的 HTTP 请求数", labelnames=("status",))
+HTTP_REQUEST_SECONDS = registry.histogram("book_http_request_seconds", "服务模式处理一个 HTTP 请求的耗时（秒）")
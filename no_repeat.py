@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import os
+import struct
+import sys
+
+
+# 已抽取次数不超过该值时不常驻保存交换表，每次抽取时重放前几步临时得到（每天只抽几次的用户占用内存最小）
+_REPLAY_LIMIT = 8
+_RECORD_HEAD = struct.Struct("<H10sII")  # 用户 ID 字节长度、日期、已抽取次数、答案库大小
+_FILE_MAGIC = b"BNR1"  # 状态文件魔数
+
+
+class _UserState:
+    """
+    单个用户当天的不重复抽取状态。
+    """
+
+    __slots__ = ('date', 'drawn', 'seen', 'swaps')
+
+    def __init__(self, date_str, size):
+        self.date = sys.intern(date_str)  # 状态所属日期 (YYYY-MM-DD)，同一天的所有用户共用一个字符串
+        self.drawn = 0  # 当天已抽取次数，也是 Fisher-Yates 的当前步数
+        self.seen = bytearray((size + 7) // 8)  # 已抽到的位置位图，350 条答案只需 44 字节
+        # Fisher-Yates 中被交换过的位置 -> 当前值（稀疏表示，未出现的位置值等于自身）；
+        # 已抽取次数不超过 _REPLAY_LIMIT 时为 None，需要时重放得到
+        self.swaps = None
+
+
+class NoRepeatTracker:
+    """
+    按用户的当天不重复抽取。
+
+    对每个用户每天的答案位置做一次“增量” Fisher-Yates 洗牌：第 k 次抽取只执行洗牌的第 k 步，
+    交换过的位置用稀疏字典保存，抽取为 O(1)。第 k 步的随机数由 (用户, 日期, k) 哈希得到，
+    因此只需持久化 (日期, 已抽取次数, 位图)，加载时重放前 k 步即可恢复洗牌状态。
+    每天只抽几次的用户不常驻保存交换表，每个用户只占用约 200 字节，服务模式下可容纳数百万用户。
+    所有答案都抽过一遍后重新开始新一轮。
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size (int): 答案库中的答案条数。
+        """
+        self.size = size
+        self._states = {}  # user_id -> _UserState
+
+    @staticmethod
+    def _seed(user_id, date_str):
+        """
+        由用户 ID 和日期派生种子。
+        """
+        return hashlib.blake2b(f"{user_id}\x00{date_str}".encode('utf-8'), digest_size=8).digest()
+
+    @staticmethod
+    def _step_random(seed, step, bound):
+        """
+        第 step 步在 [0, bound) 中的随机数，只依赖种子和步数。
+        """
+        digest = hashlib.blake2b(step.to_bytes(8, 'little'), key=seed, digest_size=8).digest()
+        return int.from_bytes(digest, 'little') % bound
+
+    def _step(self, swaps, seed, step):
+        """
+        在交换表上执行 Fisher-Yates 的第 step 步，返回该步选出的位置。
+        """
+        j = step + self._step_random(seed, step, self.size - step)
+        value_j = swaps.get(j, j)
+        # 交换 a[step] 和 a[j]；a[step] 之后不会再被访问，不必保存
+        swaps[j] = swaps.pop(step, step)
+        if j == step:
+            swaps.pop(j, None)
+        return value_j
+
+    def _advance(self, state, user_id):
+        """
+        执行用户洗牌的下一步，返回本次抽到的位置并记入位图。
+        """
+        seed = self._seed(user_id, state.date)
+        swaps = state.swaps
+        if swaps is None:
+            # 重放已执行的步骤，临时恢复交换表
+            swaps = {}
+            for step in range(state.drawn):
+                self._step(swaps, seed, step)
+        value_j = self._step(swaps, seed, state.drawn)
+        state.drawn += 1
+        if state.drawn > _REPLAY_LIMIT:
+            state.swaps = swaps
+        state.seen[value_j >> 3] |= 1 << (value_j & 7)
+        return value_j
+
+    def _state_for(self, user_id, date_str):
+        """
+        取得用户当天的状态，日期变化或一轮抽完时重新开始。
+        """
+        state = self._states.get(user_id)
+        if state is None or state.date != date_str or state.drawn >= self.size:
+            if state is not None and state.date == date_str:
+                logging.info(f"用户 {user_id} 今天已抽完全部 {self.size} 条答案，重新开始新一轮")
+            state = _UserState(date_str, self.size)
+            self._states[user_id] = state
+        return state
+
+    def next_position(self, user_id, date_str):
+        """
+        为用户抽取当天尚未抽到过的答案位置。
+
+        Args:
+            user_id (str): 用户 ID。
+            date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+
+        Returns:
+            int: 答案位置 (0 ~ size-1)，答案库为空时返回 None。
+        """
+        if not self.size:
+            return None
+        return self._advance(self._state_for(user_id, date_str), user_id)
+
+    def peek_position(self, user_id, date_str):
+        """
+        返回下一次 next_position 将抽到的位置，但不记为已抽取（用于预取，答案真正显示时再调用 next_position）。
+
+        Args:
+            user_id (str): 用户 ID。
+            date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+
+        Returns:
+            int: 答案位置 (0 ~ size-1)，答案库为空时返回 None。
+        """
+        if not self.size:
+            return None
+        state = self._states.get(user_id)
+        drawn = state.drawn if state is not None and state.date == date_str else 0
+        if drawn >= self.size:
+            drawn = 0  # next_position 会开始新一轮
+        seed = self._seed(user_id, date_str)
+        swaps = state.swaps if drawn and state.swaps is not None else None
+        if swaps is None:
+            swaps = {}
+            for step in range(drawn):
+                self._step(swaps, seed, step)
+        j = drawn + self._step_random(seed, drawn, self.size - drawn)
+        return swaps.get(j, j)
+
+    def has_seen(self, user_id, date_str, position):
+        """
+        判断用户当天是否已抽到过指定位置。
+        """
+        state = self._states.get(user_id)
+        if state is None or state.date != date_str:
+            return False
+        return bool(state.seen[position >> 3] & (1 << (position & 7)))
+
+    def save(self, path):
+        """
+        把所有用户的状态原子写入文件（先写临时文件再重命名）。
+
+        只保存日期、已抽取次数和位图，稀疏交换表在加载时重放得到。
+
+        Args:
+            path (str): 状态文件路径。
+        """
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(_FILE_MAGIC)
+                for user_id, state in self._states.items():
+                    user_bytes = user_id.encode('utf-8')
+                    f.write(_RECORD_HEAD.pack(len(user_bytes), state.date.encode('ascii'), state.drawn, self.size))
+                    f.write(user_bytes)
+                    f.write(state.seen)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.error(f"保存不重复抽取状态失败: {e}")
+
+    def load(self, path):
+        """
+        从文件加载状态，答案库大小变化的记录会被丢弃。
+
+        Args:
+            path (str): 状态文件路径。
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.error(f"读取不重复抽取状态失败: {e}")
+            return
+        if not data.startswith(_FILE_MAGIC):
+            logging.warning("不重复抽取状态文件格式不正确，已忽略")
+            return
+
+        offset = len(_FILE_MAGIC)
+        bitset_size = (self.size + 7) // 8
+        try:
+            while offset < len(data):
+                user_length, date_bytes, drawn, size = _RECORD_HEAD.unpack_from(data, offset)
+                offset += _RECORD_HEAD.size
+                user_id = data[offset:offset + user_length].decode('utf-8')
+                offset += user_length
+                record_bitset = (size + 7) // 8
+                if size != self.size:
+                    offset += record_bitset  # 答案库大小已变化，旧状态作废
+                    continue
+                date_str = date_bytes.decode('ascii')
+                state = _UserState(date_str, self.size)
+                state.drawn = drawn
+                if drawn > _REPLAY_LIMIT:
+                    # 重放前 drawn 步，恢复稀疏交换表
+                    seed = self._seed(user_id, date_str)
+                    state.swaps = {}
+                    for step in range(drawn):
+                        self._step(state.swaps, seed, step)
+                state.seen[:] = data[offset:offset + bitset_size]
+                offset += record_bitset
+                self._states[user_id] = state
+        except (struct.error, UnicodeDecodeError) as e:
+            logging.warning(f"不重复抽取状态文件已损坏，只加载了部分记录: {e}")
@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+
+
+# ----- SQL 语句 -----
+# sqlite3 模块会缓存已编译的语句，以下语句在每个连接上只编译一次
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS click_quota (
+    user_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    date TEXT NOT NULL
+)
+"""
+_SELECT = "SELECT count, date FROM click_quota WHERE user_id = ?"
+_UPSERT = """
+INSERT INTO click_quota (user_id, count, date) VALUES (?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET count = excluded.count, date = excluded.date
+"""
+
+
+class SqliteQuotaStore:
+    """
+    基于 SQLite（WAL 模式）的按用户每日点击次数存储。
+
+    每个用户一行 (count, date)。检查和计数在同一个 BEGIN IMMEDIATE 事务中完成，
+    多个应用实例或多个服务进程同时使用同一个数据库文件时也不会丢失计数。
+    每个线程使用各自的数据库连接。
+    """
+
+    def __init__(self, db_path, limit):
+        """
+        Args:
+            db_path (str): 数据库文件路径。
+            limit (int): 每个用户每天允许点击的最大次数。
+        """
+        self.db_path = db_path
+        self.limit = limit
+        self._local = threading.local()  # 每个线程各自的连接
+        self._connect()  # 提前建表并切换到 WAL 模式
+
+    def _connect(self):
+        """
+        获取当前线程的数据库连接，首次调用时创建。
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            import sqlite3  # 按需导入，桌面应用默认使用 CSV 后端，不需要在启动时加载 SQLite
+            # isolation_level=None: 由代码显式控制事务边界
+            connection = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")  # WAL 模式下仍能保证崩溃后数据库一致
+            connection.execute(_CREATE_TABLE)
+            self._local.connection = connection
+        return connection
+
+    def check_and_increment(self, user_id, date_str):
+        """
+        检查用户当天的点击次数，未达到限制时计数加 1。
+
+        Args:
+            user_id (str): 用户 ID。
+            date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+
+        Returns:
+            tuple: 是否允许本次点击 (bool) 和本次点击后的点击次数 (int)。
+        """
+        connection = self._connect()
+        # BEGIN IMMEDIATE 立即获取写锁，保证读取和写入之间不会有其他进程插入写操作
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(_SELECT, (user_id,)).fetchone()
+            count = row[0] if row and row[1] == date_str else 0  # 新的一天，点击次数从 0 开始
+            if count >= self.limit:
+                connection.execute("COMMIT")
+                return False, count
+            count += 1
+            connection.execute(_UPSERT, (user_id, count, date_str))
+            connection.execute("COMMIT")
+            return True, count
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def get(self, user_id):
+        """
+        读取用户的点击次数和最后点击日期。
+
+        Returns:
+            tuple: 点击次数 (int) 和最后点击日期 (str)，用户不存在时返回 (0, None)。
+        """
+        row = self._connect().execute(_SELECT, (user_id,)).fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def close(self):
+        """
+        关闭当前线程的数据库连接。
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+            logging.info(f"点击次数数据库连接已关闭: {self.db_path}")
+
+
+class WriteBehindQuota:
+    """
+    内存中的单用户每日点击次数，后台线程延迟写盘。
+
+    首次创建时从磁盘加载一次 (count, date)，之后点击只修改内存状态并唤醒后台写线程，
+    不会等待磁盘读写。后台线程把一段时间内的多次修改合并为一次写入，
+    并在 close() 时（例如窗口关闭）把最新状态写盘。
+    """
+
+    def __init__(self, load, save, limit, flush_interval=1.0):
+        """
+        Args:
+            load (callable): 无参函数，返回磁盘上保存的 (count, date_str)。
+            save (callable): 接收 (count, date_str) 并持久化的函数，需自行保证原子写入。
+            limit (int): 每天允许点击的最大次数。
+            flush_interval (float, optional): 合并写入的时间间隔（秒），默认 1 秒。
+        """
+        self.limit = limit
+        self._save = save
+        self._flush_interval = flush_interval
+        self._count, self._date = load()
+        self._dirty = False  # 内存状态是否有尚未写盘的修改
+        self._closed = False
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()  # 保证写盘按快照先后顺序进行
+        self._writer = threading.Thread(target=self._run, name="click-count-writer", daemon=True)
+        self._writer.start()
+
+    def check_and_increment(self, user_id, date_str):
+        """
+        检查当天的点击次数，未达到限制时计数加 1，只修改内存状态。
+
+        Args:
+            user_id (str): 用户 ID（单用户存储，忽略）。
+            date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+
+        Returns:
+            tuple: 是否允许本次点击 (bool) 和本次点击后的点击次数 (int)。
+        """
+        with self._condition:
+            if self._date != date_str:  # 新的一天，点击次数从 0 开始
+                self._count = 0
+                logging.info("新的一天，重置点击次数为 0。")
+            if self._count >= self.limit:
+                return False, self._count
+            self._count += 1
+            self._date = date_str
+            self._dirty = True
+            self._condition.notify()
+            return True, self._count
+
+    def get(self, user_id=None):
+        """
+        读取内存中的点击次数和最后点击日期。
+
+        Returns:
+            tuple: 点击次数 (int) 和最后点击日期 (str)。
+        """
+        with self._condition:
+            return self._count, self._date
+
+    def _write_pending(self):
+        """
+        取出待写盘的状态并写盘，没有修改时直接返回。
+        """
+        with self._save_lock:
+            with self._condition:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = (self._count, self._date)
+            self._save(*snapshot)
+
+    def _run(self):
+        """
+        后台写线程：等待修改，再等待一个合并间隔后写盘。
+        """
+        while True:
+            with self._condition:
+                while not self._dirty and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # 等待合并间隔，期间的多次点击只写盘一次；close() 会提前结束等待
+                deadline = time.monotonic() + self._flush_interval
+                while not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return
+            self._write_pending()
+
+    def flush(self):
+        """
+        立即把尚未写盘的修改写入磁盘。
+        """
+        self._write_pending()
+
+    def close(self):
+        """
+        停止后台写线程并写入最新状态。
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+        self.flush()
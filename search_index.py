@@ -0,0 +1,431 @@
+import bisect
+import contextlib
+import functools
+import heapq
+import logging
+import math
+import os
+import pickle
+import re
+import time
+from array import array
+from collections import Counter
+
+from corpus_utils import file_digest, normalize_cn, normalize_en
+
+
+INDEX_VERSION = 1  # 索引文件格式版本，格式变化时递增使旧索引失效
+TOP_IMPACTS = 256  # 常用词预先保存的高分答案个数，单个常用词的检索只需要读取这些答案
+OPEN_CACHE_SIZE = 1024  # 已打开（解码后）的倒排表缓存条数，常用词只解码一次
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_VARINT = 0  # 倒排表为变长整数编码
+_BITMAP = 1  # 倒排表为位图（出现在至少 1/8 的答案中的词，位图比变长整数更小）
+_WORD = re.compile(r"[0-9a-z]+(?:'[0-9a-z]+)*")  # 英文单词（保留 don't 这类缩写）
+_CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')  # 连续的汉字
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]  # 字节值 -> 置位的位
+
+
+def tokenize(text):
+    """
+    把答案文本切分为索引词：英文按单词（小写），汉字按单字和相邻两字（二元组）。
+
+    Args:
+        text (str): 已规范化的文本。
+
+    Returns:
+        list: 索引词列表（可重复，用于计算词频）。
+    """
+    tokens = _WORD.findall(text.lower())
+    for run in _CJK_RUN.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_terms(query):
+    """
+    把查询切分为检索词（去重）。
+
+    连续两个以上的汉字只使用二元组，比单字更有区分度；单个汉字使用单字。
+    """
+    query = normalize_en(query).lower()
+    terms = _WORD.findall(query)
+    for run in _CJK_RUN.findall(query):
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return list(dict.fromkeys(terms))
+
+
+def _encode_varint_postings(positions, frequencies):
+    """
+    把倒排表编码为变长整数序列：每项为 (位置差 << 1 | 词频是否大于 1)，词频大于 1 时随后写入词频。
+    """
+    out = bytearray()
+    previous = 0
+    for position in positions:
+        frequency = frequencies.get(position, 1)
+        value = (position - previous) << 1 | (frequency > 1)
+        previous = position
+        while value >= 0x80:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+        if frequency > 1:
+            while frequency >= 0x80:
+                out.append(frequency & 0x7F | 0x80)
+                frequency >>= 7
+            out.append(frequency)
+    return bytes(out)
+
+
+def _decode_varint_postings(data):
+    """
+    解码变长整数倒排表。
+
+    Returns:
+        tuple: (位置数组, 词频数组)，位置升序。
+    """
+    positions = array('I')
+    frequencies = array('I')
+    position = 0
+    index = 0
+    length = len(data)
+    while index < length:
+        value = 0
+        shift = 0
+        while True:
+            byte = data[index]
+            index += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        position += value >> 1
+        positions.append(position)
+        if value & 1:
+            frequency = 0
+            shift = 0
+            while True:
+                byte = data[index]
+                index += 1
+                frequency |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            frequencies.append(frequency)
+        else:
+            frequencies.append(1)
+    return positions, frequencies
+
+
+def _impact(frequency, length, average_length):
+    """
+    BM25 中与 idf 无关的单词得分部分。
+    """
+    return frequency * (_BM25_K1 + 1) / (frequency + _BM25_K1 * (1 - _BM25_B + _BM25_B * length / average_length))
+
+
+class _VarintPostings:
+    """
+    解码后的变长整数倒排表，按位置二分查找词频。
+    """
+
+    __slots__ = ('positions', '_frequencies')
+
+    def __init__(self, data):
+        self.positions, self._frequencies = _decode_varint_postings(data)
+
+    def frequency(self, position):
+        """
+        返回词在该位置答案中的词频，不包含该词时返回 0。
+        """
+        found = bisect.bisect_left(self.positions, position)
+        if found < len(self.positions) and self.positions[found] == position:
+            return self._frequencies[found]
+        return 0
+
+
+class _BitmapPostings:
+    """
+    位图倒排表，查询某个位置是否包含该词只需读取一个字节，不需要解码。
+    """
+
+    __slots__ = ('_bitmap', '_frequencies', '_positions')
+
+    def __init__(self, bitmap, frequencies):
+        self._bitmap = bitmap
+        self._frequencies = frequencies  # 词频大于 1 的位置 -> 词频
+        self._positions = None
+
+    def frequency(self, position):
+        """
+        返回词在该位置答案中的词频，不包含该词时返回 0。
+        """
+        if self._bitmap[position >> 3] >> (position & 7) & 1:
+            return self._frequencies.get(position, 1)
+        return 0
+
+    @property
+    def positions(self):
+        """
+        升序的位置数组（第一次访问时展开位图）。
+        """
+        if self._positions is None:
+            positions = array('I')
+            for index, byte in enumerate(self._bitmap):
+                if byte:
+                    base = index << 3
+                    positions.extend(base + bit for bit in _BYTE_BITS[byte])
+            self._positions = positions
+        return self._positions
+
+
+class SearchIndex:
+    """
+    答案全文检索倒排索引。
+
+    每个索引词对应一个压缩倒排表：一般的词用位置差和词频的变长整数编码，出现在至少 1/8 答案中的常用词用位图。
+    文档频率超过 TOP_IMPACTS 的词另外保存单词得分最高的 TOP_IMPACTS 个答案，只含常用词的查询按阈值算法
+    只读取这些高分答案；其他查询从文档频率最低的词出发求交集。只返回同时包含所有检索词的答案，按 BM25 打分。
+    """
+
+    def __init__(self, pages, lengths, postings):
+        """
+        请使用 build() 或 load() 创建。
+
+        Args:
+            pages (array): 每个位置对应的页码。
+            lengths (array): 每个位置的答案的索引词数。
+            postings (dict): 索引词 -> (文档频率, 格式, 倒排表数据, 位图格式的词频表, 高分答案位置数组)。
+        """
+        self._pages = pages
+        self._lengths = lengths
+        self._postings = postings
+        self._average_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+        self._open = functools.lru_cache(maxsize=OPEN_CACHE_SIZE)(self._open_term)
+
+    def __len__(self):
+        return len(self._pages)
+
+    @property
+    def term_count(self):
+        """
+        索引词个数。
+        """
+        return len(self._postings)
+
+    @classmethod
+    def build(cls, answer_store):
+        """
+        从答案库构建索引。
+
+        Args:
+            answer_store: 答案库对象（AnswerStore 或 BinaryCorpus）。
+
+        Returns:
+            SearchIndex: 构建完成的索引。
+        """
+        start = time.perf_counter()
+        pages = array('I')
+        lengths = array('I')
+        term_positions = {}  # 索引词 -> 位置列表
+        term_frequencies = {}  # 索引词 -> {位置: 词频}，只记录词频大于 1 的位置
+        for position, item in enumerate(answer_store):
+            pages.append(int(item["page_number"]))
+            tokens = tokenize(f'{normalize_en(str(item["EN"]))}\n{normalize_cn(str(item["CN"]))}')
+            lengths.append(len(tokens))
+            unique = set(tokens)
+            if len(unique) != len(tokens):
+                for term, count in Counter(tokens).items():
+                    if count > 1:
+                        term_frequencies.setdefault(term, {})[position] = count
+            for term in unique:
+                term_positions.setdefault(term, []).append(position)
+
+        count = len(pages)
+        average_length = (sum(lengths) / count) if count else 1.0
+        postings = {}
+        for term, positions in term_positions.items():
+            frequencies = term_frequencies.get(term, {})
+            top = None
+            if len(positions) > TOP_IMPACTS:
+                top = array('I', heapq.nsmallest(TOP_IMPACTS, positions, key=lambda position: (
+                    -_impact(frequencies.get(position, 1), lengths[position], average_length), position)))
+            if len(positions) * 8 >= count:
+                bitmap = bytearray((count + 7) >> 3)
+                for position in positions:
+                    bitmap[position >> 3] |= 1 << (position & 7)
+                postings[term] = (len(positions), _BITMAP, bytes(bitmap), frequencies, top)
+            else:
+                postings[term] = (len(positions), _VARINT, _encode_varint_postings(positions, frequencies), None, top)
+        logging.info(f"检索索引构建完成，共 {count} 条答案、{len(postings)} 个索引词，"
+                     f"耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+        return cls(pages, lengths, postings)
+
+    def _open_term(self, term):
+        _, kind, data, frequencies, _ = self._postings[term]
+        if kind == _BITMAP:
+            return _BitmapPostings(data, frequencies)
+        return _VarintPostings(data)
+
+    def search(self, query, limit=10):
+        """
+        检索同时包含查询中所有词的答案，按 BM25 得分从高到低排列。
+
+        Args:
+            query (str): 查询文本，可以混合中英文，例如 "旅行" 或 "patience"。
+            limit (int, optional): 最多返回的结果数。
+
+        Returns:
+            list: [(页码, 得分), ...]，没有匹配时为空列表。
+        """
+        terms = query_terms(query)
+        if not terms or limit <= 0 or any(term not in self._postings for term in terms):
+            return []
+        terms.sort(key=lambda term: self._postings[term][0])  # 文档频率最低的词在前
+        count = len(self._pages)
+        opened = []
+        for term in terms:
+            document_frequency = self._postings[term][0]
+            idf = math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+            opened.append((self._open(term), idf))
+
+        lengths = self._lengths
+        average_length = self._average_length
+
+        def score(position):
+            # 答案不包含某个检索词时返回 None
+            norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * lengths[position] / average_length)
+            total = 0.0
+            for postings, idf in opened:
+                frequency = postings.frequency(position)
+                if not frequency:
+                    return None
+                total += idf * frequency * (_BM25_K1 + 1) / (frequency + norm)
+            return total
+
+        best = None
+        tops = [self._postings[term][4] for term in terms]
+        if limit <= TOP_IMPACTS and all(top is not None for top in tops):
+            best = self._threshold_search(tops, opened, score, limit)
+        if best is None:
+            scored = ((score(position), -position) for position in opened[0][0].positions)
+            best = heapq.nlargest(limit, (entry for entry in scored if entry[0] is not None))
+        pages = self._pages
+        return [(pages[-negative], round(value, 4)) for value, negative in best]
+
+    def _threshold_search(self, tops, opened, score, limit):
+        """
+        阈值算法：按深度依次读取各检索词的高分答案并计算完整得分，
+        已知的第 limit 名得分不低于未读答案的得分上界（各词当前深度的单词得分之和）时停止。
+
+        Returns:
+            list: 得分最高的 limit 个 (得分, -位置)，从高到低排列；读完高分答案仍无法确定时返回 None。
+        """
+        lengths = self._lengths
+        average_length = self._average_length
+        heap = []  # 最小堆，保存当前得分最高的 limit 个答案
+        seen = set()
+        for depth in range(TOP_IMPACTS):
+            threshold = 0.0
+            for top, (postings, idf) in zip(tops, opened):
+                position = top[depth]
+                threshold += idf * _impact(postings.frequency(position), lengths[position], average_length)
+                if position in seen:
+                    continue
+                seen.add(position)
+                value = score(position)
+                if value is None:
+                    continue
+                entry = (value, -position)
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            if len(heap) == limit and heap[0][0] >= threshold:
+                return sorted(heap, reverse=True)
+        return None
+
+    def save(self, path, fingerprint):
+        """
+        原子写入索引文件（先写临时文件再重命名），写入失败只记录日志。
+        临时文件名带进程 ID，多个进程同时写入同一个索引时互不覆盖对方未写完的临时文件。
+
+        Args:
+            path (str): 索引文件路径。
+            fingerprint (dict): 答案源文件的指纹，加载时用于判断索引是否过期。
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump({
+                    'version': INDEX_VERSION,
+                    'fingerprint': fingerprint,
+                    'pages': self._pages,
+                    'lengths': self._lengths,
+                    'postings': self._postings,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.warning(f"检索索引写入失败: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        读取索引文件。
+
+        Returns:
+            tuple: (SearchIndex, 指纹 dict)，文件不存在、读取失败或版本不符时为 (None, None)。
+        """
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None, None
+        except Exception as e:
+            logging.warning(f"检索索引读取失败，将重新构建: {e}")
+            return None, None
+        if not isinstance(payload, dict) or payload.get('version') != INDEX_VERSION:
+            return None, None
+        return cls(payload['pages'], payload['lengths'], payload['postings']), payload['fingerprint']
+
+
+def load_or_build_index(answer_store, source_path, index_path):
+    """
+    加载与答案源文件对应的检索索引，索引不存在或已过期时重新构建并保存。
+
+    与答案解析缓存相同，以源文件的大小、修改时间和内容摘要判断索引是否过期：
+    大小和修改时间一致时直接使用；只有修改时间变化时比对内容摘要。
+
+    Args:
+        answer_store: 已加载的答案库对象。
+        source_path (str): 答案库的源文件路径（为 None 时只构建、不保存）。
+        index_path (str): 索引文件路径。
+
+    Returns:
+        SearchIndex: 检索索引。
+    """
+    if source_path is None:
+        return SearchIndex.build(answer_store)
+    start = time.perf_counter()
+    stat = os.stat(source_path)
+    index, fingerprint = SearchIndex.load(index_path)
+    if (index is not None and len(index) == len(answer_store)
+            and fingerprint['path'] == os.path.abspath(source_path) and fingerprint['size'] == stat.st_size):
+        if fingerprint['mtime_ns'] == stat.st_mtime_ns or fingerprint['sha256'] == file_digest(source_path):
+            logging.info(f"检索索引已加载: {index_path}，耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+            return index
+
+    index = SearchIndex.build(answer_store)
+    index.save(index_path, {
+        'path': os.path.abspath(source_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_digest(source_path),
+    })
+    return index
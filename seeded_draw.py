@@ -0,0 +1,103 @@
+import hashlib
+import random
+
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15  # SplitMix64 的计数器步长
+
+
+def splitmix64(x):
+    """
+    SplitMix64 混合函数：把 64 位整数双射地打散为另一个 64 位整数。
+    """
+    z = (x + _GOLDEN_GAMMA) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def draw_key(user_id, date_str, salt=""):
+    """
+    由用户 ID、日期和可选的盐派生 64 位抽取密钥。
+
+    Args:
+        user_id (str): 用户 ID。
+        date_str (str): 日期字符串 (YYYY-MM-DD 格式)。
+        salt (str, optional): 部署时配置的盐，防止他人预先算出答案。
+
+    Returns:
+        int: 64 位密钥。
+    """
+    digest = hashlib.blake2b(f"{user_id}\x00{date_str}".encode('utf-8'),
+                             key=salt.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class CounterRandom(random.Random):
+    """
+    基于计数器的随机数生成器。
+
+    第 n 个 64 位输出为 splitmix64(流密钥 + n * 步长)，流密钥由 (抽取密钥, 点击序号) 混合得到，
+    不依赖任何先前状态：某个用户某天第 N 次点击的答案可以直接算出，不必重放前 N-1 次。
+    接口与 random.Random 相同，可直接传给答案库的 draw() 方法。
+    """
+
+    def __init__(self, key, click_index=0):
+        """
+        Args:
+            key (int): 64 位抽取密钥（见 draw_key）。
+            click_index (int, optional): 当天的点击序号，从 0 开始。
+        """
+        self._stream = splitmix64(key ^ splitmix64(click_index))
+        self._counter = 0
+        super().__init__()
+
+    def seed(self, a=None, version=2):
+        """
+        输出完全由密钥和点击序号决定，忽略 random.Random 的默认播种。
+        """
+        self._counter = 0
+
+    def _next64(self):
+        """
+        取下一个 64 位输出。
+        """
+        value = splitmix64((self._stream + self._counter * _GOLDEN_GAMMA) & _MASK64)
+        self._counter += 1
+        return value
+
+    def random(self):
+        """
+        返回 [0, 1) 之间的浮点数（53 位精度）。
+        """
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        """
+        返回 k 位随机整数，randrange() 等方法基于它实现。
+        """
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        value = 0
+        bits = 0
+        while bits < k:
+            value |= self._next64() << bits
+            bits += 64
+        return value & ((1 << k) - 1)
+
+
+def seeded_draw(answer_store, user_id, date_str, click_index, salt=""):
+    """
+    确定性抽取：同一用户、同一天、同一点击序号总是得到同一条答案。
+
+    Args:
+        answer_store: 答案库对象（AnswerStore 或 BinaryCorpus）。
+        user_id (str): 用户 ID。
+        date_str (str): 日期字符串 (YYYY-MM-DD 格式)。
+        click_index (int): 当天的点击序号，从 0 开始。
+        salt (str, optional): 部署时配置的盐。
+
+    Returns:
+        dict: 抽取到的答案项，答案库为空时返回 None。
+    """
+    return answer_store.draw(CounterRandom(draw_key(user_id, date_str, salt), click_index))
@@ -0,0 +1,514 @@
+"""
+答案之书本地 HTTP 服务（asyncio，HTTP/1.1 keep-alive）。
+
+一个进程为多个客户端提供答案抽取和每日点击次数限制，不再需要给每个用户分发桌面程序。
+
+接口:
+    GET /draw?user=<用户ID>   抽取一条答案，按用户执行每日点击次数限制（超过限制返回 429）
+    GET /search?q=<关键词>     按关键词检索答案，按相关度排列（需要 --search）
+    GET /metrics              本进程的运行指标（Prometheus 文本格式）
+    GET /health               健康检查
+
+用法示例:
+    python server.py --host 127.0.0.1 --port 8080
+    python server.py --workers 4   # 4 个工作进程共享同一份共享内存答案库，监听同一端口
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import app_core
+import metrics
+from logging_setup import LOG_FORMAT, setup_logging
+from no_repeat import NoRepeatTracker
+from quota_store import SqliteQuotaStore
+from seeded_draw import seeded_draw
+from shared_corpus import SharedCorpus
+
+
+_MAX_HEADER_BYTES = 16 * 1024  # 请求头最大字节数
+_MAX_BODY_BYTES = 64 * 1024  # 请求体最大字节数，超过时不读取，直接返回 413 并关闭连接
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    503: "Service Unavailable",
+}
+
+
+class MemoryQuota:
+    """
+    进程内的按用户每日点击次数计数。
+
+    只在事件循环线程中访问，不做任何文件读写，检查和计数在同一次调用中完成。
+    """
+
+    def __init__(self, limit):
+        self.limit = limit  # 每个用户每天允许点击的最大次数
+        self._state = {}  # user_id -> (count, date_str)
+
+    def check_and_increment(self, user_id, date_str):
+        """
+        检查用户当天的点击次数，未达到限制时计数加 1。
+
+        Args:
+            user_id (str): 用户 ID。
+            date_str (str): 当前日期字符串 (YYYY-MM-DD 格式)。
+
+        Returns:
+            tuple: 是否允许本次点击 (bool) 和本次点击后的点击次数 (int)。
+        """
+        count, last_date = self._state.get(user_id, (0, None))
+        if last_date != date_str:
+            count = 0
+        if count >= self.limit:
+            return False, count
+        count += 1
+        self._state[user_id] = (count, date_str)
+        return True, count
+
+
+class AnswerServer:
+    """
+    答案抽取 HTTP 服务。
+
+    答案库在启动时加载一次，请求处理只做内存操作，不在事件循环上执行阻塞的文件读写。
+    """
+
+    def __init__(self, answer_store, quota, rng=None, no_repeat=None, seeded=False):
+        """
+        Args:
+            answer_store: 答案库对象（AnswerStore 或 BinaryCorpus）。
+            quota: 点击次数计数对象，需提供 limit 属性和 check_and_increment(user_id, date_str) 方法。
+            rng (random.Random, optional): 随机数生成器。
+            no_repeat (NoRepeatTracker, optional): 不重复抽取状态，提供时同一用户同一天不会抽到重复答案。
+            seeded (bool, optional): 是否确定性抽取，答案只由 (用户, 日期, 点击序号) 决定。
+        """
+        self.answer_store = answer_store
+        self.quota = quota
+        self.rng = rng or random.Random()
+        self.no_repeat = no_repeat
+        self.seeded = seeded
+        self.watcher = None  # 答案库热加载监视对象（启用热加载时）
+        self.search_index = None  # 全文检索索引（启用检索时）
+        # 内存计数直接在事件循环上调用，数据库计数放到线程池中执行，避免阻塞事件循环
+        self._quota_in_thread = not isinstance(quota, MemoryQuota)
+
+    def replace_answer_store(self, answer_store):
+        """
+        替换为重新加载的答案库，必须在事件循环线程中调用（热加载线程通过 call_soon_threadsafe 调度）。
+
+        请求处理在两次 await 之间不会看到替换到一半的状态；答案条数变化时不重复抽取状态随之重建。
+        """
+        if self.no_repeat is not None and self.no_repeat.size != len(answer_store):
+            logging.warning("答案条数已变化，当天不重复抽取状态已重置")
+            self.no_repeat = NoRepeatTracker(len(answer_store))
+        self.answer_store = answer_store
+        if self.search_index is not None:
+            # 旧索引的位置对应旧答案库，先停用检索，在线程池中为新答案库加载或重建索引
+            self.search_index = None
+            asyncio.get_running_loop().create_task(self._reload_search_index(answer_store))
+
+    async def _reload_search_index(self, answer_store):
+        """
+        为重新加载的答案库加载检索索引；期间答案库再次被替换时丢弃结果。
+        """
+        try:
+            index = await asyncio.to_thread(app_core.load_search_index, answer_store)
+        except Exception as e:
+            logging.error(f"重建检索索引失败: {e}")
+            return
+        if self.answer_store is answer_store:
+            self.search_index = index
+
+    async def handle_draw(self, query):
+        """
+        处理 /draw 请求。
+
+        Returns:
+            tuple: HTTP 状态码和响应体 (dict)。
+        """
+        user_id = query.get('user', [''])[0]
+        if not user_id:
+            return 400, {"error": "缺少 user 参数"}
+        current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+        with metrics.QUOTA_CHECK_SECONDS.time():
+            if self._quota_in_thread:
+                allowed, click_count = await asyncio.to_thread(self.quota.check_and_increment, user_id, current_date)
+            else:
+                allowed, click_count = self.quota.check_and_increment(user_id, current_date)
+        if not allowed:
+            metrics.LIMIT_HITS.inc()
+            return 429, {"error": f"今日获取答案次数已达上限 ({self.quota.limit}次)，请明日再来。",
+                         "count": click_count, "limit": self.quota.limit}
+        metrics.CLICKS.inc()
+        with metrics.DRAW_SECONDS.time():
+            if self.no_repeat is not None:
+                position = self.no_repeat.next_position(user_id, current_date)
+                answer = None if position is None else self.answer_store.at(position)
+            elif self.seeded:
+                answer = seeded_draw(self.answer_store, user_id, current_date, click_count - 1,
+                                     app_core.DRAW_SEED_SALT)
+            else:
+                answer = self.answer_store.draw(self.rng)
+        if answer is None:
+            return 503, {"error": "未能获取答案"}
+        return 200, {"page_number": answer["page_number"], "EN": answer["EN"], "CN": answer["CN"],
+                     "count": click_count, "limit": self.quota.limit}
+
+    async def handle_search(self, query):
+        """
+        处理 /search 请求。
+
+        Returns:
+            tuple: HTTP 状态码和响应体 (dict)。
+        """
+        if self.search_index is None:
+            return 503, {"error": "检索未启用或索引正在重建"}
+        text = query.get('q', [''])[0].strip()
+        if not text:
+            return 400, {"error": "缺少 q 参数"}
+        try:
+            limit = min(max(int(query.get('limit', ['10'])[0]), 1), 100)
+        except ValueError:
+            return 400, {"error": "limit 参数不是整数"}
+        # 常见词组成的多词查询在大答案库上需要上百毫秒，放到线程池中执行，避免阻塞同时到达的 /draw 请求
+        index, answer_store = self.search_index, self.answer_store
+        matches = await asyncio.to_thread(index.search, text, limit)
+        results = []
+        for page_number, score in matches:
+            answer = answer_store.get(page_number)
+            results.append({"page_number": page_number, "EN": answer["EN"], "CN": answer["CN"], "score": score})
+        return 200, {"query": text, "results": results}
+
+    async def dispatch(self, method, target):
+        """
+        根据请求方法和路径分发请求。
+
+        Returns:
+            tuple: HTTP 状态码和响应体（dict 以 JSON 格式返回，str 以 Prometheus 文本格式返回）。
+        """
+        if method != 'GET':
+            return 405, {"error": "只支持 GET 请求"}
+        parts = urlsplit(target)
+        if parts.path == '/draw':
+            return await self.handle_draw(parse_qs(parts.query))
+        if parts.path == '/search':
+            return await self.handle_search(parse_qs(parts.query))
+        if parts.path == '/metrics':
+            return 200, metrics.registry.render_prometheus()
+        if parts.path == '/health':
+            return 200, {"status": "ok", "answers": len(self.answer_store)}
+        return 404, {"error": "未知路径"}
+
+    async def handle_connection(self, reader, writer):
+        """
+        处理一个客户端连接，支持 HTTP/1.1 keep-alive，在同一连接上依次处理多个请求。
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break  # 客户端关闭连接
+                except asyncio.LimitOverrunError:
+                    await self._write_response(writer, 400, {"error": "请求头过大"}, keep_alive=False)
+                    break
+                if len(head) > _MAX_HEADER_BYTES:
+                    await self._write_response(writer, 400, {"error": "请求头过大"}, keep_alive=False)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._write_response(writer, 400, {"error": "请求行格式错误"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                # 不支持分块传输的请求体：无法确定请求体在哪里结束，残留的请求体会被当作下一个请求解析
+                if 'transfer-encoding' in headers:
+                    await self._write_response(writer, 400, {"error": "不支持 Transfer-Encoding"}, keep_alive=False)
+                    break
+
+                # 丢弃请求体（接口不需要），保证同一连接上的下一个请求能被正确解析
+                try:
+                    content_length = int(headers.get('content-length', '0') or 0)
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    await self._write_response(writer, 400, {"error": "Content-Length 格式错误"}, keep_alive=False)
+                    break
+                if content_length > _MAX_BODY_BYTES:
+                    await self._write_response(writer, 413, {"error": "请求体过大"}, keep_alive=False)
+                    break
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                connection = headers.get('connection', '').lower()
+                if version == 'HTTP/1.0':
+                    keep_alive = connection == 'keep-alive'
+                else:
+                    keep_alive = connection != 'close'
+
+                start = time.perf_counter()
+                try:
+                    status, body = await self.dispatch(method, target)
+                except Exception as e:
+                    logging.error(f"处理请求时发生错误: {e}")
+                    status, body = 503, {"error": "服务内部错误"}
+                metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start)
+                metrics.HTTP_REQUESTS.labels(status).inc()
+                await self._write_response(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # 客户端异常断开
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer, status, body, keep_alive):
+        """
+        写出响应：响应体为 dict 时写出 JSON，为 str 时写出 Prometheus 文本。
+        """
+        if isinstance(body, str):
+            payload, content_type = body.encode('utf-8'), metrics.CONTENT_TYPE
+        else:
+            payload, content_type = json.dumps(body, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8"
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    async def start(self, host, port, reuse_port=False):
+        """
+        启动监听。
+
+        Args:
+            reuse_port (bool, optional): 是否设置 SO_REUSEPORT，多个工作进程监听同一端口时由内核分配连接。
+
+        Returns:
+            asyncio.Server: 已启动的服务对象。
+        """
+        return await asyncio.start_server(self.handle_connection, host, port, limit=_MAX_HEADER_BYTES,
+                                          reuse_port=reuse_port or None)
+
+
+def create_quota(backend, limit, db_path=app_core.click_quota_db_file):
+    """
+    创建点击次数计数对象。
+
+    Args:
+        backend (str): 'sqlite'（按用户持久化，多个服务进程可共享）或 'memory'（仅本进程内有效）。
+        limit (int): 每个用户每天允许点击的最大次数。
+        db_path (str, optional): SQLite 数据库文件路径。
+
+    Returns:
+        点击次数计数对象。
+    """
+    if backend == 'sqlite':
+        return SqliteQuotaStore(db_path, limit)
+    return MemoryQuota(limit)
+
+
+async def create_server(host, port, limit=app_core.DAILY_CLICK_LIMIT, quota_backend='memory', no_repeat=False,
+                        seeded=False, watch=False, answer_store=None, reuse_port=False, search=False):
+    """
+    加载答案库并启动服务。
+
+    答案库在线程池中加载，避免阻塞事件循环；工作进程直接使用父进程提供的共享内存答案库。
+
+    Args:
+        host (str): 监听地址。
+        port (int): 监听端口，0 表示由系统分配。
+        limit (int): 每个用户每天允许点击的最大次数。
+        quota_backend (str, optional): 点击次数存储后端，'sqlite' 或 'memory'。
+        no_repeat (bool, optional): 是否启用当天不重复抽取（状态从 app_core.no_repeat_file 加载）。
+        seeded (bool, optional): 是否启用确定性抽取。
+        watch (bool, optional): 是否启用答案库热加载。
+        answer_store (optional): 已加载的答案库对象，提供时不再自行加载。
+        reuse_port (bool, optional): 是否与其他工作进程共享监听端口。
+        search (bool, optional): 是否启用 /search 检索（索引保存在 app_core.search_index_file，过期时重建）。
+
+    Returns:
+        tuple: (asyncio.Server, AnswerServer)。
+
+    Raises:
+        RuntimeError: 答案库加载失败。
+    """
+    if answer_store is None:
+        answer_store, load_error = await asyncio.to_thread(app_core.load_answer_store)
+        if load_error:
+            raise RuntimeError(load_error)
+    quota = await asyncio.to_thread(create_quota, quota_backend, limit)
+    tracker = None
+    if no_repeat:
+        tracker = NoRepeatTracker(len(answer_store))
+        await asyncio.to_thread(tracker.load, app_core.no_repeat_file)
+    answer_server = AnswerServer(answer_store, quota, no_repeat=tracker, seeded=seeded)
+    metrics.CORPUS_ANSWERS.set_function(lambda: len(answer_server.answer_store))  # 热加载后随之变化
+    if search:
+        answer_server.search_index = await asyncio.to_thread(app_core.load_search_index, answer_store)
+    if watch:
+        loop = asyncio.get_running_loop()
+        answer_server.watcher = app_core.watch_answer_store(
+            lambda new_store: loop.call_soon_threadsafe(answer_server.replace_answer_store, new_store))
+    server = await answer_server.start(host, port, reuse_port)
+    return server, answer_server
+
+
+async def serve(host, port, limit, quota_backend, no_repeat, seeded=False, watch=False, answer_store=None,
+                reuse_port=False, search=False):
+    """
+    启动服务并一直运行，停止时保存不重复抽取状态。
+    """
+    server, answer_server = await create_server(host, port, limit, quota_backend, no_repeat, seeded, watch,
+                                                answer_store, reuse_port, search)
+    addresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+    logging.info(f"答案服务已启动: {addresses}")
+    print(f"答案服务已启动: {addresses}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if answer_server.watcher is not None:
+            answer_server.watcher.stop()
+        if answer_server.no_repeat is not None:
+            answer_server.no_repeat.save(app_core.no_repeat_file)
+
+
+def configure_logging(log_file, sample_rate=None):
+    """
+    配置服务日志：指定日志文件时由后台线程写入并按大小轮转，否则输出到标准错误。
+    """
+    if log_file:
+        setup_logging(log_file, sample_rate=sample_rate)
+    else:
+        logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+
+def _worker_main(shm_name, index, host, port, limit, quota_backend, seeded, search, log_file, sample_rate):
+    """
+    工作进程入口：只读挂载共享内存答案库，与其他工作进程共享监听端口。
+    """
+    if log_file:
+        # 每个工作进程写自己的日志文件，避免多个进程同时轮转同一个文件
+        root, ext = os.path.splitext(log_file)
+        log_file = f"{root}.worker{index}{ext}"
+    configure_logging(log_file, sample_rate)
+    shared = SharedCorpus.attach(shm_name)
+    try:
+        asyncio.run(serve(host, port, limit, quota_backend, False, seeded, answer_store=shared.corpus,
+                          reuse_port=True, search=search))
+    except KeyboardInterrupt:
+        logging.info(f"工作进程 {index} 已停止")
+    finally:
+        shared.close()
+
+
+def run_workers(args):
+    """
+    多进程模式：父进程加载一次答案库并写入共享内存，再启动多个工作进程提供服务。
+
+    Returns:
+        int: 进程退出码。
+    """
+    answer_store, load_error = app_core.load_answer_store()
+    if load_error:
+        logging.error(load_error)
+        return 1
+    if args.search:
+        # 由父进程在启动工作进程之前构建并保存过期的检索索引，工作进程只需读取，不会各自重复构建
+        app_core.load_search_index(answer_store)
+    shared = SharedCorpus.create(answer_store)
+    del answer_store  # 父进程不再需要原答案库对象
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(target=_worker_main, name=f"answer-worker-{index}",
+                        args=(shared.name, index, args.host, args.port, args.limit, args.quota, args.seeded,
+                              args.search, args.log_file, args.log_sample_rate))
+        for index in range(args.workers)
+    ]
+    try:
+        for worker in workers:
+            worker.start()
+        logging.info(f"已启动 {len(workers)} 个工作进程，共享内存答案库: {shared.name}")
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # 终端的 Ctrl+C 同时发给了工作进程，等待它们自行退出，期间忽略重复的中断信号
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        logging.info("答案服务正在停止")
+        for worker in workers:
+            worker.join(timeout=5)
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        shared.close()
+    return 0
+
+
+def main(argv=None):
+    """
+    命令行入口。
+    """
+    parser = argparse.ArgumentParser(description="答案之书本地 HTTP 服务")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址，默认 127.0.0.1")
+    parser.add_argument('--port', type=int, default=8080, help="监听端口，默认 8080")
+    parser.add_argument('--limit', type=int, default=app_core.DAILY_CLICK_LIMIT,
+                        help=f"每个用户每天允许点击的最大次数，默认 {app_core.DAILY_CLICK_LIMIT}")
+    parser.add_argument('--quota', choices=['sqlite', 'memory'], default='sqlite',
+                        help="点击次数存储后端，默认 sqlite（持久化，可被多个服务进程共享）")
+    parser.add_argument('--no-repeat', action='store_true', help="同一用户同一天不抽到重复的答案")
+    parser.add_argument('--seeded', action='store_true', default=app_core.SEEDED_DRAW,
+                        help="确定性抽取：答案只由用户、日期和点击序号决定 (盐取自环境变量 BOOK_DRAW_SALT)")
+    parser.add_argument('--watch', action='store_true', default=app_core.HOT_RELOAD,
+                        help="答案文件变化后自动重新加载答案库，无需重启服务")
+    parser.add_argument('--search', action='store_true', help="启用 /search 关键词检索")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="工作进程数，大于 1 时答案库只加载一次并放入共享内存，各进程监听同一端口（需要 SQLite 后端）")
+    parser.add_argument('--log-file', default=None,
+                        help="日志文件路径（后台线程写入并按大小轮转），默认输出到标准错误")
+    parser.add_argument('--log-sample-rate', type=float, default=None, help="点击日志采样率 (0~1)")
+    args = parser.parse_args(argv)
+    if args.workers > 1:
+        # 多进程之间只共享答案库和 SQLite 点击次数，内存计数、不重复抽取状态和热加载都是进程内的
+        if args.quota != 'sqlite':
+            parser.error("--workers 大于 1 时需要 --quota sqlite")
+        if args.no_repeat or args.watch:
+            parser.error("--workers 大于 1 时不支持 --no-repeat 和 --watch")
+
+    configure_logging(args.log_file, args.log_sample_rate)
+    app_core.check_data_directory()
+    if args.workers > 1:
+        return run_workers(args)
+    try:
+        asyncio.run(serve(args.host, args.port, args.limit, args.quota, args.no_repeat, args.seeded, args.watch,
+                          search=args.search))
+    except KeyboardInterrupt:
+        logging.info("答案服务已停止")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
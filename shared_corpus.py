@@ -0,0 +1,90 @@
+import logging
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+from binary_corpus import BinaryCorpus, build_corpus_bytes
+
+
+class SharedCorpus:
+    """
+    共享内存答案库。
+
+    父进程把答案库编码为二进制答案库格式（定长偏移表 + UTF-8 字符串区，见 binary_corpus）后
+    写入一段 multiprocessing.shared_memory，各工作进程按名称只读挂载，通过 BinaryCorpus 读取，
+    只在抽中某条答案时才解码它的文本。答案库在内存中只有一份，工作进程增加时每个进程的内存占用基本不变。
+    """
+
+    def __init__(self, shm, size, owner):
+        """
+        请使用 create() 或 attach() 创建。
+
+        Args:
+            shm (shared_memory.SharedMemory): 共享内存段。
+            size (int): 答案库数据的实际字节数（共享内存段可能按页大小向上取整）。
+            owner (bool): 是否为创建者（创建者负责在最后释放共享内存段）。
+        """
+        self._shm = shm
+        self._owner = owner
+        self._view = shm.buf[:size].toreadonly()  # 只读视图，工作进程无法修改答案库
+        self.corpus = BinaryCorpus(self._view)
+
+    @property
+    def name(self):
+        """
+        共享内存段名称，传给工作进程用于挂载。
+        """
+        return self._shm.name
+
+    @classmethod
+    def create(cls, answer_store):
+        """
+        把答案库写入新的共享内存段。
+
+        Args:
+            answer_store: 答案库对象（AnswerStore 或 BinaryCorpus），或答案列表。
+
+        Returns:
+            SharedCorpus: 创建者持有的共享答案库。
+        """
+        data = build_corpus_bytes(list(answer_store))
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        shm.buf[:len(data)] = data
+        logging.info(f"答案库已写入共享内存 {shm.name}，大小: {len(data)} 字节")
+        return cls(shm, len(data), owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        按名称只读挂载已有的共享答案库（在工作进程中调用）。
+
+        Args:
+            name (str): 共享内存段名称。
+
+        Returns:
+            SharedCorpus: 挂载的共享答案库。
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # 3.13 之前挂载也会登记到 resource_tracker，工作进程退出时会误删父进程的共享内存段，
+            # 挂载期间临时跳过登记
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, len(shm.buf), owner=False)
+
+    def close(self):
+        """
+        解除挂载；创建者同时释放共享内存段。调用后 corpus 不可再使用。
+        """
+        if self._shm is None:
+            return
+        self.corpus = None
+        self._view.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,110 @@
+import builtins
+import json
+import os
+import sys
+import time
+
+
+PROFILE_FLAG = "--profile-startup"  # 启用启动耗时分析的命令行参数
+PROFILE_REPORT_FILE = "./data/startup_profile.json"  # 启动耗时报告文件路径
+
+
+class StartupProfiler:
+    """
+    启动耗时分析器。
+
+    始终记录每个启动阶段的耗时（每个阶段只调用一次 perf_counter，同时作为运行指标导出）；
+    启用后还通过包装 builtins.__import__ 记录每个首次导入模块的耗时（包含其依赖的导入时间），
+    并可写出报告。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()  # 分析起点
+        self._last = self.origin  # 上一个阶段结束的时间
+        self.phases = []  # [(阶段名称, 耗时秒数, 结束时距起点的秒数)]
+        self.imports = []  # [(模块名称, 耗时秒数, 嵌套深度)]
+        self._import_depth = 0
+        self.original_import = None
+
+    def enable(self):
+        """
+        启用分析并开始记录模块导入耗时。
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self.origin = self._last = time.perf_counter()
+        self.original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def enable_if_requested(self, argv):
+        """
+        命令行参数包含 --profile-startup 时启用分析。
+
+        Args:
+            argv (list): 命令行参数列表。
+        """
+        if PROFILE_FLAG in argv:
+            self.enable()
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """
+        记录首次导入模块耗时的 __import__ 包装函数。
+        """
+        if level or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        depth = self._import_depth
+        self._import_depth += 1
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._import_depth = depth
+            self.imports.append((name, time.perf_counter() - start, depth))
+
+    def mark(self, phase):
+        """
+        记录一个启动阶段结束，耗时为距上一个阶段结束的时间。
+
+        Args:
+            phase (str): 阶段名称。
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, now - self.origin))
+        self._last = now
+
+    def report(self, path=PROFILE_REPORT_FILE):
+        """
+        停止记录导入耗时，把启动耗时报告写入 JSON 文件。
+
+        Args:
+            path (str, optional): 报告文件路径。
+
+        Returns:
+            str: 报告文件路径，未启用时返回 None。
+        """
+        if not self.enabled:
+            return None
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+        report = {
+            "total_ms": round(self.phases[-1][2] * 1000, 3) if self.phases else 0.0,
+            "phases": [
+                {"phase": phase, "ms": round(elapsed * 1000, 3), "at_ms": round(at * 1000, 3)}
+                for phase, elapsed, at in self.phases
+            ],
+            # 按耗时从大到小排列，depth 为 0 的是主程序直接导入的模块
+            "imports": [
+                {"module": name, "ms": round(elapsed * 1000, 3), "depth": depth}
+                for name, elapsed, depth in sorted(self.imports, key=lambda item: item[1], reverse=True)
+            ],
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path
+
+
+startup_profiler = StartupProfiler()  # 全局启动耗时分析器
@@ -0,0 +1,194 @@
+import json
+import logging
+import threading
+import time
+
+from answer_store import AnswerStore
+
+
+BATCH_SIZE = 1000  # 每批交给答案库的答案条数
+_CHUNK_CHARS = 1 << 16  # 每次从文件读取的字符数
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(f, chunk_chars=_CHUNK_CHARS):
+    """
+    增量解析顶层为数组的 JSON 文件，逐个产出数组元素，不需要一次读入整个文档。
+
+    Args:
+        f: 以文本模式打开的文件对象。
+        chunk_chars (int, optional): 每次读取的字符数。
+
+    Yields:
+        数组中的元素。
+
+    Raises:
+        json.JSONDecodeError: 文件内容不是有效的 JSON 数组。
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        # 丢弃已解析的部分并读入更多内容，返回是否读到了新内容
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_chars)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if position >= len(buffer) or buffer[position] != '[':
+        raise json.JSONDecodeError("答案文件顶层不是 JSON 数组", buffer, position)
+    position += 1
+    skip_whitespace()
+    if position < len(buffer) and buffer[position] == ']':
+        return
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            # 元素之后应当是逗号或 ']'；缓冲区在元素之后就结束了，或者紧跟的不是分隔符
+            # （例如只读入了数字 "12.5" 中的 "12."），说明元素可能被截断，读入更多内容后重新解析
+            following = end
+            while following < len(buffer) and buffer[following] in _WHITESPACE:
+                following += 1
+            if (following >= len(buffer) or buffer[following] not in ',]') and not eof and fill():
+                continue
+            break
+        position = end
+        yield item
+        skip_whitespace()
+        if position >= len(buffer):
+            raise json.JSONDecodeError("JSON 数组未结束", buffer, position)
+        separator = buffer[position]
+        position += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise json.JSONDecodeError("JSON 数组元素之间缺少逗号", buffer, position - 1)
+
+
+def iter_json_lines(f):
+    """
+    逐行解析 JSON Lines 文件，跳过空行。
+
+    Yields:
+        每行的 JSON 值。
+
+    Raises:
+        json.JSONDecodeError: 某一行不是有效的 JSON（错误信息包含行号）。
+    """
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(f"第 {line_number} 行: {e.msg}", e.doc, e.pos) from None
+
+
+def iter_answer_batches(path, batch_size=BATCH_SIZE):
+    """
+    流式读取答案文件，按批产出答案项。
+
+    根据第一个非空白字符判断格式：'[' 为 JSON 数组，其他为 JSON Lines（每行一个答案项）。
+
+    Args:
+        path (str): 答案文件路径（.json 或 .jsonl）。
+        batch_size (int, optional): 每批的答案条数。
+
+    Yields:
+        list: 一批答案项。
+    """
+    # utf-8-sig 会去掉文件开头可能存在的 BOM
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        head = f.read(_CHUNK_CHARS)
+        first = head.lstrip(_WHITESPACE)[:1]
+        f.seek(0)
+        items = iter_json_array(f) if first == '[' else iter_json_lines(f)
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def load_streaming(path, batch_size=BATCH_SIZE):
+    """
+    流式读取答案文件并构建答案库（同步完成），内存中不会同时存在整个文档和全部答案字典。
+
+    Returns:
+        AnswerStore: 构建完成的答案库。
+    """
+    store = AnswerStore([], finish=False)
+    for batch in iter_answer_batches(path, batch_size):
+        store.extend(batch)
+    store.finish()
+    return store
+
+
+class StreamingLoad:
+    """
+    在后台线程中流式加载答案文件。
+
+    每解析完一批答案就追加到 store 中，调用方可以立即从已加载的部分抽取答案；
+    全部加载完成后 done 事件被设置，error 为加载失败时的错误信息（已加载的答案仍然可用）。
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        """
+        Args:
+            path (str): 答案文件路径（.json 或 .jsonl）。
+            batch_size (int, optional): 每批的答案条数。
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.store = AnswerStore([], finish=False)
+        self.done = threading.Event()
+        self.error = None
+        self._thread = None
+
+    def start(self):
+        """
+        启动后台加载线程。
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="answer-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            for batch in iter_answer_batches(self.path, self.batch_size):
+                self.store.extend(batch)
+        except (OSError, ValueError) as e:
+            # json.JSONDecodeError 和 UnicodeDecodeError 都是 ValueError 的子类
+            self.error = f"加载答案文件时发生错误: {self.path}\n错误信息: {e}"
+            logging.error(f"流式加载答案文件失败（已加载 {len(self.store)} 条）: {e}")
+        finally:
+            self.store.finish()
+            logging.info(f"答案文件流式加载结束，共 {len(self.store)} 条，耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+            self.done.set()
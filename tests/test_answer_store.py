@@ -0,0 +1,49 @@
+from answer_store import AnswerStore
+
+
+def _answers(*pages, tag=""):
+    return [{"page_number": page, "EN": f"en{page}{tag}", "CN": f"cn{page}{tag}"} for page in pages]
+
+
+def test_dense_pages_keep_first_duplicate():
+    store = AnswerStore(_answers(1, 2, 3) + _answers(2, 1, tag="dup"))
+    assert len(store) == 3
+    assert store.duplicates == [2, 1]
+    assert store.gaps == []
+    assert store._index is None  # 重复页码不会破坏连续页码的下标定位
+    assert store.get(2)["EN"] == "en2" and store.get(1)["CN"] == "cn1"
+    assert store.get(0) is None and store.get(4) is None
+
+
+def test_gaps_and_duplicates_after_switching_to_index():
+    store = AnswerStore(_answers(10, 11, 15, 3, 11, 15, 12))
+    assert [item["page_number"] for item in store] == [10, 11, 15, 3, 12]
+    assert store.duplicates == [11, 15]
+    assert store.gaps == [4, 5, 6, 7, 8, 9, 13, 14]  # 首个页码之前的页码也参与缺口检查
+    assert store.get(3)["EN"] == "en3" and store.get(10)["EN"] == "en10"
+    assert store.get(13) is None
+
+
+def test_invalid_items_are_skipped_without_gaps_or_duplicates():
+    answers = _answers(1) + [
+        {"page_number": "x", "EN": "bad", "CN": "坏"},
+        {"page_number": 2, "EN": "no cn"},
+        {"page_number": -1, "EN": "negative", "CN": "负数"},
+        None,
+    ] + _answers(2)
+    store = AnswerStore(answers)
+    assert [item["page_number"] for item in store] == [1, 2]
+    assert store.duplicates == [] and store.gaps == []
+    assert store.get(2)["EN"] == "en2"
+
+
+def test_duplicates_and_gaps_across_batches():
+    store = AnswerStore(_answers(1, 2), finish=False)
+    assert store.loading and len(store) == 2
+    store.extend(_answers(2, 3, 6, tag="b"))
+    store.extend(_answers(6, 4, tag="c"))
+    store.finish()
+    assert not store.loading
+    assert store.duplicates == [2, 6]
+    assert store.gaps == [5]
+    assert store.get(2)["EN"] == "en2" and store.get(6)["EN"] == "en6b"
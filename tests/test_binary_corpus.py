@@ -0,0 +1,47 @@
+import pytest
+
+from binary_corpus import HEADER, BinaryCorpus, build_corpus_bytes, compile_binary_corpus
+
+ANSWERS = [
+    {"page_number": 3, "EN": "Don’t bet on it", "CN": "不要押注"},
+    {"page_number": 1, "EN": "Yes", "CN": "是"},
+    {"page_number": 2, "EN": "No", "CN": "否"},
+]
+
+
+def test_round_trip_dense_pages():
+    corpus = BinaryCorpus(build_corpus_bytes(ANSWERS))
+    assert len(corpus) == 3
+    assert list(corpus) == sorted(ANSWERS, key=lambda item: item["page_number"])
+    assert corpus.get(3) == ANSWERS[0]  # 多字节 UTF-8 文本原样还原
+    assert corpus.get(0) is None and corpus.get(4) is None
+
+
+def test_round_trip_sparse_pages_from_file(tmp_path):
+    answers = [{"page_number": page, "EN": f"en{page}", "CN": f"答案{page}"} for page in (5, 9, 20, 21)]
+    path = str(tmp_path / "answers.bin")
+    compile_binary_corpus(answers, path)
+    corpus = BinaryCorpus.open(path)
+    try:
+        assert [corpus.get(page) for page in (5, 9, 20, 21)] == answers  # 页码不连续时二分查找
+        assert corpus.get(10) is None and corpus.get(4) is None and corpus.get(22) is None
+        assert corpus.at(1) == answers[1]
+    finally:
+        corpus.close()
+
+
+def test_rejects_bad_magic_and_truncated_data():
+    data = build_corpus_bytes(ANSWERS)
+    with pytest.raises(ValueError):
+        BinaryCorpus(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        BinaryCorpus(data[:HEADER.size - 1])
+    with pytest.raises(ValueError):
+        BinaryCorpus(data[:HEADER.size + 1])  # 偏移表不完整
+
+
+def test_bad_magic_file_is_rejected(tmp_path):
+    path = tmp_path / "answers.bin"
+    path.write_bytes(b"BOA9" + build_corpus_bytes(ANSWERS)[4:])
+    with pytest.raises(ValueError):
+        BinaryCorpus.open(str(path))
@@ -0,0 +1,40 @@
+import json
+import pickle
+
+import pytest
+
+import answer_store
+from answer_store import AnswerStore
+from corpus_cache import load_store_cached
+
+ANSWERS = [
+    {"page_number": 1, "EN": "Yes", "CN": "是", "weight": 3},
+    {"page_number": 2, "EN": "No", "CN": "否", "note": "extra"},
+    {"page_number": 2, "EN": "Duplicate", "CN": "重复"},
+    {"page_number": 4, "EN": "Maybe", "CN": "也许"},
+]
+
+
+def test_warm_start_returns_built_store_without_rebuilding(tmp_path, monkeypatch):
+    json_path = tmp_path / "answers.json"
+    json_path.write_text(json.dumps(ANSWERS, ensure_ascii=False), encoding="utf-8")
+    cache_path = str(tmp_path / "answers_cache.pickle")
+    cold = load_store_cached(str(json_path), cache_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("热启动不应重新构建答案库")
+
+    monkeypatch.setattr(AnswerStore, "__init__", fail)
+    warm = load_store_cached(str(json_path), cache_path)
+    assert [dict(item) for item in warm] == [dict(item) for item in cold]
+    assert "note" not in warm.get(1) and warm.get(2)["note"] == "extra"  # 缺失字段的占位值反序列化后仍然有效
+    assert warm.get(1)["weight"] == 3 and warm._sampler is not None
+    assert warm.duplicates == [2] and warm.gaps == [3]
+    assert not warm.loading
+
+
+def test_loading_store_cannot_be_cached():
+    store = AnswerStore(ANSWERS[:1], finish=False)
+    with pytest.raises(ValueError):
+        pickle.dumps(store)
+    assert pickle.loads(pickle.dumps(answer_store._MISSING)) is answer_store._MISSING
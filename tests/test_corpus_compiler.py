@@ -0,0 +1,36 @@
+import json
+
+import corpus_compiler
+from answer_store import AnswerStore
+
+SOURCE = "EN,CN,weight\nYes,是,3\nNo,否,\nMaybe,也许,0.5\n"
+
+
+def _write_source(tmp_path):
+    path = tmp_path / "answers.csv"
+    path.write_text(SOURCE, encoding="utf-8")
+    return str(path)
+
+
+def test_weights_round_trip_through_json(tmp_path):
+    output = tmp_path / "answers.json"
+    assert corpus_compiler.main([_write_source(tmp_path), "-o", str(output), "--format", "json", "--jobs", "1"]) == 0
+    with open(output, encoding="utf-8") as f:
+        answers = json.load(f)
+    assert [item.get("weight", 1) for item in answers] == [3, 1, 0.5]
+    store = AnswerStore(answers)
+    assert [store.get(page)["weight"] for page in (1, 2, 3)] == [3, 1, 0.5]
+
+
+def test_binary_output_refuses_weights(tmp_path):
+    output = tmp_path / "answers.bin"
+    assert corpus_compiler.main([_write_source(tmp_path), "-o", str(output), "--jobs", "1"]) == 1
+    assert not output.exists()
+
+
+def test_binary_output_without_weights(tmp_path):
+    source = tmp_path / "answers.csv"
+    source.write_text("EN,CN,weight\nYes,是,1\nNo,否,\n", encoding="utf-8")
+    output = tmp_path / "answers.bin"
+    assert corpus_compiler.main([str(source), "-o", str(output), "--jobs", "1"]) == 0
+    assert output.exists()
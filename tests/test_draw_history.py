@@ -0,0 +1,111 @@
+import multiprocessing
+
+from draw_history import OUTCOME_DRAWN, OUTCOME_LIMITED, DrawHistory
+
+
+def _write(path, user_id, page_numbers):
+    history = DrawHistory(path)
+    for page_number in page_numbers:
+        history.record(user_id, "2026-01-01", page_number, OUTCOME_DRAWN)
+    history.close()
+
+
+def test_counts_survive_reopen(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = DrawHistory(path)
+    history.record("a", "2026-01-01", 3, OUTCOME_DRAWN)
+    history.record("a", "2026-01-01", None, OUTCOME_LIMITED)
+    history.close()
+
+    history = DrawHistory(path)
+    history.record("b", "2026-01-02", 3, OUTCOME_DRAWN)
+    assert len(history) == 3
+    assert history.page_count(3) == 2
+    assert history.day_stats("2026-01-01") == {"drawn": 1, "limited": 1, "failed": 0}
+    assert history.days() == ["2026-01-01", "2026-01-02"]
+    assert [record[2] for record in history.iter_records()] == ["a", "a", "b"]
+    history.close()
+
+
+def test_interleaved_writers_share_users_and_counts(tmp_path):
+    path = str(tmp_path / "history.bin")
+    first = DrawHistory(path)
+    second = DrawHistory(path)
+    for index in range(6):
+        first.record("alice", "2026-01-01", 1, OUTCOME_DRAWN)
+        second.record("bob", "2026-01-01", 2, OUTCOME_DRAWN)
+    assert len(first) == 12
+    assert second.page_count(1) == 6
+    first.close()
+    second.close()  # 后写的快照也必须包含另一个写入者的记录
+
+    history = DrawHistory(path)
+    assert len(history) == 12
+    assert history.page_count(1) == 6
+    assert history.page_count(2) == 6
+    users = [record[2] for record in history.iter_records()]
+    assert users.count("alice") == 6 and users.count("bob") == 6
+    history.close()
+
+
+def test_concurrent_processes(tmp_path):
+    path = str(tmp_path / "history.bin")
+    DrawHistory(path).close()
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_write, args=(path, f"user{index}", [index + 1] * 50)) for index in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    history = DrawHistory(path)
+    assert len(history) == 200
+    assert [history.page_count(index + 1) for index in range(4)] == [50] * 4
+    pages_by_user = {user: page for _, _, user, page, _ in history.iter_records()}
+    assert pages_by_user == {f"user{index}": index + 1 for index in range(4)}
+    history.close()
+
+
+def test_writer_records_in_background(tmp_path):
+    from draw_history import DrawHistoryWriter
+
+    path = str(tmp_path / "history.bin")
+    opened = []
+
+    def open_history():
+        opened.append(DrawHistory(path))
+        return opened[0]
+
+    writer = DrawHistoryWriter(open_history)
+    for page_number in (1, 2, 2):
+        writer.record("local", "2026-01-01", page_number, OUTCOME_DRAWN)
+    writer.close()
+    assert opened and len(opened[0]) == 3
+    assert opened[0].page_count(2) == 2
+    opened[0].close()
+
+
+def test_own_records_are_counted_without_file_lock(tmp_path, monkeypatch):
+    import draw_history
+
+    path = str(tmp_path / "history.bin")
+    history = DrawHistory(path)
+    other = DrawHistory(path)
+    history.record("a", "2026-01-01", 5, OUTCOME_DRAWN)
+
+    locks = []
+    original = draw_history._locked
+    monkeypatch.setattr(draw_history, "_locked", lambda lock_file: locks.append(lock_file) or original(lock_file))
+    assert history.page_count(5) == 1
+    assert history.day_stats("2026-01-01")["drawn"] == 1
+    assert locks == []  # 只有本进程的记录时，查询不取文件锁
+
+    other.record("b", "2026-01-01", 5, OUTCOME_DRAWN)
+    locks.clear()
+    assert history.page_count(5) == 2  # 其他写入者追加了记录，取一次文件锁重放
+    assert len(locks) == 1
+    history.record("a", "2026-01-01", 6, OUTCOME_DRAWN)
+    assert len(history) == 3 and other.page_count(6) == 1
+    history.close()
+    other.close()
@@ -0,0 +1,42 @@
+import log_analyzer
+
+LINES = [
+    "2026-01-01 08:00:00,000 - INFO - 点击日志采样率: 0.25",
+    "2026-01-01 08:00:00,001 - INFO - 应用启动",
+    "2026-01-01 08:00:01,000 - INFO - 用户点击了 '获取答案' 按钮 - 尝试获取答案 (带点击次数限制)",
+    "2026-01-01 08:00:01,001 - INFO - 本轮 r_num: 7, 准备显示的答案: EN='Yes', CN='是'",
+    "2026-01-01 08:00:02,000 - WARNING - 已达到每日点击次数限制",
+    "2026-01-02 09:00:00,000 - INFO - 点击日志采样率: 1",
+    "2026-01-02 09:00:00,001 - INFO - 应用启动",
+    "2026-01-02 09:00:01,000 - INFO - 用户点击了 '获取答案' 按钮 - 尝试获取答案 (带点击次数限制)",
+    "2026-01-02 09:00:01,001 - INFO - 本轮 r_num: 7, 准备显示的答案: EN='Yes', CN='是'",
+    "2026-01-02 09:00:02,000 - ERROR - 读取失败",
+]
+
+
+def _analyze(tmp_path, lines):
+    path = tmp_path / "log.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return log_analyzer.analyze([str(path)], jobs=1)
+
+
+def _events(summary, day):
+    return [summary["days"][day][event] for event in log_analyzer.EVENTS]
+
+
+def test_counts_and_sample_rates(tmp_path):
+    summary = _analyze(tmp_path, LINES)
+    # 启动、点击、达到限制、抽取、错误
+    assert _events(summary, "2026-01-01") == [1, 1, 1, 1, 0]
+    assert _events(summary, "2026-01-02") == [1, 1, 0, 1, 1]
+    assert summary["pages"] == {7: 2}
+    assert summary["sample_rates"] == {"2026-01-01": 0.25}  # 采样率为 1 的日期不标注
+    assert "日志采样率" in log_analyzer.format_report(summary)
+
+
+def test_out_of_order_lines_match_ordered_scan(tmp_path):
+    ordered = _analyze(tmp_path, LINES)
+    shuffled = _analyze(tmp_path, LINES[5:] + LINES[:5])  # 日期不连续，改为逐行扫描
+    assert all(_events(shuffled, day) == _events(ordered, day) for day in ("2026-01-01", "2026-01-02"))
+    assert shuffled["pages"] == ordered["pages"]
+    assert shuffled["sample_rates"] == ordered["sample_rates"]
@@ -0,0 +1,42 @@
+import logging
+import random
+
+from logging_setup import ALWAYS_LOG, CLICK_LOGGER_NAME, ClickSamplingFilter
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_sampled_out_clicks_drop_all_detail_lines_together():
+    random.seed(1)
+    sampling = ClickSamplingFilter(0.5)
+    handler = _ListHandler()
+    handler.addFilter(sampling)
+    logger = logging.getLogger(f"{CLICK_LOGGER_NAME}.test")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    try:
+        for click in range(200):
+            sampling.new_click()
+            logger.info(f"click {click}", extra=ALWAYS_LOG)
+            logger.info(f"detail {click} a")
+            logger.info(f"detail {click} b")
+            logger.info(f"r_num {click}", extra=ALWAYS_LOG)
+    finally:
+        logger.removeHandler(handler)
+
+    messages = handler.messages
+    assert [message for message in messages if message.startswith("click")] == [f"click {i}" for i in range(200)]
+    assert sum(message.startswith("r_num") for message in messages) == 200
+    kept = {int(message.split()[1]) for message in messages if message.startswith("detail")}
+    assert 0 < len(kept) < 200
+    for click in kept:
+        assert f"detail {click} a" in messages and f"detail {click} b" in messages
+    assert sum(message.startswith("detail") for message in messages) == 2 * len(kept)
@@ -0,0 +1,72 @@
+import app_core
+from answer_store import AnswerStore
+from no_repeat import NoRepeatTracker
+
+DATE = "2026-01-01"
+
+
+def _store(size):
+    return AnswerStore([{"page_number": index + 1, "EN": f"en{index}", "CN": f"cn{index}"} for index in range(size)])
+
+
+def test_round_covers_every_position_once():
+    tracker = NoRepeatTracker(50)
+    positions = [tracker.next_position("alice", DATE) for _ in range(50)]
+    assert sorted(positions) == list(range(50))
+
+
+def test_peek_matches_next_without_consuming():
+    tracker = NoRepeatTracker(30)
+    for _ in range(30 + 5):  # 超过重放上限，并跨过一轮
+        peeked = tracker.peek_position("alice", DATE)
+        assert tracker.peek_position("alice", DATE) == peeked
+        assert tracker.next_position("alice", DATE) == peeked
+    assert tracker.peek_position("bob", DATE) == NoRepeatTracker(30).next_position("bob", DATE)
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "no_repeat.bin")
+    tracker = NoRepeatTracker(40)
+    drawn = [tracker.next_position("alice", DATE) for _ in range(12)]
+    tracker.save(path)
+    restored = NoRepeatTracker(40)
+    restored.load(path)
+    assert all(restored.has_seen("alice", DATE, position) for position in drawn)
+    assert restored.next_position("alice", DATE) == tracker.next_position("alice", DATE)
+
+
+def test_prefetch_does_not_consume_positions(monkeypatch):
+    store = _store(20)
+    tracker = NoRepeatTracker(len(store))
+    monkeypatch.setattr(app_core, "NO_REPEAT", True)
+    monkeypatch.setattr(app_core, "_no_repeat_tracker", tracker)
+
+    shown = []
+    for _ in range(5):
+        # 预取（可能重复多次，例如每次启动和每次显示答案之后），再在点击时采用
+        prefetched = app_core.draw_answer(store, current_date=DATE, peek=True)
+        assert app_core.draw_answer(store, current_date=DATE, peek=True) == prefetched
+        assert not tracker.has_seen(app_core.LOCAL_USER_ID, DATE, prefetched["page_number"] - 1)
+        app_core.commit_prefetched_draw(store, DATE, prefetched["page_number"])
+        assert tracker.has_seen(app_core.LOCAL_USER_ID, DATE, prefetched["page_number"] - 1)
+        shown.append(prefetched["page_number"])
+    assert len(set(shown)) == 5
+    seen = sum(tracker.has_seen(app_core.LOCAL_USER_ID, DATE, position) for position in range(len(store)))
+    assert seen == 5
+
+
+def test_tracker_waits_for_streaming_load(monkeypatch):
+    monkeypatch.setattr(app_core, "NO_REPEAT", True)
+    monkeypatch.setattr(app_core, "_no_repeat_tracker", None)
+    monkeypatch.setattr(app_core, "no_repeat_file", "/nonexistent/no_repeat.bin")
+    store = AnswerStore([], finish=False)
+    for batch in range(3):
+        store.extend([{"page_number": batch * 10 + index + 1, "EN": "en", "CN": "cn"} for index in range(10)])
+        prefetched = app_core.draw_answer(store, current_date=DATE, peek=True)
+        assert prefetched is not None
+        app_core.commit_prefetched_draw(store, DATE, prefetched["page_number"])
+        assert app_core._no_repeat_tracker is None  # 加载期间不创建不重复抽取状态
+    store.finish()
+    first = app_core.draw_answer(store, current_date=DATE)
+    assert app_core._no_repeat_tracker.size == 30
+    assert app_core._no_repeat_tracker.has_seen(app_core.LOCAL_USER_ID, DATE, first["page_number"] - 1)
@@ -0,0 +1,40 @@
+import threading
+
+from quota_store import SqliteQuotaStore
+
+DATE = "2026-01-01"
+
+
+def test_two_threads_stop_exactly_at_limit(tmp_path):
+    db_path = str(tmp_path / "quota.sqlite3")
+    stores = [SqliteQuotaStore(db_path, 25), SqliteQuotaStore(db_path, 25)]  # 模拟两个实例共用同一个数据库文件
+    barrier = threading.Barrier(2)
+    results = [[], []]
+
+    def click(index):
+        store = stores[index]
+        barrier.wait()
+        for _ in range(30):
+            results[index].append(store.check_and_increment("alice", DATE))
+        store.close()  # 每个线程关闭自己的连接
+
+    threads = [threading.Thread(target=click, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    allowed = sorted(count for result in results for ok, count in result if ok)
+    assert allowed == list(range(1, 26))  # 每个计数只被分配一次，不多不少
+    assert all(count == 25 for result in results for ok, count in result if not ok)
+    assert stores[0].get("alice") == (25, DATE)
+    for store in stores:
+        store.close()  # 主线程建表时打开的连接
+
+
+def test_new_day_resets_count(tmp_path):
+    store = SqliteQuotaStore(str(tmp_path / "quota.sqlite3"), 2)
+    assert [store.check_and_increment("bob", DATE) for _ in range(3)] == [(True, 1), (True, 2), (False, 2)]
+    assert store.check_and_increment("bob", "2026-01-02") == (True, 1)
+    assert store.get("carol") == (0, None)
+    store.close()
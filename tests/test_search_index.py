@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import search_index
+from answer_store import AnswerStore
+from search_index import SearchIndex
+
+WORDS = [f"w{index}" for index in range(40)]
+
+
+def _build(size=3000, seed=7):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]  # 前几个词是文档频率远超 TOP_IMPACTS 的常用词
+    answers = []
+    for index in range(size):
+        tokens = rng.choices(WORDS, weights, k=rng.randint(2, 14))
+        answers.append({"page_number": index + 1, "EN": " ".join(tokens), "CN": "答案"})
+    return SearchIndex.build(AnswerStore(answers))
+
+
+@pytest.fixture(scope="module")
+def index():
+    return _build()
+
+
+QUERIES = ["w0", "w1", "w0 w1", "w1 w2", "w0 w1 w2", "w2 w3", "w0 w30", "w5 w1"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_threshold_search_matches_full_intersection(index, query, monkeypatch):
+    calls = []
+    threshold_search = index._threshold_search
+
+    def spy(*args):
+        result = threshold_search(*args)
+        calls.append(result is not None)
+        return result
+
+    for limit in (1, 3, 10, 50, search_index.TOP_IMPACTS):
+        monkeypatch.setattr(index, "_threshold_search", spy)
+        fast = index.search(query, limit)
+        monkeypatch.setattr(index, "_threshold_search", lambda *args: None)  # 只用求交集的完整计算
+        assert fast == index.search(query, limit), (query, limit)
+    terms = search_index.query_terms(query)
+    if all(index._postings[term][4] is not None for term in terms):
+        assert any(calls)  # 只含常用词的查询确实走了阈值算法提前结束
+
+
+def test_frequent_terms_have_top_lists(index):
+    frequent = [term for term, postings in index._postings.items() if postings[4] is not None]
+    assert {"w0", "w1", "w2"} <= set(frequent)
+    assert all(index._postings[term][0] > search_index.TOP_IMPACTS for term in frequent)
@@ -0,0 +1,44 @@
+from answer_store import AnswerStore
+from binary_corpus import BinaryCorpus, build_corpus_bytes
+from seeded_draw import CounterRandom, draw_key, seeded_draw
+
+DATE = "2026-01-01"
+ANSWERS = [{"page_number": page, "EN": f"en{page}", "CN": f"cn{page}"} for page in range(1, 501)]
+
+
+def _sequence(rng, size=20):
+    return [rng.random() for _ in range(size)] + [rng.randrange(10 ** 6) for _ in range(size)]
+
+
+def test_same_user_date_salt_gives_same_stream():
+    key = draw_key("alice", DATE, "salt")
+    assert key == draw_key("alice", DATE, "salt")
+    assert _sequence(CounterRandom(key, 3)) == _sequence(CounterRandom(key, 3))
+    rng = CounterRandom(key, 3)
+    rng.seed(12345)  # 播种不改变输出，只回到流的开头
+    assert _sequence(rng) == _sequence(CounterRandom(key, 3))
+
+
+def test_inputs_change_the_key_and_stream():
+    keys = {draw_key("alice", DATE), draw_key("bob", DATE), draw_key("alice", "2026-01-02"),
+            draw_key("alice", DATE, "salt")}
+    assert len(keys) == 4
+    key = draw_key("alice", DATE)
+    assert _sequence(CounterRandom(key, 0)) != _sequence(CounterRandom(key, 1))
+
+
+def test_seeded_draw_is_repeatable_across_store_types():
+    store = AnswerStore(ANSWERS)
+    corpus = BinaryCorpus(build_corpus_bytes(ANSWERS))
+    for click_index in (0, 1, 7, 10 ** 6):  # 第 N 次点击的答案直接算出，与之前的点击无关
+        drawn = seeded_draw(store, "alice", DATE, click_index, "salt")
+        assert seeded_draw(store, "alice", DATE, click_index, "salt") == drawn
+        assert seeded_draw(corpus, "alice", DATE, click_index, "salt")["page_number"] == drawn["page_number"]
+    pages = {seeded_draw(store, "alice", DATE, click_index)["page_number"] for click_index in range(50)}
+    assert len(pages) > 40  # 不同点击序号得到的答案分散
+
+
+def test_getrandbits_width():
+    rng = CounterRandom(draw_key("alice", DATE))
+    assert rng.getrandbits(0) == 0
+    assert all(rng.getrandbits(100) < 1 << 100 for _ in range(100))
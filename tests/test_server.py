@@ -0,0 +1,40 @@
+import asyncio
+
+from answer_store import AnswerStore
+from server import AnswerServer, MemoryQuota
+
+
+async def _request(raw):
+    answer_server = AnswerServer(AnswerStore([{"page_number": 1, "EN": "Yes", "CN": "是"}]), MemoryQuota(3))
+    server = await answer_server.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_oversized_body_is_rejected_before_reading():
+    # 只发送请求头，声明的请求体不会被读取，服务端直接返回 413 并关闭连接
+    response = asyncio.run(_request(b"POST /draw HTTP/1.1\r\nContent-Length: 10000000\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 413 Payload Too Large\r\n")
+
+
+def test_small_body_is_discarded():
+    response = asyncio.run(_request(b"POST /health HTTP/1.1\r\nContent-Length: 4\r\nConnection: close\r\n\r\nping"))
+    assert response.startswith(b"HTTP/1.1 405 Method Not Allowed\r\n")  # 请求体被丢弃，请求照常处理
+
+
+def test_chunked_body_is_rejected_and_connection_closed():
+    # 分块请求体如果留在连接中，会被当作下一个请求解析（请求走私）
+    response = asyncio.run(_request(b"POST /health HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                                    b"17\r\nGET /draw HTTP/1.1\r\n\r\n\r\n0\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+    assert b"Connection: close" in response
+    assert response.count(b"HTTP/1.1 ") == 1
@@ -0,0 +1,52 @@
+import io
+import json
+
+import pytest
+
+from streaming_loader import iter_json_array
+
+CHUNK_SIZES = [1, 2, 3, 7, 64]
+DOCUMENT = json.dumps([
+    {"page_number": 1, "EN": "Don’t bet on it", "CN": "不要押注", "weight": 12.5},
+    {"page_number": 2, "EN": "say \"yes\"\\no", "CN": "是\n否", "tags": [1, [2, {}], None]},
+    -0.25e3,
+    "]",  # 字符串中的分隔符不影响解析
+    [],
+    True,
+    12345678901234567890,
+], ensure_ascii=False, indent=2)
+
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES)
+def test_tiny_chunks_match_json_load(chunk_chars):
+    assert list(iter_json_array(io.StringIO(DOCUMENT), chunk_chars=chunk_chars)) == json.loads(DOCUMENT)
+
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES)
+def test_empty_array(chunk_chars):
+    assert list(iter_json_array(io.StringIO(" \n[ \t]\n"), chunk_chars=chunk_chars)) == []
+
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES)
+@pytest.mark.parametrize("document, message", [
+    ("", "不是 JSON 数组"),
+    ("  {\"page_number\": 1}", "不是 JSON 数组"),
+    ("[1, 2", "未结束"),
+    ("[1 2]", "缺少逗号"),
+    ("[12.", "缺少逗号"),
+    ("[{\"EN\": \"a\"", "delimiter"),
+    ("[\"abc", "Unterminated string"),
+    ("[1,]", "Expecting value"),
+    ("[", "Expecting value"),
+])
+def test_malformed_input_raises(document, message, chunk_chars):
+    with pytest.raises(json.JSONDecodeError, match=message):
+        list(iter_json_array(io.StringIO(document), chunk_chars=chunk_chars))
+
+
+def test_items_before_an_error_are_yielded():
+    items = iter_json_array(io.StringIO('[{"page_number": 1}, {"page_number": 2} {"page_number": 3}]'), chunk_chars=4)
+    assert next(items) == {"page_number": 1}
+    assert next(items) == {"page_number": 2}  # 已解析的元素先交给答案库，出错位置之后才抛出异常
+    with pytest.raises(json.JSONDecodeError):
+        next(items)
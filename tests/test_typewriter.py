@@ -0,0 +1,37 @@
+from typewriter import TypewriterAnimator
+
+
+class _Root:
+    def after(self, delay_ms, callback):
+        return "after#1"
+
+
+class _Label:
+    def __init__(self):
+        self.text = ""
+
+    def config(self, text):
+        self.text = text
+
+    def winfo_exists(self):
+        return 1
+
+
+def test_cancel_and_replace_call_on_cancel_only():
+    animator = TypewriterAnimator(_Root())
+    label = _Label()
+    events = []
+    animator.start(label, "abc", 50, on_done=lambda: events.append("done1"), on_cancel=lambda: events.append("cancel1"))
+    animator.start(label, "xyz", 50, on_done=lambda: events.append("done2"), on_cancel=lambda: events.append("cancel2"))
+    animator.cancel(label)
+    animator.cancel(label)  # 没有动画时什么也不做
+    assert events == ["cancel1", "cancel2"]
+
+
+def test_skip_calls_on_done():
+    animator = TypewriterAnimator(_Root())
+    label = _Label()
+    events = []
+    animator.start(label, "abc", 50, on_done=lambda: events.append("done"), on_cancel=lambda: events.append("cancel"))
+    animator.skip(label)
+    assert events == ["done"] and label.text == "abc"
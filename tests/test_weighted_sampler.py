@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from answer_store import AnswerStore
+from weighted_sampler import AliasTable, WeightedSampler, self_check
+
+
+def _drawn(sample, rounds=20000, seed=0):
+    rng = random.Random(seed)
+    return {sample(rng) for _ in range(rounds)}
+
+
+def test_alias_table_never_draws_zero_weight():
+    table = AliasTable([0, 5, 0, 1, 0, 0.001])
+    assert _drawn(table.sample) == {1, 3, 5}
+
+
+def test_update_and_set_weight_keep_zero_weight_undrawable():
+    weights = [1] * 300
+    sampler = WeightedSampler(weights, block_size=16)
+    sampler.update({position: 0 for position in range(0, 300, 3)})
+    sampler.set_weight(7, 0)
+    sampler.set_weight(3, 2)  # 权重从 0 恢复后可以再次抽到
+    zero = (set(range(0, 300, 3)) - {3}) | {7}
+    drawn = _drawn(sampler.sample, rounds=50000)
+    assert not drawn & zero
+    assert 3 in drawn
+    assert sampler.total == pytest.approx(300 - len(zero) + 1)
+    assert self_check(sampler, 50000, random.Random(1))["passed"]
+
+
+def test_whole_block_at_zero_and_all_zero():
+    sampler = WeightedSampler([1] * 128, block_size=64)
+    sampler.update({position: 0 for position in range(64)})  # 整块权重为 0，顶层表不会选中该块
+    assert min(_drawn(sampler.sample)) >= 64
+    sampler.update({position: 0 for position in range(64, 128)})
+    assert sampler.sample(random.Random(0)) is None
+    with pytest.raises(ValueError):
+        sampler.set_weight(0, -1)
+
+
+def test_store_set_weights_keeps_zero_weight_undrawable():
+    store = AnswerStore([{"page_number": page, "EN": f"en{page}", "CN": f"cn{page}"} for page in range(1, 101)])
+    store.set_weights({page: 0 for page in range(1, 51)})
+    pages = _drawn(lambda rng: store.draw(rng)["page_number"])
+    assert min(pages) == 51 and max(pages) == 100
+    with pytest.raises(KeyError):
+        store.set_weights({101: 1})
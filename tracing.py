@@ -0,0 +1,206 @@
+"""
+可选的调用链追踪，输出 Chrome trace-event 格式 (JSON)，可以在 Perfetto (https://ui.perfetto.dev) 或 chrome://tracing 中打开。
+
+运行主程序时加上 --trace 启用，记录每次点击和每个启动阶段的嵌套区间（单调时钟，微秒），
+退出时写入 data/trace.json。未启用时 traced() 装饰器原样返回被装饰的函数，span() 返回共享的空操作对象，
+不记录任何内容。
+
+用法示例:
+    @tracer.traced()
+    def load(...):
+        ...
+
+    with tracer.span("layout", widget="answer"):
+        ...
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+
+TRACE_FLAG = "--trace"  # 启用追踪的命令行参数
+TRACE_FILE = "./data/trace.json"  # 追踪文件路径
+
+
+class _NullSpan:
+    """
+    未启用追踪时使用的空操作区间。
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_tracer', '_name', '_cat', '_args', '_start')
+
+    def __init__(self, tracer, name, cat, args):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._tracer._add_complete(self._name, self._cat, self._start, time.perf_counter_ns(), self._args)
+        return False
+
+
+class Tracer:
+    """
+    追踪事件收集器。
+
+    事件追加到列表中（list.append 是线程安全的），后台线程中的区间显示在各自的线程轨道上。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._origin_ns = time.perf_counter_ns()  # 时间戳零点
+        self._events = []
+        self._threads = {}  # 线程 ID -> 线程名称
+        self._pid = os.getpid()
+
+    def enable(self):
+        """
+        启用追踪。需要在导入使用 traced() 装饰的模块之前调用。
+        """
+        if not self.enabled:
+            self.enabled = True
+            self._origin_ns = time.perf_counter_ns()
+
+    def enable_if_requested(self, argv):
+        """
+        命令行参数包含 --trace 时启用追踪。
+
+        Args:
+            argv (list): 命令行参数列表。
+        """
+        if TRACE_FLAG in argv:
+            self.enable()
+
+    def _thread_id(self):
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def _timestamp(self, ns):
+        return (ns - self._origin_ns) / 1000  # trace-event 的时间单位为微秒
+
+    def _add_complete(self, name, cat, start_ns, end_ns, args):
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._timestamp(start_ns),
+                 "dur": (end_ns - start_ns) / 1000, "pid": self._pid, "tid": self._thread_id()}
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def span(self, name, cat="app", **args):
+        """
+        记录一个区间，用作 with 语句；同一线程中嵌套的区间在查看器中显示为调用栈。
+
+        Args:
+            name (str): 区间名称。
+            cat (str, optional): 类别，查看器中可以按类别筛选。
+            **args: 附加在事件上的参数。
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def traced(self, name=None, cat="app"):
+        """
+        函数装饰器：每次调用记录一个区间。装饰时未启用追踪则原样返回函数，不增加任何开销。
+
+        Args:
+            name (str, optional): 区间名称，默认为函数的限定名。
+            cat (str, optional): 类别。
+        """
+        def decorator(func):
+            if not self.enabled:
+                return func
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._add_complete(span_name, cat, start, time.perf_counter_ns(), None)
+            return wrapper
+        return decorator
+
+    def complete(self, name, start, duration, cat="app", **args):
+        """
+        记录一个已经结束的区间（例如启动阶段）。
+
+        Args:
+            start (float): 开始时刻 (time.perf_counter，秒)。
+            duration (float): 持续时间（秒）。
+        """
+        if self.enabled:
+            start_ns = int(start * 1e9)
+            self._add_complete(name, cat, start_ns, start_ns + int(duration * 1e9), args)
+
+    def instant(self, name, cat="app", **args):
+        """
+        记录一个瞬时事件（例如答案的第一个字显示）。
+        """
+        if self.enabled:
+            event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self._timestamp(time.perf_counter_ns()),
+                     "pid": self._pid, "tid": self._thread_id()}
+            if args:
+                event["args"] = args
+            self._events.append(event)
+
+    def async_begin(self, name, span_id, cat="app", **args):
+        """
+        开始一个跨多个回调的异步区间（例如逐字显示动画），以 async_end 结束，span_id 相同的事件配对。
+        """
+        self._add_async("b", name, span_id, cat, args)
+
+    def async_end(self, name, span_id, cat="app"):
+        self._add_async("e", name, span_id, cat, None)
+
+    def _add_async(self, phase, name, span_id, cat, args):
+        if self.enabled:
+            event = {"name": name, "cat": cat, "ph": phase, "id": span_id,
+                     "ts": self._timestamp(time.perf_counter_ns()), "pid": self._pid, "tid": self._thread_id()}
+            if args:
+                event["args"] = args
+            self._events.append(event)
+
+    def save(self, path=TRACE_FILE):
+        """
+        把已记录的事件写入 Chrome trace-event 格式的 JSON 文件。
+
+        Args:
+            path (str, optional): 追踪文件路径。
+
+        Returns:
+            str: 追踪文件路径，未启用时返回 None。
+        """
+        if not self.enabled:
+            return None
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": thread_name}}
+                    for tid, thread_name in list(self._threads.items())]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + list(self._events), "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+
+tracer = Tracer()  # 全局追踪器
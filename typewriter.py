@@ -0,0 +1,146 @@
+import time
+import tkinter as tk
+
+from tracing import tracer
+
+
+FRAME_MS = 16  # 帧间隔（毫秒），约 60 帧每秒
+
+
+class _Reveal:
+    """
+    一个正在进行的逐字显示动画。
+    """
+
+    __slots__ = ('widget', 'text', 'interval_ms', 'start_time', 'shown', 'on_done', 'on_first', 'on_cancel',
+                 'is_text_widget')
+
+    def __init__(self, widget, text, interval_ms, start_index, on_done, on_first=None, on_cancel=None):
+        self.widget = widget
+        self.text = text
+        self.interval_ms = interval_ms
+        # 把起始时间往前推，使 start_index 个字符已经“到期”
+        self.start_time = time.monotonic() - start_index * interval_ms / 1000
+        self.shown = -1  # 已显示的字符数，-1 表示尚未绘制过
+        self.on_done = on_done
+        self.on_first = on_first  # 第一次显示出字符后调用（用于统计点击到首字的延迟）
+        self.on_cancel = on_cancel  # 动画被取消（没有显示完）时调用
+        self.is_text_widget = isinstance(widget, tk.Text)
+
+
+class TypewriterAnimator:
+    """
+    逐字显示动画调度器。
+
+    所有正在进行的动画共用一个固定帧率的 after() 定时器：每一帧根据已经过去的时间计算每个动画应显示的字符数，
+    只有字符数变化时才更新组件；帧被延迟时一帧内补上多个字符，不会为每个字符单独排队回调。
+    没有动画时定时器自动停止。
+
+    Label 类组件每帧设置一次完整文本；tk.Text 组件只追加新增的字符。
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        """
+        Args:
+            root (tk.Misc): 用于调度 after() 回调的 tkinter 组件（通常是主窗口）。
+            frame_ms (int, optional): 帧间隔（毫秒）。
+        """
+        self.root = root
+        self.frame_ms = frame_ms
+        self._reveals = {}  # widget -> _Reveal
+        self._after_id = None  # 当前排队的帧回调 ID
+
+    def start(self, widget, text, interval_ms, on_done=None, start_index=0, on_first=None, on_cancel=None):
+        """
+        开始在组件上逐字显示文本，同一组件上已有的动画会被取消。
+
+        Args:
+            widget: 要显示文本的 Label 或 Text 组件。
+            text (str): 要完整显示的文本。
+            interval_ms (int): 每个字符的显示间隔（毫秒）。
+            on_done (callable, optional): 文本完整显示后调用的无参函数。
+            start_index (int, optional): 从第几个字符开始显示，默认为 0。
+            on_first (callable, optional): 第一次显示出字符后调用的无参函数。
+            on_cancel (callable, optional): 动画没有显示完就被取消（包括被同一组件上的新动画替换）时调用的无参函数。
+        """
+        self.cancel(widget)
+        self._reveals[widget] = _Reveal(widget, text, interval_ms, start_index, on_done, on_first, on_cancel)
+        self._schedule()
+
+    def cancel(self, widget):
+        """
+        取消组件上的动画，不显示剩余文本，也不调用完成回调，只调用取消回调。
+        """
+        reveal = self._reveals.pop(widget, None)
+        if reveal is not None and reveal.on_cancel:
+            reveal.on_cancel()
+
+    def skip(self, widget):
+        """
+        立即显示组件上动画的完整文本并调用完成回调。
+        """
+        reveal = self._reveals.pop(widget, None)
+        if reveal is not None:
+            self._render(reveal, len(reveal.text))
+            if reveal.on_done:
+                reveal.on_done()
+
+    def is_active(self, widget):
+        """
+        判断组件上是否有正在进行的动画。
+        """
+        return widget in self._reveals
+
+    def _schedule(self):
+        """
+        有动画且尚未排队时，安排下一帧。
+        """
+        if self._after_id is None and self._reveals:
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+
+    def _render(self, reveal, count):
+        """
+        把组件更新为显示前 count 个字符。
+        """
+        if reveal.is_text_widget:
+            # Text 组件只追加新字符，总开销与文本长度成线性关系
+            start = max(reveal.shown, 0)
+            if count > start:
+                reveal.widget.config(state=tk.NORMAL)
+                reveal.widget.insert(tk.END, reveal.text[start:count])
+                reveal.widget.config(state=tk.DISABLED)
+        else:
+            reveal.widget.config(text=reveal.text[:count])
+        reveal.shown = count
+        if count and reveal.on_first is not None:
+            on_first, reveal.on_first = reveal.on_first, None
+            on_first()
+
+    @tracer.traced("typewriter frame", cat="tk")
+    def _tick(self):
+        """
+        帧回调：推进所有动画，完成的动画调用完成回调。
+        """
+        self._after_id = None
+        now = time.monotonic()
+        finished = []
+        for widget, reveal in list(self._reveals.items()):
+            try:
+                if not int(widget.winfo_exists()):
+                    # 组件已被销毁（例如窗口已关闭），按取消处理
+                    self.cancel(widget)
+                    continue
+            except tk.TclError:
+                self.cancel(widget)
+                continue
+            elapsed_ms = (now - reveal.start_time) * 1000
+            count = min(len(reveal.text), int(elapsed_ms // reveal.interval_ms))
+            if count != reveal.shown:
+                self._render(reveal, count)
+            if count >= len(reveal.text):
+                del self._reveals[widget]
+                finished.append(reveal)
+        for reveal in finished:
+            if reveal.on_done:
+                reveal.on_done()
+        self._schedule()
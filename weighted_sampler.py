@@ -0,0 +1,179 @@
+import math
+import random
+
+
+class AliasTable:
+    """
+    Vose 别名表：按权重抽取下标，构建 O(n)，抽取 O(1)。
+    """
+
+    __slots__ = ('size', 'total', '_prob', '_alias')
+
+    def __init__(self, weights):
+        """
+        Args:
+            weights (list): 非负权重列表。
+        """
+        self.size = len(weights)
+        self.total = float(sum(weights))
+        self._prob = [1.0] * self.size  # 每个槽位保留自身下标的概率
+        self._alias = list(range(self.size))  # 每个槽位的别名下标
+        if not self.size or self.total <= 0:
+            return
+
+        scaled = [weight * self.size / self.total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 剩余槽位的概率因浮点误差略偏离 1，直接置为 1
+        for i in large + small:
+            self._prob[i] = 1.0
+
+    def sample(self, rng=random):
+        """
+        按权重抽取一个下标。
+
+        Args:
+            rng (random.Random, optional): 随机数生成器。
+
+        Returns:
+            int: 抽中的下标。
+        """
+        u = rng.random() * self.size
+        slot = int(u)
+        return slot if (u - slot) < self._prob[slot] else self._alias[slot]
+
+
+class WeightedSampler:
+    """
+    分块别名表加权采样器。
+
+    把 n 个权重分成约 √n 个块，每块一张别名表，再用一张顶层别名表按块总权重选块。
+    抽取需要两次 O(1) 查表；修改一个权重只需重建所在块和顶层表，为 O(√n)，不必重建整张表。
+    """
+
+    def __init__(self, weights, block_size=None):
+        """
+        Args:
+            weights (list): 非负权重列表。
+            block_size (int, optional): 每块的权重个数，默认约为 √n。
+        """
+        self._weights = [float(weight) for weight in weights]
+        self.block_size = block_size or max(64, math.isqrt(len(self._weights)))
+        self._blocks = [
+            AliasTable(self._weights[start:start + self.block_size])
+            for start in range(0, len(self._weights), self.block_size)
+        ]
+        self._top = AliasTable([block.total for block in self._blocks])
+
+    def __len__(self):
+        return len(self._weights)
+
+    @property
+    def total(self):
+        """
+        所有权重之和。
+        """
+        return self._top.total
+
+    def weight(self, position):
+        """
+        读取指定位置的权重。
+        """
+        return self._weights[position]
+
+    def sample(self, rng=random):
+        """
+        按权重抽取一个位置。
+
+        Args:
+            rng (random.Random, optional): 随机数生成器。
+
+        Returns:
+            int: 抽中的位置，所有权重都为 0 时返回 None。
+        """
+        if self._top.total <= 0:
+            return None
+        block = self._top.sample(rng)
+        return block * self.block_size + self._blocks[block].sample(rng)
+
+    def update(self, changes):
+        """
+        批量修改权重，只重建受影响的块，最后重建一次顶层表。
+
+        Args:
+            changes (dict): 位置 -> 新权重（非负）。
+        """
+        for weight in changes.values():
+            if not weight >= 0:
+                raise ValueError(f"权重必须为非负数: {weight}")
+        touched = set()
+        for position, weight in changes.items():
+            self._weights[position] = float(weight)
+            touched.add(position // self.block_size)
+        for block in touched:
+            start = block * self.block_size
+            self._blocks[block] = AliasTable(self._weights[start:start + self.block_size])
+        if touched:
+            self._top = AliasTable([block.total for block in self._blocks])
+
+    def set_weight(self, position, weight):
+        """
+        修改单个位置的权重。
+        """
+        self.update({position: weight})
+
+
+def self_check(sampler, samples, rng=random):
+    """
+    统计自检：大量抽样并与权重给出的期望分布比较。
+
+    使用卡方检验，并用 Wilson-Hilferty 近似把卡方统计量换算为标准正态 z 值，z 小于 4 视为通过。
+
+    Args:
+        sampler (WeightedSampler): 要检验的采样器。
+        samples (int): 抽样次数。
+        rng (random.Random, optional): 随机数生成器。
+
+    Returns:
+        dict: 检验结果（抽样次数、卡方统计量、自由度、z 值、最大相对偏差、是否通过）。
+    """
+    counts = [0] * len(sampler)
+    sample = sampler.sample
+    for _ in range(samples):
+        counts[sample(rng)] += 1
+
+    total = sampler.total
+    chi_square = 0.0
+    degrees = -1
+    max_relative_error = 0.0
+    for position, observed in enumerate(counts):
+        expected = samples * sampler.weight(position) / total
+        if expected <= 0:
+            if observed:
+                # 权重为 0 却被抽中，直接判定失败
+                return {"samples": samples, "passed": False, "error": f"权重为 0 的位置 {position} 被抽中"}
+            continue
+        degrees += 1
+        chi_square += (observed - expected) ** 2 / expected
+        max_relative_error = max(max_relative_error, abs(observed - expected) / expected)
+
+    z = 0.0
+    if degrees > 0:
+        ratio = chi_square / degrees
+        variance = 2.0 / (9.0 * degrees)
+        z = (ratio ** (1.0 / 3.0) - (1.0 - variance)) / math.sqrt(variance)
+    return {
+        "samples": samples,
+        "chi_square": round(chi_square, 3),
+        "degrees_of_freedom": degrees,
+        "z": round(z, 3),
+        "max_relative_error": round(max_relative_error, 5),
+        "passed": z < 4.0,
+    }